@@ -6,15 +6,14 @@ import asyncio
 import json
 import time
 from pathlib import Path
-from typing import Any, Dict, List
-
-import yaml
+from typing import Any, Dict, List, Optional, Tuple
 
 import BAC0
 
-
-def _load_yaml(path: Path) -> Dict[str, Any]:
-    return yaml.safe_load(path.read_text(encoding="utf-8-sig")) or {}
+from src.bacnet_scanner.devices_io import output_path, write_devices
+from src.bacnet_scanner.discovery import CollectionWindow, DiscoveryOptions, collect, discover
+from src.bacnet_scanner.inventory import load_previous, merge_inventory, utc_iso
+from src.utils.config_io import load_config
 
 
 def _ensure_dir(path: Path) -> None:
@@ -25,76 +24,71 @@ def _now_iso() -> str:
     return time.strftime("%Y-%m-%dT%H:%M:%S%z")
 
 
-def _extract_int(s: str) -> int | None:
-    digits = "".join(ch if ch.isdigit() else " " for ch in s).split()
-    return int(digits[0]) if digits else None
-
-
-def _extract_address(s: str) -> str | None:
-    parts = s.replace(",", " ").replace(";", " ").split()
-    for p in parts:
-        candidate = p.split(":")[0]
-        if candidate.count(".") == 3:
-            chunks = candidate.split(".")
-            if all(c.isdigit() and 0 <= int(c) <= 255 for c in chunks):
-                return p
-    return None
-
-
 async def discover_devices_async(
-    local_ip: str, port: int, whois_timeout: int, max_devices: int
-) -> List[Dict[str, Any]]:
+    local_ip: str, port: int, options: DiscoveryOptions
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     # BAC0 async Lite requires a running event loop (we are inside asyncio.run)
     bacnet = BAC0.lite(ip=local_ip, port=port)
-
-    await asyncio.sleep(0.5)  # allow stack to bind + start tasks
-    results = bacnet.whois()
-    await asyncio.sleep(max(1, whois_timeout))  # collect I-Am replies
-
-    devices: List[Dict[str, Any]] = []
-    discovered = getattr(bacnet, "discoveredDevices", None)
-
-    if isinstance(discovered, dict) and discovered:
-        for k, v in discovered.items():
-            rec = {
-                "device_instance": _extract_int(str(k)),
-                "address": _extract_address(str(v)),
-                "raw_key": str(k),
-                "raw_value": str(v),
-            }
-            devices.append(rec)
-    else:
-        devices.append({"raw": str(results)})
-
-    if len(devices) > max_devices:
-        devices = devices[:max_devices]
-
     try:
-        bacnet.disconnect()
-    except Exception:
-        pass
-
-    return devices
-
-
-async def async_main(config_path: Path, force_offline: bool) -> int:
-    cfg = _load_yaml(config_path)
+        await asyncio.sleep(0.5)  # allow stack to bind + start tasks
+
+        async def who_is(low: int, high: int, window: CollectionWindow) -> Tuple[List[Any], List[float]]:
+            app = bacnet.this_application.app
+            future = app.who_is(low_limit=low, high_limit=high, timeout=window.max_seconds)
+            # bacpypes3 keeps the I-Ams matched so far on the pending WhoIsFuture;
+            # watching it lets the window end once replies stop arriving
+            pending = next((w for w in getattr(app, "_who_is_futures", []) if w.future is future), None)
+            if pending is None:
+                return await future, []
+            arrivals = await collect(window, lambda: len(pending.i_ams), future)
+            if not future.done():
+                future.set_result(list(pending.i_ams.values()))
+            return await future, arrivals
+
+        return await discover(who_is, options)
+    finally:
+        try:
+            task = bacnet.disconnect()  # returns a Task in async BAC0
+            if task is not None:
+                await task
+        except Exception:
+            pass
+
+
+def _append_changes(path: Path, run_id: str, timestamp: str, changes: List[Dict[str, Any]]) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        for c in changes:
+            f.write(json.dumps({"scan_run_id": run_id, "timestamp": timestamp, **c}) + "\n")
+
+
+async def async_main(config_path: Path, force_offline: bool, incremental_flag: Optional[bool] = None) -> int:
+    cfg = load_config(config_path)
 
     scanner = cfg.get("scanner", {})
     network = cfg.get("network", {})
     safety = cfg.get("safety", {})
     logging_cfg = cfg.get("logging", {})
     output = cfg.get("output", {})
+    incremental_cfg = cfg.get("incremental", {}) or {}
 
     local_ip = str(network.get("local_ip", "")).strip()
     port = int(network.get("bacnet_port", 47808))
     whois_timeout = int(safety.get("whois_timeout_seconds", 5))
     max_devices = int(safety.get("max_devices", 500))
+    try:
+        options = DiscoveryOptions.from_config(cfg.get("discovery", {}) or {}, timeout=max(1, whois_timeout))
+    except ValueError as e:
+        raise SystemExit(f"[ERROR] Invalid config: {e}")
 
-    out_dir = Path(str(output.get("directory", "./out/bacnet")))
-    out_file = str(output.get("filename", "devices.json"))
+    out_path, ndjson = output_path(output)
+    out_dir = out_path.parent
     _ensure_dir(out_dir)
 
+    incremental = bool(incremental_cfg.get("enabled", False)) if incremental_flag is None else incremental_flag
+    missing_ttl = float(incremental_cfg.get("missing_ttl_hours", 72)) * 3600.0
+    changes_path = out_dir / str(incremental_cfg.get("changes_filename", "changes.jsonl"))
+    previous = load_previous(out_path) if incremental else []
+
     offline_mode = bool(safety.get("offline_mode", False)) or force_offline
     mock_devices = safety.get("mock_devices", []) or []
 
@@ -119,6 +113,8 @@ async def async_main(config_path: Path, force_offline: bool) -> int:
     print("[INFO] BACnet scanner starting")
     print(f"       config={config_path}")
     print(f"       offline_mode={offline_mode}")
+    if incremental:
+        print(f"       incremental: {len(previous)} devices in the previous inventory")
 
     devices: List[Dict[str, Any]] = []
 
@@ -133,18 +129,64 @@ async def async_main(config_path: Path, force_offline: bool) -> int:
             meta["error_message"] = "network.local_ip is required (use IP/prefix, e.g. 172.16.16.22/24)."
         else:
             try:
-                print(f"[INFO] Starting BACnet discovery on {local_ip} port={port}")
-                devices = await discover_devices_async(local_ip, port, whois_timeout, max_devices)
+                print(
+                    f"[INFO] Starting BACnet discovery on {local_ip} port={port} "
+                    f"(instances {options.low}-{options.high}, {options.partitions} ranges, "
+                    f"concurrency={options.concurrency}, window {options.window.min_seconds:g}-"
+                    f"{options.window.max_seconds:g}s, quiet {options.window.quiet_seconds:g}s)"
+                )
+                started = time.monotonic()
+                devices, stats = await discover_devices_async(local_ip, port, options)
+                stats["seconds"] = round(time.monotonic() - started, 2)
+                meta["discovery"] = stats
+                print(
+                    f"[INFO] Discovery took {stats['seconds']}s: {stats['whois_sent']} Who-Is, "
+                    f"{stats['iam_received']} I-Am, windows avg {stats['window_seconds_avg']}s "
+                    f"({stats['ended_max']} ran to the max)"
+                )
+
+                # capped after merge_inventory below, so devices past the cap
+                # are not mistaken for silent or removed ones
+                meta["devices_found"] = len(devices)
+                if len(devices) > max_devices:
+                    print(f"[WARN] {len(devices)} devices found; keeping the first {max_devices} (safety.max_devices)")
+                    meta["truncated"] = True
+                if stats["failed_ranges"]:
+                    print(f"[WARN] Who-Is failed for {len(stats['failed_ranges'])} range(s); see meta.discovery")
             except Exception as e:
                 meta["status"] = "error"
                 meta["error_type"] = type(e).__name__
                 meta["error_message"] = str(e)
 
+    now = time.time()
+    changes: List[Dict[str, Any]] = []
+    if meta["status"] == "ok":
+        # full scans stamp first_seen/last_seen too, so a later incremental run can age them
+        devices, changes = merge_inventory(previous, devices, now, missing_ttl)
+        if meta.get("truncated"):
+            # keep the lowest instances; devices cut here were seen, so only
+            # removals (silent past the TTL) are logged for them
+            devices = devices[:max_devices]
+            kept = {d.get("device_instance") for d in devices}
+            changes = [c for c in changes if c["change"] == "removed" or c["device_instance"] in kept]
+    elif previous:
+        # keep the inventory rather than report every device gone
+        devices = previous
+        meta["carried_over"] = True
+    if incremental:
+        meta["incremental"] = True
+        meta["changes"] = {k: sum(1 for c in changes if c["change"] == k) for k in ("added", "moved", "removed")}
+        meta["silent_devices"] = sum(1 for d in devices if d.get("silent"))
+        if changes:
+            _append_changes(changes_path, meta["scan_run_id"], utc_iso(now), changes)
+        print(
+            f"[INFO] Changes: {meta['changes']['added']} added, {meta['changes']['moved']} moved, "
+            f"{meta['changes']['removed']} removed; {meta['silent_devices']} silent within TTL"
+        )
+
     meta["device_records"] = len(devices)
 
-    payload = {"meta": meta, "devices": devices}
-    out_path = out_dir / out_file
-    out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    write_devices(out_path, meta, devices, ndjson)
 
     if meta["status"] == "ok":
         print(f"[OK] Wrote: {out_path}")
@@ -160,8 +202,17 @@ def main() -> int:
     ap = argparse.ArgumentParser(description="BACnet Scanner (devices.json exporter)")
     ap.add_argument("--config", required=True, help="Path to YAML config.")
     ap.add_argument("--offline", action="store_true", help="Force offline_mode regardless of config.")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental",
+        dest="incremental",
+        action="store_true",
+        default=None,
+        help="Merge into the previous devices.json and log added/moved/removed devices.",
+    )
+    mode.add_argument("--full", dest="incremental", action="store_false", help="Ignore the previous devices.json.")
     args = ap.parse_args()
-    return asyncio.run(async_main(Path(args.config), force_offline=args.offline))
+    return asyncio.run(async_main(Path(args.config), force_offline=args.offline, incremental_flag=args.incremental))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+# src/bacnet_scanner/devices_io.py
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from src.utils.safe_write import atomic_write_chunks, atomic_write_text
+
+# devices.json comes in two layouts:
+#   json   {"meta": {...}, "devices": [...]} (indented, one document)
+#   ndjson first line {"meta": {...}}, then one device object per line
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+def output_path(output: Dict[str, Any], key: str = "filename", default_stem: str = "devices") -> Tuple[Path, bool]:
+    """
+    (path, ndjson) for one of the scanner's output files from the config's
+    output section: output.format picks the layout (and the default suffix);
+    an explicit .ndjson/.jsonl filename implies NDJSON.
+    """
+    ndjson = str(output.get("format", "json")).strip().lower() == "ndjson"
+    name = str(output.get(key) or f"{default_stem}.{'ndjson' if ndjson else 'json'}")
+    ndjson = ndjson or Path(name).suffix.lower() in NDJSON_SUFFIXES
+    return Path(str(output.get("directory", "./out/bacnet"))) / name, ndjson
+
+
+def is_ndjson(path: Path) -> bool:
+    """
+    By suffix, else by whether the first line is the {"meta": ...} header on
+    its own (a compact one-line {"meta": ..., "devices": [...]} is the json layout).
+    """
+    if path.suffix.lower() in NDJSON_SUFFIXES:
+        return True
+    with path.open("r", encoding="utf-8") as f:
+        first = f.readline().strip()
+    if not first.startswith("{"):
+        return False
+    try:
+        obj = json.loads(first)
+    except ValueError:
+        return False
+    return isinstance(obj, dict) and list(obj) == ["meta"]
+
+
+def _ndjson_chunks(meta: Dict[str, Any], devices: Iterable[Dict[str, Any]], batch: int = 1000) -> Iterator[str]:
+    yield json.dumps({"meta": meta}, separators=(",", ":")) + "\n"
+    lines: List[str] = []
+    for d in devices:
+        lines.append(json.dumps(d, separators=(",", ":")))
+        if len(lines) >= batch:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def write_devices(path: Path, meta: Dict[str, Any], devices: Iterable[Dict[str, Any]], ndjson: bool) -> Path:
+    if ndjson:
+        return atomic_write_chunks(path, _ndjson_chunks(meta, devices))
+    return atomic_write_text(path, json.dumps({"meta": meta, "devices": list(devices)}, indent=2))
+
+
+def iter_records(path: Path) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """
+    (line number, "meta" | "device", object) for every record, reading
+    NDJSON one line at a time. The json layout has to be parsed whole;
+    its records all report line 0.
+    """
+    if not is_ndjson(path):
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        yield 0, "meta", payload.get("meta") or {}
+        for d in payload.get("devices") or []:
+            yield 0, "device", d
+        return
+    with path.open("r", encoding="utf-8") as f:
+        for n, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            obj = json.loads(line)
+            if n == 1:
+                if not isinstance(obj, dict) or "meta" not in obj:
+                    raise ValueError(f"{path}: line 1 must be the {{\"meta\": ...}} header")
+                yield n, "meta", obj["meta"]
+            else:
+                yield n, "device", obj
+
+
+def read_meta(path: Path) -> Dict[str, Any]:
+    """The meta record only (for NDJSON, without reading past line 1)."""
+    for _, kind, obj in iter_records(path):
+        if kind == "meta":
+            return obj
+    return {}
+
+
+def iter_devices(path: Path) -> Iterator[Dict[str, Any]]:
+    for _, kind, obj in iter_records(path):
+        if kind == "device":
+            yield obj
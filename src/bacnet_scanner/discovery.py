@@ -0,0 +1,286 @@
+# src/bacnet_scanner/discovery.py
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+# 4194303 is the "unconfigured" wildcard instance; real devices stop one below.
+MAX_INSTANCE = 4194302
+
+# Arrival-curve resolution recorded in meta.discovery.
+_CURVE_BUCKET_MS = 100
+
+
+@dataclass
+class CollectionWindow:
+    """
+    How long to keep collecting I-Ams after a Who-Is: until arrivals have been
+    quiet for `quiet_seconds`, but never less than `min_seconds` or more than
+    `max_seconds`.
+    """
+
+    min_seconds: float = 0.3
+    max_seconds: float = 5.0
+    quiet_seconds: float = 0.4
+    poll_seconds: float = 0.02
+
+
+# (low_limit, high_limit, window) -> (I-Am replies, arrival offsets in seconds)
+WhoIs = Callable[[int, int, CollectionWindow], Awaitable[Tuple[Iterable[Any], List[float]]]]
+
+
+@dataclass
+class DiscoveryOptions:
+    low: int = 0
+    high: int = MAX_INSTANCE
+    partitions: int = 1  # initial device-instance ranges
+    concurrency: int = 4  # Who-Is requests in flight at once
+    pace_seconds: float = 0.1  # minimum gap between two Who-Is sends
+    window: CollectionWindow = field(default_factory=CollectionWindow)
+    # A range answering with at least this many I-Ams is split and asked again:
+    # that many replies in one window is where the stack starts dropping them.
+    split_threshold: int = 200
+    split_ways: int = 4  # pieces a dense range is split into
+    min_range: int = 16  # never split below this many instances
+
+    def __post_init__(self) -> None:
+        for name, value, least in (
+            ("concurrency", self.concurrency, 1),
+            ("partitions", self.partitions, 1),
+            ("split_ways", self.split_ways, 2),
+            ("min_range", self.min_range, 1),
+        ):
+            if value < least:
+                raise ValueError(f"discovery.{name} must be >= {least} (got {value})")
+
+    @classmethod
+    def from_config(cls, discovery: Dict[str, Any], timeout: float) -> "DiscoveryOptions":
+        d = cls()
+        w = d.window
+        return cls(
+            low=int(discovery.get("instance_low", d.low)),
+            high=int(discovery.get("instance_high", d.high)),
+            partitions=int(discovery.get("partitions", d.partitions)),
+            concurrency=int(discovery.get("concurrency", d.concurrency)),
+            pace_seconds=float(discovery.get("pace_seconds", d.pace_seconds)),
+            window=CollectionWindow(
+                min_seconds=min(float(discovery.get("window_min_seconds", w.min_seconds)), float(timeout)),
+                max_seconds=float(timeout),
+                quiet_seconds=float(discovery.get("window_quiet_seconds", w.quiet_seconds)),
+            ),
+            split_threshold=int(discovery.get("split_threshold", d.split_threshold)),
+            split_ways=int(discovery.get("split_ways", d.split_ways)),
+            min_range=int(discovery.get("min_range", d.min_range)),
+        )
+
+
+async def collect(
+    window: CollectionWindow,
+    count: Callable[[], int],
+    done: Optional["asyncio.Future[Any]"] = None,
+) -> List[float]:
+    """
+    Wait out one collection window, polling `count()` (I-Ams received so far).
+    Returns the arrival offset of each I-Am, to poll_seconds resolution. Ends
+    early if `done` resolves (e.g. the stack's own timeout fired).
+    """
+    start = time.monotonic()
+    last_change = start
+    arrivals: List[float] = []
+    while True:
+        now = time.monotonic()
+        n = count()
+        if n > len(arrivals):
+            arrivals.extend([now - start] * (n - len(arrivals)))
+            last_change = now
+        elapsed = now - start
+        if elapsed >= window.max_seconds or (done is not None and done.done()):
+            return arrivals
+        if elapsed >= window.min_seconds and now - last_change >= window.quiet_seconds:
+            return arrivals
+        await asyncio.sleep(window.poll_seconds)
+
+
+def _window_stats(windows: List[Tuple[float, bool]], arrivals: List[float]) -> Dict[str, Any]:
+    """
+    Summary for meta: window lengths and the cumulative I-Am arrival curve
+    ([ms since Who-Is, I-Ams received by then], 100 ms buckets).
+    """
+    out: Dict[str, Any] = {
+        "windows": len(windows),
+        "ended_quiet": sum(1 for _, quiet in windows if quiet),
+        "ended_max": sum(1 for _, quiet in windows if not quiet),
+        "window_seconds_max": round(max((s for s, _ in windows), default=0.0), 3),
+        "window_seconds_avg": round(sum(s for s, _ in windows) / len(windows), 3) if windows else 0.0,
+    }
+    ms = sorted(a * 1000.0 for a in arrivals)
+    if ms:
+        out["iam_ms_p50"] = round(ms[len(ms) // 2])
+        out["iam_ms_p95"] = round(ms[int(len(ms) * 0.95)])
+        out["iam_ms_max"] = round(ms[-1])
+    curve: List[List[int]] = []
+    for i, t in enumerate(ms, start=1):
+        bucket = (int(t) // _CURVE_BUCKET_MS + 1) * _CURVE_BUCKET_MS
+        if curve and curve[-1][0] == bucket:
+            curve[-1][1] = i
+        else:
+            curve.append([bucket, i])
+    out["arrival_curve"] = curve
+    return out
+
+
+def partition(low: int, high: int, parts: int) -> List[Tuple[int, int]]:
+    """
+    Split [low, high] (inclusive, as in Who-Is limits) into up to `parts` ranges.
+    """
+    low, high = max(0, low), min(MAX_INSTANCE, high)
+    if high < low:
+        return []
+    span = high - low + 1
+    parts = max(1, min(parts, span))
+    bounds = [low + span * i // parts for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(parts)]
+
+
+def split_by_sample(low: int, high: int, instances: List[int], ways: int, min_range: int) -> List[Tuple[int, int]]:
+    """
+    Split a saturated [low, high] into up to `ways` ranges holding about the
+    same number of devices, using the instances that did answer as a sample
+    of where the devices are. Gaps between clusters ride along with a
+    neighbour instead of costing a Who-Is of their own.
+    """
+    sample = sorted(i for i in instances if low <= i <= high)
+    if len(sample) < ways:
+        return partition(low, high, min(ways, max(1, (high - low + 1) // min_range)))
+    bounds = [low]
+    for k in range(1, ways):
+        b = sample[len(sample) * k // ways]
+        if b - bounds[-1] >= min_range and high - b + 1 >= min_range:
+            bounds.append(b)
+    if len(bounds) == 1:
+        return partition(low, high, 2)
+    bounds.append(high + 1)
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(len(bounds) - 1)]
+
+
+def iam_record(iam: Any) -> Dict[str, Any]:
+    """
+    devices.json record from a bacpypes3 IAmRequest (or anything shaped like one).
+    """
+    ident = getattr(iam, "iAmDeviceIdentifier", None)
+    try:
+        instance: Optional[int] = int(ident[1])
+    except (TypeError, ValueError, IndexError):
+        instance = None
+    source = getattr(iam, "pduSource", None)
+    segmentation = getattr(iam, "segmentationSupported", None)
+    return {
+        "device_instance": instance,
+        "address": str(source) if source is not None else None,
+        "vendor_id": getattr(iam, "vendorID", None),
+        "max_apdu": getattr(iam, "maxAPDULengthAccepted", None),
+        "segmentation": str(segmentation) if segmentation is not None else None,
+    }
+
+
+class _Pacer:
+    """
+    Spaces request starts at least `gap` seconds apart across all workers.
+    """
+
+    def __init__(self, gap: float) -> None:
+        self.gap = gap
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if now < self._next:
+                await asyncio.sleep(self._next - now)
+                now = time.monotonic()
+            self._next = now + self.gap
+
+
+async def discover(who_is: WhoIs, options: DiscoveryOptions) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Who-Is over device-instance ranges with bounded concurrency and pacing,
+    each collecting I-Ams for an adaptive window. Dense ranges are split and
+    asked again. Replies are merged by device
+    instance (first address wins) and returned sorted, uncapped, with run stats.
+    """
+    queue: "asyncio.Queue[Tuple[int, int]]" = asyncio.Queue()
+    for r in partition(options.low, options.high, options.partitions):
+        queue.put_nowait(r)
+
+    pacer = _Pacer(options.pace_seconds)
+    window = options.window
+    found: Dict[int, Dict[str, Any]] = {}
+    windows: List[Tuple[float, bool]] = []  # (seconds, ended because quiet)
+    arrivals: List[float] = []
+    stats: Dict[str, Any] = {
+        "whois_sent": 0,
+        "ranges_split": 0,
+        "iam_received": 0,
+        "duplicate_iams": 0,
+        "address_conflicts": 0,
+        "failed_ranges": [],
+    }
+
+    async def worker() -> None:
+        while True:
+            low, high = await queue.get()
+            try:
+                await pacer.wait()
+                stats["whois_sent"] += 1
+                started = time.monotonic()
+                try:
+                    result, times = await who_is(low, high, window)
+                except Exception as e:
+                    stats["failed_ranges"].append({"low": low, "high": high, "error": f"{type(e).__name__}: {e}"})
+                    continue
+                replies = list(result)
+                seconds = time.monotonic() - started
+                windows.append((seconds, seconds < window.max_seconds))
+                arrivals.extend(times)
+
+                stats["iam_received"] += len(replies)
+                records = [iam_record(iam) for iam in replies]
+                for rec in records:
+                    instance = rec["device_instance"]
+                    if instance is None or not low <= instance <= high:
+                        continue
+                    seen = found.get(instance)
+                    if seen is None:
+                        found[instance] = rec
+                    else:
+                        stats["duplicate_iams"] += 1
+                        if seen["address"] != rec["address"]:
+                            stats["address_conflicts"] += 1
+
+                if len(replies) >= options.split_threshold and high - low + 1 >= 2 * options.min_range:
+                    stats["ranges_split"] += 1
+                    answered = [r["device_instance"] for r in records if r["device_instance"] is not None]
+                    for r in split_by_sample(low, high, answered, max(2, options.split_ways), options.min_range):
+                        queue.put_nowait(r)
+            finally:
+                queue.task_done()
+
+    # workers only ever finish by raising; wait on them alongside the queue so
+    # such an error surfaces here instead of leaving queue.join() waiting forever
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, options.concurrency))]
+    join = asyncio.create_task(queue.join())
+    try:
+        await asyncio.wait([join, *workers], return_when=asyncio.FIRST_COMPLETED)
+        for w in workers:
+            if w.done():
+                w.result()
+    finally:
+        for t in (join, *workers):
+            t.cancel()
+        await asyncio.gather(join, *workers, return_exceptions=True)
+
+    stats.update(_window_stats(windows, arrivals))
+    return [found[k] for k in sorted(found)], stats
@@ -0,0 +1,263 @@
+# src/bacnet_scanner/enumerate_points.py
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import io
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.bacnet_scanner.devices_io import iter_devices, output_path, write_devices
+from src.bacnet_scanner.inventory import needs_probe
+from src.bacnet_scanner.objects import (
+    POINTS_HEADER,
+    DeviceResult,
+    EnumerationOptions,
+    ReadError,
+    enumerate_devices,
+    point_rows,
+)
+from src.bacnet_scanner.simulator import SimulatedNetwork
+from src.utils.config_io import load_config
+from src.utils.safe_write import atomic_write_chunks
+
+# bacpypes3 abort/reject/error reasons -> ReadError kinds
+_REASON_KINDS = {
+    "unrecognized-service": "unsupported",
+    "segmentation-not-supported": "too-big",
+    "buffer-overflow": "too-big",
+    "no-response": "timeout",
+    "unknown-property": "unknown-property",
+}
+
+
+def _die(msg: str) -> None:
+    raise SystemExit(f"[ERROR] {msg}")
+
+
+def _read_error(response: Any) -> ReadError:
+    reason = getattr(response, "errorCode", None) or getattr(response, "reason", None) or response
+    text = str(reason)
+    return ReadError(_REASON_KINDS.get(text, "error"), text)
+
+
+class Bacpypes3Reader:
+    """
+    objects.Read / objects.ReadMultiple on top of a bacpypes3 application
+    (BAC0's bacnet.this_application.app), which returns error, reject and
+    abort PDUs instead of raising them.
+    """
+
+    def __init__(self, app: Any) -> None:
+        from bacpypes3.apdu import ErrorRejectAbortNack
+
+        self.app = app
+        self._nack = ErrorRejectAbortNack
+
+    async def read(self, address: str, object_id: str, prop: str, index: Optional[int] = None) -> Any:
+        try:
+            value = await self.app.read_property(address, object_id, prop, array_index=index)
+        except self._nack as e:
+            raise _read_error(e)
+        if isinstance(value, self._nack):
+            raise _read_error(value)
+        return value
+
+    async def read_multiple(self, address: str, specs: List[Tuple[str, List[str]]]) -> Dict[Tuple[str, str], Any]:
+        parameters: List[Any] = []
+        for object_id, props in specs:
+            parameters.extend([object_id, list(props)])
+        try:
+            response = await self.app.read_property_multiple(address, parameters)
+        except self._nack as e:
+            raise _read_error(e)
+        if isinstance(response, self._nack) or response is None:
+            raise _read_error(response)
+        out: Dict[Tuple[str, str], Any] = {}
+        for object_id, prop, _index, value in response:
+            if value is not None and hasattr(value, "errorCode"):
+                value = _read_error(value)
+            out[(str(object_id), str(prop))] = value
+        return out
+
+
+def _load_probed(path: Path) -> Dict[int, DeviceResult]:
+    """Per-device results from an earlier objects.json, by device instance."""
+    if not path.exists():
+        return {}
+    try:
+        return {int(d["instance"]): DeviceResult(**d) for d in iter_devices(path)}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def plan_probes(
+    records: List[Dict[str, Any]], probed: Dict[int, DeviceResult], now: float, probe_ttl_seconds: float
+) -> Tuple[List[Dict[str, Any]], List[DeviceResult], Dict[str, int]]:
+    """
+    Split devices.json records into those to enumerate again and previous
+    results to keep. Silent devices keep their last result (they would only
+    time out); reasons are counted for the summary.
+    """
+    todo: List[Dict[str, Any]] = []
+    kept: List[DeviceResult] = []
+    reasons: Dict[str, int] = {}
+    for rec in records:
+        if rec.get("device_instance") is None or not rec.get("address"):
+            continue
+        prev = probed.get(int(rec["device_instance"]))
+        if rec.get("silent") and prev is None:
+            reasons["silent"] = reasons.get("silent", 0) + 1
+            continue
+        reason = None
+        if not rec.get("silent"):
+            reason = needs_probe(rec, asdict(prev) if prev is not None else None, now, probe_ttl_seconds)
+        if reason is None:
+            kept.append(prev)
+            reasons["unchanged"] = reasons.get("unchanged", 0) + 1
+        else:
+            todo.append(rec)
+            reasons[reason] = reasons.get(reason, 0) + 1
+    return todo, kept, reasons
+
+
+def _csv_chunks(rows: List[List[str]], batch: int = 2000) -> Iterator[str]:
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(POINTS_HEADER)
+    for i in range(0, len(rows), batch):
+        w.writerows(rows[i : i + batch])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+async def _enumerate_live(
+    local_ip: str, port: int, records: List[Dict[str, Any]], options: EnumerationOptions
+) -> Tuple[List[DeviceResult], Dict[str, Any]]:
+    import BAC0
+
+    bacnet = BAC0.lite(ip=local_ip, port=port)
+    try:
+        await asyncio.sleep(0.5)  # allow stack to bind + start tasks
+        reader = Bacpypes3Reader(bacnet.this_application.app)
+        return await enumerate_devices(reader.read, reader.read_multiple, records, options)
+    finally:
+        try:
+            task = bacnet.disconnect()
+            if task is not None:
+                await task
+        except Exception:
+            pass
+
+
+async def async_main(args: argparse.Namespace) -> int:
+    cfg = load_config(Path(args.config))
+    network = cfg.get("network", {})
+    safety = cfg.get("safety", {})
+    output = cfg.get("output", {})
+    enumeration = cfg.get("enumeration", {}) or {}
+    incremental_cfg = cfg.get("incremental", {}) or {}
+    options = EnumerationOptions.from_config(enumeration)
+
+    default_devices, _ = output_path(output)
+    devices_path = Path(args.devices) if args.devices else default_devices
+    points_path = Path(args.out) if args.out else default_devices.parent / str(
+        output.get("points_filename", "points_from_bacnet.csv")
+    )
+    objects_name, ndjson = output_path(output, "objects_filename", "objects")
+    objects_path = points_path.parent / objects_name.name
+
+    if not devices_path.exists():
+        _die(f"Devices file not found: {devices_path} (run src.bacnet_scanner.cli first)")
+    records = list(iter_devices(devices_path))
+    if not records:
+        _die(f"No devices in {devices_path}")
+
+    incremental = bool(incremental_cfg.get("enabled", False)) if args.incremental is None else args.incremental
+    probe_ttl = float(incremental_cfg.get("probe_ttl_hours", 168)) * 3600.0
+    kept: List[DeviceResult] = []
+    reasons: Dict[str, int] = {}
+    todo = [r for r in records if not r.get("silent")]  # silent: missed the last scan, would only time out
+    if incremental:
+        todo, kept, reasons = plan_probes(records, _load_probed(objects_path), time.time(), probe_ttl)
+
+    simulate = args.simulate or bool(safety.get("offline_mode", False))
+    print("[INFO] BACnet point enumeration starting")
+    print(f"       devices={devices_path} ({len(records)} records)")
+    print(
+        f"       simulate={simulate} device_concurrency={options.device_concurrency} "
+        f"network_concurrency={options.network_concurrency} devices_in_flight={options.devices_in_flight}"
+    )
+    if incremental:
+        print(f"       incremental: probing {len(todo)}, keeping {len(kept)} ({reasons})")
+
+    if not todo:
+        results: List[DeviceResult] = []
+        stats: Dict[str, Any] = {
+            "devices": 0,
+            "devices_failed": 0,
+            "devices_without_rpm": 0,
+            "objects": 0,
+            "points": 0,
+            "requests": 0,
+            "seconds": 0.0,
+        }
+    elif simulate:
+        sim = SimulatedNetwork.for_records(records, objects=int(enumeration.get("simulated_objects", 60)))
+        results, stats = await enumerate_devices(sim.read, sim.read_multiple, todo, options)
+    else:
+        local_ip = str(network.get("local_ip", "")).strip()
+        if not local_ip:
+            _die("network.local_ip is required for live enumeration (or use --simulate).")
+        results, stats = await _enumerate_live(local_ip, int(network.get("bacnet_port", 47808)), todo, options)
+    if incremental:
+        stats["probe_reasons"] = reasons
+        stats["devices_kept"] = len(kept)
+        results = sorted(results + kept, key=lambda r: r.instance)
+
+    rows = point_rows(results, options.point_types)
+    atomic_write_chunks(points_path, _csv_chunks(rows))
+    meta = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "simulated": simulate, "enumeration": stats}
+    write_devices(objects_path, meta, (asdict(r) for r in results), ndjson)
+
+    print(
+        f"[INFO] probed {stats['devices']} devices, {stats['objects']} objects, {stats['points']} points "
+        f"in {stats['seconds']}s ({stats['requests']} requests; {stats['devices_without_rpm']} devices without RPM)"
+    )
+    for r in results:
+        if r.error:
+            print(f"[WARN] device {r.instance} @ {r.address}: {r.error}")
+    print(f"[OK] Wrote: {points_path} ({len(rows)} points)")
+    print(f"[OK] Wrote: {objects_path}")
+    return 2 if stats["devices_failed"] else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Read each discovered device's object list and write a points CSV (Metasys import template format)."
+    )
+    ap.add_argument("--config", required=True, help="Path to YAML config.")
+    ap.add_argument("--devices", default="", help="devices.json to enumerate (default: the scanner's output).")
+    ap.add_argument("--out", default="", help="Points CSV to write (default: output.points_filename).")
+    ap.add_argument("--simulate", action="store_true", help="Read from simulated devices instead of the network.")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental",
+        dest="incremental",
+        action="store_true",
+        default=None,
+        help="Only probe new, moved, failed or stale devices; keep the rest from the previous objects.json.",
+    )
+    mode.add_argument("--full", dest="incremental", action="store_false", help="Probe every device.")
+    args = ap.parse_args()
+    return asyncio.run(async_main(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+# src/bacnet_scanner/inventory.py
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.bacnet_scanner.devices_io import iter_devices, read_meta
+
+Record = Dict[str, Any]
+Change = Dict[str, Any]
+
+
+def utc_iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_ts(value: Any) -> Optional[float]:
+    """Epoch seconds from a utc_iso() string (None if missing or malformed)."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+def load_previous(path: Path) -> List[Record]:
+    """
+    Devices from an earlier devices.json; empty if there is none or it is
+    unreadable, or if that scan failed without carrying an inventory over
+    (its empty list would look like everything disappeared).
+    """
+    if not path.exists():
+        return []
+    try:
+        meta = read_meta(path)
+        if meta.get("status") != "ok" and not meta.get("carried_over"):
+            return []
+        return [d for d in iter_devices(path) if isinstance(d, dict)]
+    except (OSError, ValueError):
+        return []
+
+
+def merge_inventory(
+    previous: List[Record], found: List[Record], now: float, missing_ttl_seconds: float
+) -> Tuple[List[Record], List[Change]]:
+    """
+    This scan's devices merged into the previous inventory, keyed by device
+    instance. Each record carries first_seen / last_seen; devices that did not
+    answer stay listed (marked silent) until they have been silent for
+    missing_ttl_seconds.
+
+    Changes: added (new instance), moved (address changed), removed (silent
+    past the TTL). A device that comes back after removal counts as added.
+    Records without a device instance are passed through unchanged, after the
+    merged ones, and are not tracked.
+    """
+    stamp = utc_iso(now)
+    before = {r["device_instance"]: r for r in previous if r.get("device_instance") is not None}
+    merged: Dict[int, Record] = {}
+    changes: List[Change] = []
+    unkeyed: List[Record] = []
+
+    for rec in found:
+        instance = rec.get("device_instance")
+        if instance is None:
+            unkeyed.append(rec)
+            continue
+        old = before.get(instance)
+        rec = dict(rec)
+        rec.pop("silent", None)
+        rec["last_seen"] = stamp
+        if old is None:
+            rec["first_seen"] = stamp
+            changes.append({"change": "added", "device_instance": instance, "address": rec.get("address")})
+        else:
+            rec["first_seen"] = old.get("first_seen") or stamp
+            if old.get("address") != rec.get("address"):
+                changes.append(
+                    {
+                        "change": "moved",
+                        "device_instance": instance,
+                        "address": rec.get("address"),
+                        "previous_address": old.get("address"),
+                    }
+                )
+            # keep what only the previous scan knew (e.g. names from a mock list)
+            for k, v in old.items():
+                if k != "silent":
+                    rec.setdefault(k, v)
+        merged[instance] = rec
+
+    for instance, old in before.items():
+        if instance in merged:
+            continue
+        last = parse_ts(old.get("last_seen"))
+        if last is not None and now - last <= missing_ttl_seconds:
+            merged[instance] = dict(old, silent=True)
+            continue
+        changes.append(
+            {
+                "change": "removed",
+                "device_instance": instance,
+                "address": old.get("address"),
+                "last_seen": old.get("last_seen"),
+            }
+        )
+
+    return [merged[k] for k in sorted(merged)] + unkeyed, changes
+
+
+def needs_probe(record: Record, probed: Optional[Record], now: float, probe_ttl_seconds: float) -> Optional[str]:
+    """
+    Why a device needs a detailed probe (object-list enumeration), or None if
+    the previous probe still stands: new, moved, last probe failed or went
+    stale.
+    """
+    if probed is None:
+        return "new"
+    if probed.get("address") != record.get("address"):
+        return "moved"
+    if probed.get("error"):
+        return "failed"
+    at = parse_ts(probed.get("probed_at"))
+    if at is None or now - at > probe_ttl_seconds:
+        return "stale"
+    return None
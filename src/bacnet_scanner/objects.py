@@ -0,0 +1,381 @@
+# src/bacnet_scanner/objects.py
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.bacnet_scanner.inventory import utc_iso
+
+# Points CSV columns, same order as metasys_points_import_template.csv.
+POINTS_HEADER = [
+    "asset_id",
+    "asset_name",
+    "point_id",
+    "point_name",
+    "data_type",
+    "tier",
+    "deadband",
+    "min_publish_seconds",
+    "source_ref",
+]
+
+# object type -> (point_id abbreviation, data_type, suggested tier).
+# Inputs are what the plant is doing (tier 1), commands and setpoints are
+# context (tier 2), bookkeeping values are tier 3. Other object types
+# (schedules, trend logs, notification classes, ...) are not points.
+POINT_TYPES: Dict[str, Tuple[str, str, int]] = {
+    "analog-input": ("AI", "float", 1),
+    "analog-output": ("AO", "float", 2),
+    "analog-value": ("AV", "float", 2),
+    "binary-input": ("BI", "bool", 1),
+    "binary-output": ("BO", "bool", 1),
+    "binary-value": ("BV", "bool", 2),
+    "multi-state-input": ("MSI", "enum", 2),
+    "multi-state-output": ("MSO", "enum", 2),
+    "multi-state-value": ("MSV", "enum", 2),
+    "large-analog-value": ("LAV", "float", 3),
+    "integer-value": ("IV", "int", 3),
+    "positive-integer-value": ("PIV", "int", 3),
+    "accumulator": ("ACC", "int", 3),
+    "pulse-converter": ("PC", "float", 3),
+    "characterstring-value": ("CSV", "string", 3),
+}
+
+DEVICE_PROPERTIES = ["object-name", "vendor-name", "model-name"]
+POINT_PROPERTIES = ["object-name", "description"]
+
+# Encoded-size estimates for an RPM request/response (bytes). Names are
+# rarely longer than 40 characters; descriptions get the same allowance.
+_APDU_HEADER = 16
+_OBJECT_OVERHEAD = 8
+_PROPERTY_OVERHEAD = 4
+_STRING_ALLOWANCE = 44
+# Without knowing a device's max-segments-accepted, assume a modest 16.
+_ASSUMED_SEGMENTS = 16
+
+
+class ReadError(Exception):
+    """
+    A read the device answered with an error, reject or abort (or never answered).
+    kind: "unsupported" (service not implemented), "too-big" (response does not
+    fit without segmentation), "timeout", "unknown-property", or "error".
+    """
+
+    def __init__(self, kind: str, detail: str = "") -> None:
+        super().__init__(f"{kind}: {detail}" if detail else kind)
+        self.kind = kind
+        self.detail = detail
+
+
+# Object identifiers are "type,instance" strings, e.g. "analog-input,3".
+# read(address, object_id, property, array_index) -> value
+Read = Callable[[str, str, str, Optional[int]], Awaitable[Any]]
+# read_multiple(address, [(object_id, [property, ...]), ...]) -> {(object_id, property): value or ReadError}
+ReadMultiple = Callable[[str, List[Tuple[str, List[str]]]], Awaitable[Dict[Tuple[str, str], Any]]]
+
+
+@dataclass
+class EnumerationOptions:
+    device_concurrency: int = 2  # requests in flight to one device
+    network_concurrency: int = 8  # requests in flight through one router/network
+    devices_in_flight: int = 16  # devices being enumerated at once
+    max_objects_per_request: int = 50  # RPM ceiling even when the APDU would allow more
+    retries: int = 1  # extra attempts after a timeout
+    point_types: Dict[str, Tuple[str, str, int]] = field(default_factory=lambda: dict(POINT_TYPES))
+
+    @classmethod
+    def from_config(cls, enumeration: Dict[str, Any]) -> "EnumerationOptions":
+        d = cls()
+        return cls(
+            device_concurrency=int(enumeration.get("device_concurrency", d.device_concurrency)),
+            network_concurrency=int(enumeration.get("network_concurrency", d.network_concurrency)),
+            devices_in_flight=int(enumeration.get("devices_in_flight", d.devices_in_flight)),
+            max_objects_per_request=int(enumeration.get("max_objects_per_request", d.max_objects_per_request)),
+            retries=int(enumeration.get("retries", d.retries)),
+        )
+
+
+def network_of(address: str) -> str:
+    """
+    Routing key for concurrency limits: "net:mac" addresses (behind a router)
+    share their network number, everything else is the local network.
+    """
+    head, sep, _ = str(address).partition(":")
+    return f"net {head}" if sep and head.isdigit() else "local"
+
+
+def objects_per_request(max_apdu: Any, segmentation: Any, properties: int, ceiling: int) -> int:
+    """
+    How many objects one ReadPropertyMultiple can ask for before the response
+    outgrows what the device can send: one APDU unsegmented, a few segments
+    if it can segment its responses.
+    """
+    try:
+        apdu = int(max_apdu)
+    except (TypeError, ValueError):
+        apdu = 480  # smallest common size (MS/TP)
+    seg = str(segmentation or "").replace("-", "").lower()
+    if seg in ("segmentedboth", "segmentedtransmit"):
+        apdu *= _ASSUMED_SEGMENTS
+    per_object = _OBJECT_OVERHEAD + properties * (_PROPERTY_OVERHEAD + _STRING_ALLOWANCE)
+    return max(1, min(ceiling, (apdu - _APDU_HEADER) // per_object))
+
+
+def _text(value: Any) -> str:
+    if value is None or isinstance(value, ReadError):
+        return ""
+    return str(value).strip()
+
+
+@dataclass
+class DeviceResult:
+    instance: int
+    address: str
+    name: str = ""
+    vendor: str = ""
+    model: str = ""
+    objects: List[str] = field(default_factory=list)  # every object in the object list
+    points: Dict[str, Dict[str, str]] = field(default_factory=dict)  # object_id -> properties
+    rpm: Optional[bool] = None  # None: never tried
+    requests: int = 0
+    seconds: float = 0.0
+    probed_at: str = ""
+    error: Optional[str] = None
+
+
+class _Limits:
+    """
+    One semaphore per device and one per network, always taken device first:
+    a read waiting on its device's limit must not hold a slot on the shared
+    network (router) meanwhile.
+    """
+
+    def __init__(self, options: EnumerationOptions) -> None:
+        self.options = options
+        self._device: Dict[str, asyncio.Semaphore] = {}
+        self._network: Dict[str, asyncio.Semaphore] = {}
+
+    def for_address(self, address: str) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        """(device, network) semaphores, in the order they are to be acquired."""
+        net = network_of(address)
+        if net not in self._network:
+            self._network[net] = asyncio.Semaphore(max(1, self.options.network_concurrency))
+        if address not in self._device:
+            self._device[address] = asyncio.Semaphore(max(1, self.options.device_concurrency))
+        return self._device[address], self._network[net]
+
+
+class _DeviceReader:
+    """
+    Reads for one device: bounded by _Limits, retried on timeout, and using
+    ReadPropertyMultiple until the device shows it does not support it.
+    """
+
+    def __init__(
+        self,
+        read: Read,
+        read_multiple: Optional[ReadMultiple],
+        limits: _Limits,
+        result: DeviceResult,
+        max_apdu: Any,
+        segmentation: Any,
+    ) -> None:
+        self._read = read
+        self._read_multiple = read_multiple
+        self._limits = limits
+        self.result = result
+        self.max_apdu = max_apdu
+        self.segmentation = segmentation
+        if read_multiple is None:
+            result.rpm = False
+
+    async def _call(self, make: Callable[[], Awaitable[Any]]) -> Any:
+        device, network = self._limits.for_address(self.result.address)
+        attempts = 1 + max(0, self._limits.options.retries)
+        for attempt in range(attempts):
+            async with device, network:
+                self.result.requests += 1
+                try:
+                    return await make()
+                except ReadError as e:
+                    if e.kind != "timeout" or attempt == attempts - 1:
+                        raise
+
+    async def read(self, object_id: str, prop: str, index: Optional[int] = None) -> Any:
+        return await self._call(lambda: self._read(self.result.address, object_id, prop, index))
+
+    async def read_each(self, specs: List[Tuple[str, List[str]]]) -> Dict[Tuple[str, str], Any]:
+        """
+        One ReadProperty per (object, property), device concurrency permitting.
+        A property the object lacks comes back as its ReadError.
+        """
+        keys = [(obj, prop) for obj, props in specs for prop in props]
+
+        async def one(obj: str, prop: str) -> Any:
+            try:
+                return await self.read(obj, prop)
+            except ReadError as e:
+                if e.kind in ("unsupported", "too-big"):
+                    raise
+                return e
+
+        values = await asyncio.gather(*(one(obj, prop) for obj, prop in keys))
+        return dict(zip(keys, values))
+
+    async def read_props(self, specs: List[Tuple[str, List[str]]]) -> Dict[Tuple[str, str], Any]:
+        """
+        Properties for many objects, in as few requests as the device allows.
+        A chunk that comes back too big is halved and asked again.
+        """
+        if self.result.rpm is False:
+            return await self.read_each(specs)
+        props = max((len(p) for _, p in specs), default=1)
+        size = objects_per_request(
+            self.max_apdu, self.segmentation, props, self._limits.options.max_objects_per_request
+        )
+        chunks = [specs[i : i + size] for i in range(0, len(specs), size)]
+        out: Dict[Tuple[str, str], Any] = {}
+
+        async def chunk(part: List[Tuple[str, List[str]]]) -> None:
+            if self.result.rpm is False:
+                out.update(await self.read_each(part))
+                return
+            try:
+                out.update(await self._call(lambda: self._read_multiple(self.result.address, part)))
+                self.result.rpm = True
+            except ReadError as e:
+                if e.kind == "unsupported":
+                    self.result.rpm = False
+                    out.update(await self.read_each(part))
+                elif e.kind == "too-big" and len(part) > 1:
+                    half = len(part) // 2
+                    await asyncio.gather(chunk(part[:half]), chunk(part[half:]))
+                elif e.kind == "too-big":
+                    out.update(await self.read_each(part))
+                else:
+                    raise
+
+        await asyncio.gather(*(chunk(c) for c in chunks))
+        return out
+
+    async def object_list(self, device_id: str) -> List[str]:
+        """
+        The whole object-list in one read; if that does not fit (no
+        segmentation), its length (index 0) and then one read per entry.
+        """
+        try:
+            return [str(o) for o in await self.read(device_id, "object-list")]
+        except ReadError as e:
+            if e.kind != "too-big":
+                raise
+        count = int(await self.read(device_id, "object-list", 0))
+        entries = await asyncio.gather(*(self.read(device_id, "object-list", i) for i in range(1, count + 1)))
+        return [str(o) for o in entries]
+
+
+async def enumerate_device(
+    read: Read,
+    read_multiple: Optional[ReadMultiple],
+    record: Dict[str, Any],
+    options: EnumerationOptions,
+    limits: Optional[_Limits] = None,
+) -> DeviceResult:
+    """
+    Object list, device name and point names/descriptions for one devices.json
+    record. Errors end up in result.error rather than being raised.
+    """
+    instance = int(record["device_instance"])
+    result = DeviceResult(instance=instance, address=str(record.get("address") or ""))
+    reader = _DeviceReader(
+        read, read_multiple, limits or _Limits(options), result, record.get("max_apdu"), record.get("segmentation")
+    )
+    device_id = f"device,{instance}"
+    result.probed_at = utc_iso(time.time())
+    started = time.monotonic()
+    try:
+        info = await reader.read_props([(device_id, DEVICE_PROPERTIES)])
+        result.name = _text(info.get((device_id, "object-name")))
+        result.vendor = _text(info.get((device_id, "vendor-name"))) or str(record.get("vendor_name") or "")
+        result.model = _text(info.get((device_id, "model-name"))) or str(record.get("model_name") or "")
+
+        result.objects = await reader.object_list(device_id)
+        wanted = [o for o in result.objects if o.partition(",")[0] in options.point_types]
+        values = await reader.read_props([(o, POINT_PROPERTIES) for o in wanted])
+        for o in wanted:
+            result.points[o] = {p: _text(values.get((o, p))) for p in POINT_PROPERTIES}
+    except ReadError as e:
+        result.error = str(e)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = round(time.monotonic() - started, 3)
+    return result
+
+
+async def enumerate_devices(
+    read: Read,
+    read_multiple: Optional[ReadMultiple],
+    records: Iterable[Dict[str, Any]],
+    options: EnumerationOptions,
+) -> Tuple[List[DeviceResult], Dict[str, Any]]:
+    """
+    enumerate_device() for every record with an instance and address, at most
+    options.devices_in_flight at a time. Results come back sorted by instance.
+    """
+    limits = _Limits(options)
+    gate = asyncio.Semaphore(max(1, options.devices_in_flight))
+    todo = [r for r in records if r.get("device_instance") is not None and r.get("address")]
+
+    async def one(record: Dict[str, Any]) -> DeviceResult:
+        async with gate:
+            return await enumerate_device(read, read_multiple, record, options, limits)
+
+    started = time.monotonic()
+    results = sorted(await asyncio.gather(*(one(r) for r in todo)), key=lambda r: r.instance)
+    stats = {
+        "devices": len(results),
+        "devices_failed": sum(1 for r in results if r.error),
+        "devices_without_rpm": sum(1 for r in results if r.rpm is False),
+        "objects": sum(len(r.objects) for r in results),
+        "points": sum(len(r.points) for r in results),
+        "requests": sum(r.requests for r in results),
+        "seconds": round(time.monotonic() - started, 2),
+    }
+    return results, stats
+
+
+def _object_sort_key(object_id: str) -> Tuple[str, int]:
+    obj_type, _, obj_inst = object_id.partition(",")
+    return obj_type, int(obj_inst) if obj_inst.isdigit() else -1
+
+
+def point_rows(
+    results: Iterable[DeviceResult], point_types: Optional[Dict[str, Tuple[str, str, int]]] = None
+) -> List[List[str]]:
+    """
+    Points CSV rows (POINTS_HEADER order): one asset per device, one point per
+    object, with data_type and tier suggested from the object type.
+    """
+    types = point_types or POINT_TYPES
+    rows: List[List[str]] = []
+    for r in results:
+        asset_id = f"BACNET_{r.instance}"
+        asset_name = r.name or f"Device {r.instance}"
+        for object_id, props in sorted(r.points.items(), key=lambda kv: _object_sort_key(kv[0])):
+            obj_type, _, obj_inst = object_id.partition(",")
+            abbr, data_type, tier = types[obj_type]
+            rows.append(
+                [
+                    asset_id,
+                    asset_name,
+                    f"{asset_id}-{abbr}{obj_inst}",
+                    props.get("object-name") or props.get("description") or object_id,
+                    data_type,
+                    str(tier),
+                    "",
+                    "",
+                    f"bacnet:{r.instance}/{obj_type}:{obj_inst}",
+                ]
+            )
+    return rows
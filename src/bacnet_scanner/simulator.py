@@ -0,0 +1,233 @@
+# src/bacnet_scanner/simulator.py
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.bacnet_scanner.objects import ReadError
+
+# Rough encoded sizes used to decide whether a response fits (bytes).
+_HEADER = 8
+_OBJECT_ID = 5
+_PROPERTY = 4
+_MAX_SEGMENTS = 16
+
+# (object type, share of a device's objects, name stems)
+_MIX: List[Tuple[str, float, List[str]]] = [
+    ("analog-input", 0.30, ["Supply Temp", "Return Temp", "Flow", "Pressure", "Power"]),
+    ("analog-output", 0.10, ["Valve Cmd", "Speed Cmd", "Damper Cmd"]),
+    ("analog-value", 0.15, ["Setpoint", "Offset", "Limit"]),
+    ("binary-input", 0.15, ["Run Status", "Alarm", "Flow Switch"]),
+    ("binary-output", 0.08, ["Start Stop", "Enable"]),
+    ("binary-value", 0.05, ["Occupied", "Override"]),
+    ("multi-state-value", 0.05, ["Mode", "Stage"]),
+    ("schedule", 0.04, ["Occupancy Schedule"]),
+    ("trend-log", 0.06, ["Trend"]),
+    ("notification-class", 0.02, ["Alarms"]),
+]
+
+
+@dataclass
+class SimDevice:
+    """
+    One simulated BACnet device: its objects and properties, and the service
+    limits a real controller has.
+    """
+
+    instance: int
+    address: str
+    name: str
+    vendor: str = "Simulated"
+    model: str = "SIM-1"
+    max_apdu: int = 1476
+    segmentation: str = "segmentedBoth"
+    rpm: bool = True  # supports ReadPropertyMultiple
+    latency: float = 0.005  # seconds per request
+    max_concurrent: int = 4  # requests it can work on at once; more time out
+    objects: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def segmented(self) -> bool:
+        return self.segmentation in ("segmentedBoth", "segmentedTransmit")
+
+    def record(self) -> Dict[str, Any]:
+        """devices.json record, as discovery would write it."""
+        return {
+            "device_instance": self.instance,
+            "address": self.address,
+            "vendor_id": 999,
+            "max_apdu": self.max_apdu,
+            "segmentation": self.segmentation,
+        }
+
+
+def build_device(instance: int, address: str, objects: int, seed: Optional[int] = None, **limits: Any) -> SimDevice:
+    """
+    A device with `objects` objects in a typical controller mix (plus the
+    device object), named deterministically from `seed` (default: instance).
+    """
+    rng = random.Random(instance if seed is None else seed)
+    dev = SimDevice(instance=instance, address=address, name=f"SIM-{instance}", **limits)
+    device_id = f"device,{instance}"
+    object_list = [device_id]
+    for obj_type, share, stems in _MIX:
+        for i in range(1, max(1, round(objects * share)) + 1):
+            object_id = f"{obj_type},{i}"
+            stem = rng.choice(stems)
+            dev.objects[object_id] = {
+                "object-name": f"{dev.name}.{stem.replace(' ', '-')}-{i}",
+                "description": f"{stem} {i}",
+            }
+            object_list.append(object_id)
+    dev.objects[device_id] = {
+        "object-name": dev.name,
+        "vendor-name": dev.vendor,
+        "model-name": dev.model,
+        "object-list": object_list,
+    }
+    return dev
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, list):
+        return _OBJECT_ID * len(value)
+    return _PROPERTY + len(str(value))
+
+
+class SimulatedNetwork:
+    """
+    In-process stand-in for a BACnet internetwork, with the read() and
+    read_multiple() signatures objects.enumerate_devices() expects.
+
+    Requests take `latency` per device; a device answers "unsupported" to RPM
+    if it lacks it, "too-big" when a response would not fit its APDU (or 16
+    segments), and "timeout" when more than max_concurrent requests reach it.
+    """
+
+    def __init__(self, devices: Iterable[SimDevice]) -> None:
+        self.devices: Dict[str, SimDevice] = {d.address: d for d in devices}
+        self.requests = 0
+        self.rpm_requests = 0
+        self.timeouts = 0
+        self.peak_per_device: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+
+    @classmethod
+    def for_records(cls, records: Iterable[Dict[str, Any]], objects: int = 60) -> "SimulatedNetwork":
+        """Simulated devices matching devices.json records (e.g. offline mock_devices)."""
+        devices = []
+        for r in records:
+            if r.get("device_instance") is None or not r.get("address"):
+                continue
+            limits = {k: r[k] for k in ("max_apdu", "segmentation") if r.get(k) is not None}
+            dev = build_device(int(r["device_instance"]), str(r["address"]), objects, **limits)
+            dev.vendor = str(r.get("vendor_name") or dev.vendor)
+            dev.model = str(r.get("model_name") or dev.model)
+            dev.objects[f"device,{dev.instance}"].update({"vendor-name": dev.vendor, "model-name": dev.model})
+            devices.append(dev)
+        return cls(devices)
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [d.record() for d in sorted(self.devices.values(), key=lambda d: d.instance)]
+
+    async def _serve(self, address: str) -> SimDevice:
+        dev = self.devices.get(address)
+        self.requests += 1
+        if dev is None:
+            await asyncio.sleep(0.05)
+            raise ReadError("timeout", f"no device at {address}")
+        active = self._active.get(address, 0) + 1
+        self._active[address] = active
+        self.peak_per_device[address] = max(self.peak_per_device.get(address, 0), active)
+        try:
+            await asyncio.sleep(dev.latency)
+        finally:
+            self._active[address] -= 1
+        if active > dev.max_concurrent:
+            self.timeouts += 1
+            raise ReadError("timeout", f"{address} is busy")
+        return dev
+
+    def _fits(self, dev: SimDevice, size: int) -> bool:
+        return size <= dev.max_apdu * (_MAX_SEGMENTS if dev.segmented else 1)
+
+    def _value(self, dev: SimDevice, object_id: str, prop: str, index: Optional[int]) -> Any:
+        props = dev.objects.get(object_id)
+        if props is None:
+            raise ReadError("error", f"unknown object {object_id}")
+        if prop not in props:
+            raise ReadError("unknown-property", f"{object_id} has no {prop}")
+        value = props[prop]
+        if index is None:
+            return value
+        if not isinstance(value, list):
+            raise ReadError("error", f"{prop} is not an array")
+        if index == 0:
+            return len(value)
+        if not 1 <= index <= len(value):
+            raise ReadError("error", f"{prop}[{index}] out of range")
+        return value[index - 1]
+
+    async def read(self, address: str, object_id: str, prop: str, index: Optional[int] = None) -> Any:
+        dev = await self._serve(address)
+        value = self._value(dev, object_id, prop, index)
+        if not self._fits(dev, _HEADER + _size(value)):
+            raise ReadError("too-big", "segmentation-not-supported")
+        return value
+
+    async def read_multiple(self, address: str, specs: List[Tuple[str, List[str]]]) -> Dict[Tuple[str, str], Any]:
+        dev = await self._serve(address)
+        if not dev.rpm:
+            raise ReadError("unsupported", "unrecognized-service")
+        self.rpm_requests += 1
+        out: Dict[Tuple[str, str], Any] = {}
+        size = _HEADER
+        for object_id, props in specs:
+            size += _OBJECT_ID
+            for prop in props:
+                try:
+                    out[(object_id, prop)] = value = self._value(dev, object_id, prop, None)
+                    size += _size(value)
+                except ReadError as e:
+                    out[(object_id, prop)] = e
+                    size += _PROPERTY + 2
+        if not self._fits(dev, size):
+            raise ReadError("too-big", "segmentation-not-supported")
+        return out
+
+
+def build_site(
+    devices: int,
+    objects: int,
+    seed: int = 1,
+    routed_share: float = 0.3,
+    latency: float = 0.005,
+    routed_latency: float = 0.04,
+) -> SimulatedNetwork:
+    """
+    A mixed site: IP controllers (big APDU, segmentation, RPM) plus a
+    `routed_share` of MS/TP devices behind routers (480-byte APDU, no
+    segmentation, some without RPM, two requests at a time, slower).
+    """
+    rng = random.Random(seed)
+    out: List[SimDevice] = []
+    for n in range(devices):
+        instance = 100000 + n
+        if rng.random() < routed_share:
+            net = 1000 + n % 4
+            dev = build_device(
+                instance,
+                f"{net}:{n % 127 + 1}",
+                max(5, objects // 3),
+                max_apdu=480,
+                segmentation="noSegmentation",
+                rpm=rng.random() < 0.6,
+                latency=routed_latency,
+                max_concurrent=2,
+            )
+        else:
+            dev = build_device(instance, f"10.0.{n // 250}.{n % 250 + 1}", objects, latency=latency)
+        out.append(dev)
+    return SimulatedNetwork(out)
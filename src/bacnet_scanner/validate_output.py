@@ -3,21 +3,71 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
+from typing import Any, Dict, List, Tuple
 
-from jsonschema import validate
+from src.bacnet_scanner.devices_io import is_ndjson, iter_records
+from src.schema_validate import validator_for
+
+
+def _messages(validator: Any, instance: Any, where: str) -> List[str]:
+    if validator.is_valid(instance):  # the common case, without building error objects
+        return []
+    out = []
+    for e in sorted(validator.iter_errors(instance), key=lambda e: list(e.path)):
+        path = ".".join(str(p) for p in e.path) or "<root>"
+        out.append(f"{where} {path}: {e.message}")
+    return out
+
+
+def validate_devices_file(
+    path: Path, schema_path: Path, max_errors: int = 50
+) -> Tuple[Dict[str, Any], int, List[str]]:
+    """
+    Validate a devices output file against the schema, one record at a time
+    for NDJSON (meta header against properties.meta, each device against
+    properties.devices.items), so memory stays flat however many devices
+    there are. Returns (meta, device count, first max_errors errors).
+    """
+    schema = str(schema_path)
+    if not is_ndjson(path):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        errors = _messages(validator_for(schema), data, "document")
+        return data.get("meta") or {}, len(data.get("devices") or []), errors[:max_errors]
+
+    meta_validator = validator_for(schema, "properties", "meta")
+    device_validator = validator_for(schema, "properties", "devices", "items")
+    meta: Dict[str, Any] = {}
+    devices = 0
+    errors: List[str] = []
+    for line, kind, obj in iter_records(path):
+        if kind == "meta":
+            meta = obj
+            errors.extend(_messages(meta_validator, obj, f"line {line} meta"))
+        else:
+            devices += 1
+            errors.extend(_messages(device_validator, obj, f"line {line} device"))
+        if len(errors) >= max_errors:
+            break
+    if not meta:
+        errors.append("missing meta header")
+    return meta, devices, errors[:max_errors]
 
 
 def main() -> int:
-    ap = argparse.ArgumentParser(description="Validate BACnet devices.json against schema")
-    ap.add_argument("--json", required=True, help="Path to devices.json")
+    ap = argparse.ArgumentParser(description="Validate BACnet devices.json (or devices.ndjson) against schema")
+    ap.add_argument("--json", required=True, help="Path to devices.json / devices.ndjson")
     ap.add_argument("--schema", default="schemas/bacnet_devices_output.schema.json")
     args = ap.parse_args()
 
-    data = json.loads(Path(args.json).read_text(encoding="utf-8"))
-    schema = json.loads(Path(args.schema).read_text(encoding="utf-8"))
-
-    validate(instance=data, schema=schema)
-    print(f"[OK] Valid: {args.json}")
+    try:
+        meta, devices, errors = validate_devices_file(Path(args.json), Path(args.schema))
+    except ValueError as e:
+        raise SystemExit(f"[ERROR] {args.json}: {e}")
+    if errors:
+        for msg in errors:
+            print(f"  - {msg}")
+        raise SystemExit(f"[ERROR] Invalid: {args.json}")
+    print(f"[OK] Valid: {args.json} ({devices} devices)")
     return 0
 
 
@@ -1,18 +1,55 @@
-﻿scanner:
-  site: "CSUDH"
-  building: "Central Plant"
-  segment_name: "CP-VLAN-XXX"
+# src/delta_store.py
+from __future__ import annotations
 
-network:
-  # IMPORTANT: set this to the IP of the NIC that is on the BACnet VLAN/subnet
-  local_ip: "10.120.0.50"
-  bacnet_port: 47808
+from array import array
+from typing import Any, List
 
-safety:
-  whois_timeout_seconds: 5
-  max_devices: 500
+_UNSET = object()
 
-output:
-  directory: "./out/bacnet"
-  filename: "devices.json"
 
+def _changed(last: Any, new: Any, deadband: float) -> bool:
+    # bool is an int subclass but is a status, not an analog value
+    numeric = (int, float)
+    if (
+        isinstance(last, numeric)
+        and isinstance(new, numeric)
+        and not isinstance(last, bool)
+        and not isinstance(new, bool)
+    ):
+        return abs(float(new) - float(last)) > deadband
+    return new != last
+
+
+class DeltaStore:
+    """
+    Last published value and time per point id (dense ids from PointRegistry).
+    A reading is a delta when it moves past the deadband (or changes, for
+    non-numeric values) and at least min_publish_seconds have passed since
+    the point was last published. The first reading always publishes.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._value: List[Any] = [_UNSET] * size
+        self._published_at = array("d", [0.0]) * size
+
+    def should_publish(
+        self,
+        pid: int,
+        new_value: Any,
+        new_ts: float,
+        deadband: float,
+        min_publish_seconds: int,
+    ) -> bool:
+        last = self._value[pid]
+        if last is not _UNSET:
+            if new_ts - self._published_at[pid] < min_publish_seconds:
+                return False
+            if not _changed(last, new_value, deadband):
+                return False
+
+        self._value[pid] = new_value
+        self._published_at[pid] = new_ts
+        return True
+
+    def last_published_at(self, pid: int) -> float:
+        return self._published_at[pid]
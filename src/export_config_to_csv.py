@@ -6,7 +6,7 @@ import csv
 from pathlib import Path
 from typing import Any, Dict, List
 
-import yaml
+from src.utils.config_io import load_config
 
 
 HEADERS = [
@@ -44,7 +44,7 @@ def main() -> int:
     if not cfg_path.exists():
         die(f"Config not found: {cfg_path}")
 
-    cfg = yaml.safe_load(cfg_path.read_text(encoding="utf-8")) or {}
+    cfg = load_config(cfg_path)
     metasys = cfg.get("metasys", {})
     assets = metasys.get("assets", [])
     if not isinstance(assets, list) or not assets:
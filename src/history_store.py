@@ -0,0 +1,275 @@
+# src/history_store.py
+from __future__ import annotations
+
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Tuple
+
+from src.point_registry import PointRegistry
+
+# Raw samples plus a 1-minute rollup (min/max/sum/count) maintained on write.
+# Range queries with buckets of a minute or more read the rollup, so a month
+# of one point is ~43k rollup rows instead of ~500k raw ones.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    asset_id TEXT NOT NULL,
+    point_id TEXT NOT NULL,
+    UNIQUE (asset_id, point_id)
+);
+CREATE TABLE IF NOT EXISTS samples (
+    series INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_1m (
+    series INTEGER NOT NULL,
+    minute INTEGER NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    sum REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (series, minute)
+) WITHOUT ROWID;
+"""
+
+_INSERT_SAMPLE = "INSERT OR IGNORE INTO samples (series, ts, value) VALUES (?, ?, ?)"
+
+_UPSERT_ROLLUP = """
+INSERT INTO rollup_1m (series, minute, min, max, sum, count) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (series, minute) DO UPDATE SET
+    min = MIN(min, excluded.min),
+    max = MAX(max, excluded.max),
+    sum = sum + excluded.sum,
+    count = count + excluded.count
+"""
+
+
+def connect(path: Path, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        conn = sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True, timeout=5.0)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=5.0)
+    # must precede table creation to take effect on a new file
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class HistoryStore:
+    """
+    Local history of published values in SQLite (WAL), so trends can be read
+    without the cloud app and while the connector keeps writing.
+
+    append() is called on the publish path and only pushes onto a bounded deque.
+    A background thread drains it once per `flush_seconds` in one transaction.
+    If that thread ever falls `max_pending` samples behind, the oldest pending
+    samples are dropped (counted in `dropped`).
+
+    Only numeric values (bool as 0/1) are stored.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        registry: PointRegistry,
+        retention_days: float = 35.0,
+        max_bytes: int = 512 * 1024 * 1024,
+        flush_seconds: float = 1.0,
+        max_pending: int = 200_000,
+    ) -> None:
+        self.path = path
+        self.registry = registry
+        self.retention_seconds = float(retention_days) * 86400.0
+        self.max_bytes = int(max_bytes)
+        self.flush_seconds = float(flush_seconds)
+        self.dropped = 0
+        self.written = 0
+
+        self._pending: Deque[Tuple[int, float, float]] = deque(maxlen=max(1, int(max_pending)))
+        self._series: Dict[int, int] = {}  # registry pid -> series id (writer thread only)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, pid: int, value: Any, ts: float) -> None:
+        if isinstance(value, bool):
+            value = 1.0 if value else 0.0
+        elif not isinstance(value, (int, float)):
+            return
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.dropped += 1
+        pending.append((pid, float(value), ts))
+
+    def close(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    # -- writer thread ---------------------------------------------------------
+    def _run(self) -> None:
+        conn = connect(self.path)
+        next_retention = 0.0
+        try:
+            while not self._stop.wait(self.flush_seconds):
+                self._drain(conn)
+                if time.monotonic() >= next_retention:
+                    self._apply_retention(conn)
+                    next_retention = time.monotonic() + 600.0
+            self._drain(conn)
+        finally:
+            conn.close()
+
+    def _series_id(self, conn: sqlite3.Connection, pid: int) -> int:
+        sid = self._series.get(pid)
+        if sid is None:
+            reg = self.registry
+            key = (reg.asset_id[pid], reg.point_id[pid])
+            conn.execute("INSERT OR IGNORE INTO series (asset_id, point_id) VALUES (?, ?)", key)
+            sid = conn.execute("SELECT id FROM series WHERE asset_id = ? AND point_id = ?", key).fetchone()[0]
+            self._series[pid] = sid
+        return sid
+
+    def _drain(self, conn: sqlite3.Connection) -> None:
+        pending = self._pending
+        while pending:
+            batch = []
+            popleft = pending.popleft
+            try:
+                for _ in range(50_000):
+                    batch.append(popleft())
+            except IndexError:
+                pass
+
+            written = 0
+            rollup: Dict[Tuple[int, int], List[float]] = {}
+            with conn:
+                execute = conn.execute
+                for pid, value, ts in batch:
+                    sid = self._series_id(conn, pid)
+                    # a (series, ts) already stored keeps its first value, so a
+                    # repeated sample is never counted twice in the rollup
+                    if execute(_INSERT_SAMPLE, (sid, ts, value)).rowcount == 0:
+                        continue
+                    written += 1
+                    key = (sid, int(ts // 60))
+                    agg = rollup.get(key)
+                    if agg is None:
+                        rollup[key] = [value, value, value, 1]
+                    else:
+                        if value < agg[0]:
+                            agg[0] = value
+                        if value > agg[1]:
+                            agg[1] = value
+                        agg[2] += value
+                        agg[3] += 1
+                conn.executemany(_UPSERT_ROLLUP, [(s, m, *agg) for (s, m), agg in rollup.items()])
+            self.written += written
+
+    def _used_bytes(self, conn: sqlite3.Connection) -> int:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - free) * page_size
+
+    def _delete_before(self, conn: sqlite3.Connection, cutoff: float) -> None:
+        # per series, so each delete is a primary-key range scan
+        with conn:
+            for (sid,) in conn.execute("SELECT id FROM series").fetchall():
+                conn.execute("DELETE FROM samples WHERE series = ? AND ts < ?", (sid, cutoff))
+                conn.execute("DELETE FROM rollup_1m WHERE series = ? AND minute < ?", (sid, int(cutoff // 60)))
+
+    def _apply_retention(self, conn: sqlite3.Connection) -> None:
+        now = time.time()
+        cutoff = now - self.retention_seconds
+        self._delete_before(conn, cutoff)
+        # over the size cap: give up the oldest day at a time
+        while self._used_bytes(conn) > self.max_bytes and cutoff < now:
+            cutoff += 86400.0
+            self._delete_before(conn, cutoff)
+        conn.execute("PRAGMA incremental_vacuum")
+
+
+def query_history(
+    path: Path,
+    asset_id: str,
+    point_id: str,
+    start: float,
+    end: float,
+    buckets: int = 300,
+) -> Dict[str, Any]:
+    """
+    min/max/avg/count per bucket over [start, end). Buckets of a minute or more
+    (widened to whole minutes) come from the 1-minute rollup; shorter ones from raw samples.
+    """
+    buckets = max(1, int(buckets))
+    result: Dict[str, Any] = {
+        "asset_id": asset_id,
+        "point_id": point_id,
+        "start": start,
+        "end": end,
+        "bucket_seconds": None,
+        "source": None,
+        "points": [],
+    }
+    if end <= start or not path.exists():
+        return result
+
+    conn = connect(path, readonly=True)
+    try:
+        row = conn.execute(
+            "SELECT id FROM series WHERE asset_id = ? AND point_id = ?", (asset_id, point_id)
+        ).fetchone()
+        if row is None:
+            return result
+        sid = row[0]
+
+        width = (end - start) / buckets
+        if width >= 60.0:
+            width = math.ceil(width / 60.0) * 60.0
+            origin = math.floor(start / 60.0) * 60.0
+            rows = conn.execute(
+                """
+                SELECT CAST((minute * 60 - ?) / ? AS INTEGER) AS b,
+                       MIN(min), MAX(max), SUM(sum), SUM(count)
+                FROM rollup_1m
+                WHERE series = ? AND minute >= ? AND minute < ?
+                GROUP BY b ORDER BY b
+                """,
+                (origin, width, sid, int(origin // 60), math.ceil(end / 60.0)),
+            ).fetchall()
+            source = "rollup_1m"
+        else:
+            width = max(width, 1.0)
+            origin = start
+            rows = conn.execute(
+                """
+                SELECT CAST((ts - ?) / ? AS INTEGER) AS b,
+                       MIN(value), MAX(value), SUM(value), COUNT(*)
+                FROM samples
+                WHERE series = ? AND ts >= ? AND ts < ?
+                GROUP BY b ORDER BY b
+                """,
+                (origin, width, sid, start, end),
+            ).fetchall()
+            source = "raw"
+    finally:
+        conn.close()
+
+    result["bucket_seconds"] = width
+    result["source"] = source
+    result["points"] = [
+        {"t": origin + b * width, "min": lo, "max": hi, "avg": total / count, "count": count}
+        for b, lo, hi, total, count in rows
+    ]
+    return result
@@ -2,18 +2,29 @@
 from __future__ import annotations
 
 import argparse
-import csv
-from collections import defaultdict
+import contextlib
+import hashlib
+import time
+from collections import Counter
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
-
-import yaml
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from src.schema_validate import validate_config
 from src.utils.paths import ensure_under_generated
-from src.utils.safe_write import atomic_write_text
-from src.utils.manifest import write_manifest
+from src.utils.safe_write import atomic_write_chunks
+from src.utils.config_io import YAML_BACKEND, yaml_dump, yaml_load
+from src.utils.csv_chunks import (
+    column_positions,
+    default_jobs,
+    iter_range_lines,
+    iter_records,
+    read_header,
+    split_ranges,
+)
+from src.utils.manifest import read_manifest, sha256_file, write_manifest
 from src.utils.last_good import write_last_good
+from src.utils.resource_usage import format_mb, peak_rss_bytes
 
 
 REQUIRED_COLS = [
@@ -31,6 +42,52 @@ OPTIONAL_COLS = [
     "min_publish_seconds",
 ]
 
+# Order of the fields yielded by _iter_csv (required first, then optional).
+COLUMNS = REQUIRED_COLS + OPTIONAL_COLS
+
+ALLOWED_DATA_TYPES = ("float", "int", "bool", "string", "enum")
+
+# Placeholder emitted in place of metasys.assets so the base config can be
+# dumped once and the assets streamed into the gap.
+_ASSETS_PLACEHOLDER = "__METASYS_ASSETS__"
+
+# PyYAML's default line width; asset blocks are dumped on their own and then
+# indented, so they get a correspondingly narrower width to fold identically.
+_YAML_WIDTH = 80
+
+# Recorded in the manifest; bump when asset rendering changes so outputs
+# written by an older version are never spliced into a new one.
+_FORMAT_VERSION = 2
+
+
+class PointRow(NamedTuple):
+    """
+    Validated CSV row, kept compact (no per-row dict) until it is rendered.
+    A tuple rather than a dataclass so parallel workers can ship it back cheaply.
+    """
+    point_id: str
+    name: str
+    data_type: str
+    tier: int
+    source_ref: str
+    deadband: Optional[float]
+    min_publish_seconds: Optional[int]
+
+
+AssetKey = Tuple[str, str]  # (asset_id, asset_name)
+
+
+class RowError(Exception):
+    """
+    Validation failure on one CSV row. Carries the row number separately so
+    parallel workers can report chunk-local numbers and the parent can rebase them.
+    """
+
+    def __init__(self, rownum: int, detail: str) -> None:
+        super().__init__(f"Row {rownum}: {detail}")
+        self.rownum = rownum
+        self.detail = detail
+
 
 def _die(msg: str) -> None:
     raise SystemExit(f"[ERROR] {msg}")
@@ -40,146 +97,114 @@ def _to_int(value: str, field: str, rownum: int) -> int:
     try:
         return int(value)
     except Exception:
-        _die(f"Row {rownum}: '{field}' must be an integer, got: {value!r}")
+        raise RowError(rownum, f"'{field}' must be an integer, got: {value!r}") from None
 
 
 def _to_float(value: str, field: str, rownum: int) -> float:
     try:
         return float(value)
     except Exception:
-        _die(f"Row {rownum}: '{field}' must be a number, got: {value!r}")
-
+        raise RowError(rownum, f"'{field}' must be a number, got: {value!r}") from None
 
-def _norm(s: str) -> str:
-    return (s or "").strip()
 
-
-def _read_csv(csv_path: Path) -> List[Dict[str, str]]:
+def _read_csv_header(csv_path: Path) -> Tuple[List[int], int, int]:
+    """
+    Check the header row. Returns (COLUMNS positions, header width, byte offset of first data row).
+    """
     if not csv_path.exists():
         _die(f"CSV not found: {csv_path}")
 
-    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        if reader.fieldnames is None:
-            _die("CSV has no header row.")
-
-        header = [h.strip() for h in reader.fieldnames]
-        missing = [c for c in REQUIRED_COLS if c not in header]
-        if missing:
-            _die(
-                "CSV missing required columns: "
-                + ", ".join(missing)
-                + "\nRequired columns are: "
-                + ", ".join(REQUIRED_COLS)
-                + "\nOptional columns: "
-                + ", ".join(OPTIONAL_COLS)
-            )
-
-        rows: List[Dict[str, str]] = []
-        for idx, row in enumerate(reader, start=2):  # row 1 is header
-            r = {k: (v or "") for k, v in row.items()}
-            r["_rownum"] = str(idx)  # preserve original row number for better errors
-            rows.append(r)
-        return rows
-
-
-def _build_assets(rows: List[Dict[str, str]]) -> List[Dict[str, Any]]:
-    """
-    Build metasys.assets[] with points[] from CSV rows.
-    Groups by (asset_id, asset_name).
-    """
-    grouped: Dict[Tuple[str, str], List[Dict[str, str]]] = defaultdict(list)
-
-    # basic validation + grouping
-    for r in rows:
-        rownum = int(_norm(r.get("_rownum", "0")) or "0")
-        asset_id = _norm(r["asset_id"])
-        asset_name = _norm(r["asset_name"])
-        point_id = _norm(r["point_id"])
-        point_name = _norm(r["point_name"])
-        data_type = _norm(r["data_type"]).lower()
-        tier_s = _norm(r["tier"])
-        source_ref = _norm(r["source_ref"])
-
-        if not asset_id:
-            _die(f"Row {rownum}: asset_id is required.")
-        if not asset_name:
-            _die(f"Row {rownum}: asset_name is required.")
-        if not point_id:
-            _die(f"Row {rownum}: point_id is required.")
-        if not point_name:
-            _die(f"Row {rownum}: point_name is required.")
-        if data_type not in ("float", "int", "bool", "string", "enum"):
-            _die(
-                f"Row {rownum}: data_type must be one of float,int,bool,string,enum. Got: {data_type!r}"
-            )
-
-        tier = _to_int(tier_s, "tier", rownum)
-        if tier not in (1, 2, 3):
-            _die(f"Row {rownum}: tier must be 1, 2, or 3. Got: {tier}")
-
-        if not source_ref:
-            _die(f"Row {rownum}: source_ref is required (put REPLACE_ME if unknown).")
-
-        grouped[(asset_id, asset_name)].append(r)
-
-    # build output
-    assets: List[Dict[str, Any]] = []
-    for (asset_id, asset_name), points_rows in sorted(grouped.items(), key=lambda x: x[0]):
-        points: List[Dict[str, Any]] = []
-
-        for r in points_rows:
-            rownum = int(_norm(r.get("_rownum", "0")) or "0")
-            p: Dict[str, Any] = {
-                "point_id": _norm(r["point_id"]),
-                "name": _norm(r["point_name"]),
-                "data_type": _norm(r["data_type"]).lower(),
-                "tier": _to_int(_norm(r["tier"]), "tier", rownum),
-                "source_ref": _norm(r["source_ref"]),
-            }
-
-            deadband = _norm(r.get("deadband", ""))
-            if deadband != "":
-                p["deadband"] = _to_float(deadband, "deadband", rownum)
-
-            min_pub = _norm(r.get("min_publish_seconds", ""))
-            if min_pub != "":
-                p["min_publish_seconds"] = _to_int(min_pub, "min_publish_seconds", rownum)
+    fieldnames, data_offset = read_header(csv_path)
+    if fieldnames is None:
+        _die("CSV has no header row.")
 
-            points.append(p)
+    header = [h.strip() for h in fieldnames]
+    missing = [c for c in REQUIRED_COLS if c not in header]
+    if missing:
+        _die(
+            "CSV missing required columns: "
+            + ", ".join(missing)
+            + "\nRequired columns are: "
+            + ", ".join(REQUIRED_COLS)
+            + "\nOptional columns: "
+            + ", ".join(OPTIONAL_COLS)
+        )
+    return column_positions(header, COLUMNS), len(header), data_offset
 
-        # stable sort by tier then point name
-        points.sort(key=lambda p: (p.get("tier", 2), p.get("name", ""), p.get("point_id", "")))
 
-        assets.append({"asset_id": asset_id, "name": asset_name, "points": points})
+def _iter_csv(csv_path: Path) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Stream data rows as (rownum, fields) with fields stripped and in COLUMNS order.
+    Missing optional columns come back as "". Nothing is buffered.
+    """
+    positions, width, data_offset = _read_csv_header(csv_path)
+    lines = iter_range_lines(csv_path, data_offset, csv_path.stat().st_size)
+    # row 1 is header
+    yield from enumerate(iter_records(lines, positions, width), start=2)
 
-    return assets
 
+def parse_point(rownum: int, fields: List[str], replace_me_rows: List[int]) -> Tuple[AssetKey, PointRow]:
+    """
+    Validate one CSV row and turn it into (asset key, PointRow); raises RowError.
+    Rows with REPLACE_ME in source_ref are recorded in replace_me_rows;
+    a bare 'REPLACE_ME' is expanded to 'metasys:ref:REPLACE_ME'.
+    """
+    (
+        asset_id,
+        asset_name,
+        point_id,
+        point_name,
+        data_type,
+        tier_s,
+        source_ref,
+        deadband,
+        min_pub,
+    ) = fields
+    data_type = data_type.lower()
+
+    if "replace_me" in source_ref.lower():
+        if source_ref.lower() == "replace_me":
+            source_ref = "metasys:ref:REPLACE_ME"
+        replace_me_rows.append(rownum)
+
+    if not asset_id:
+        raise RowError(rownum, "asset_id is required.")
+    if not asset_name:
+        raise RowError(rownum, "asset_name is required.")
+    if not point_id:
+        raise RowError(rownum, "point_id is required.")
+    if not point_name:
+        raise RowError(rownum, "point_name is required.")
+    if data_type not in ALLOWED_DATA_TYPES:
+        raise RowError(
+            rownum, f"data_type must be one of float,int,bool,string,enum. Got: {data_type!r}"
+        )
 
-def _read_text_with_fallback(path: Path) -> str:
-    for enc in ("utf-8", "utf-8-sig", "cp1252"):
-        try:
-            return path.read_text(encoding=enc)
-        except UnicodeDecodeError:
-            continue
-    _die(f"Could not decode base config file: {path} (try saving as UTF-8)")
-    raise AssertionError("unreachable")
+    tier = _to_int(tier_s, "tier", rownum)
+    if tier not in (1, 2, 3):
+        raise RowError(rownum, f"tier must be 1, 2, or 3. Got: {tier}")
+
+    if not source_ref:
+        raise RowError(rownum, "source_ref is required (put REPLACE_ME if unknown).")
+
+    point = PointRow(
+        point_id=point_id,
+        name=point_name,
+        data_type=data_type,
+        tier=tier,
+        source_ref=source_ref,
+        deadband=_to_float(deadband, "deadband", rownum) if deadband != "" else None,
+        min_publish_seconds=(
+            _to_int(min_pub, "min_publish_seconds", rownum) if min_pub != "" else None
+        ),
+    )
+    return (asset_id, asset_name), point
 
 
-def _normalize_replace_me(rows: List[Dict[str, str]], allow: bool) -> None:
+def _check_replace_me(offenders: List[int], allow: bool) -> None:
     """
-    If allow==False: fail if any source_ref contains REPLACE_ME.
-    If allow==True : convert plain 'REPLACE_ME' into 'metasys:ref:REPLACE_ME' for convenience.
+    If allow==False: fail if any source_ref contained REPLACE_ME.
     """
-    offenders: List[int] = []
-    for r in rows:
-        rownum = int(_norm(r.get("_rownum", "0")) or "0")
-        sr = _norm(r.get("source_ref", ""))
-        if "replace_me" in sr.lower():
-            if sr.lower() == "replace_me":
-                r["source_ref"] = "metasys:ref:REPLACE_ME"
-            offenders.append(rownum)
-
     if offenders and not allow:
         preview = ", ".join(str(n) for n in offenders[:15])
         more = "" if len(offenders) <= 15 else f" (+{len(offenders)-15} more)"
@@ -190,7 +215,300 @@ def _normalize_replace_me(rows: List[Dict[str, str]], allow: bool) -> None:
         )
 
 
+def _group_points(
+    rows: Iterable[Tuple[int, List[str]]], allow_replace_me: bool
+) -> Dict[AssetKey, List[PointRow]]:
+    """
+    Single pass over the CSV: validate every row and group it by (asset_id, asset_name).
+    """
+    grouped: Dict[AssetKey, List[PointRow]] = {}
+    offenders: List[int] = []
+
+    try:
+        for rownum, fields in rows:
+            key, point = parse_point(rownum, fields, offenders)
+            points = grouped.get(key)
+            if points is None:
+                grouped[key] = points = []
+            points.append(point)
+    except RowError as e:
+        _die(str(e))
+
+    _check_replace_me(offenders, allow=allow_replace_me)
+    return grouped
+
+
+def _validate_range(task: Tuple[str, int, int, List[int], int]) -> Dict[str, Any]:
+    """
+    Process-pool worker: validate and group the rows in one byte range of the CSV.
+    Row numbers in the result are local to the range (first record = 1).
+    Also returns each asset's raw row bytes so the parent can extend the
+    per-asset hashes in file order.
+    """
+    path, start, end, positions, width = task
+    groups: Dict[AssetKey, List[PointRow]] = {}
+    row_data: Dict[AssetKey, List[str]] = {}
+    offenders: List[int] = []
+    records = 0
+    error: Optional[Tuple[int, str]] = None
+
+    lines = iter_range_lines(Path(path), start, end)
+    try:
+        for records, fields in enumerate(iter_records(lines, positions, width), start=1):
+            raw_key = (fields[0], fields[1])
+            data = row_data.get(raw_key)
+            if data is None:
+                row_data[raw_key] = data = []
+            data.append("\x1f".join(fields))
+
+            key, point = parse_point(records, fields, offenders)
+            points = groups.get(key)
+            if points is None:
+                groups[key] = points = []
+            points.append(point)
+    except RowError as e:
+        error = (e.rownum, e.detail)
+
+    return {
+        "records": records,
+        "groups": groups,
+        "row_data": {k: ("\x1e".join(v) + "\x1e").encode("utf-8") for k, v in row_data.items()},
+        "offenders": offenders,
+        "error": error,
+    }
+
+
+def _group_points_parallel(
+    csv_path: Path, jobs: int, allow_replace_me: bool, hashes: Dict[AssetKey, Any]
+) -> Dict[AssetKey, List[PointRow]]:
+    """
+    Same result as _group_points(_hash_rows(_iter_csv(...))) but with the CSV split
+    into byte-range chunks on record boundaries and validated in a process pool.
+    Chunk results are merged in file order, so grouping order, per-asset hashes,
+    row numbers and the first reported error match the serial path.
+    """
+    positions, width, data_offset = _read_csv_header(csv_path)
+    ranges = split_ranges(csv_path, data_offset, jobs)
+    tasks = [(str(csv_path), start, end, positions, width) for start, end in ranges]
+
+    grouped: Dict[AssetKey, List[PointRow]] = {}
+    offenders: List[int] = []
+    base = 1  # row 1 is header
+
+    if len(tasks) == 1:
+        results: Iterable[Dict[str, Any]] = [_validate_range(tasks[0])]
+        pool = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(tasks)))
+        results = pool.map(_validate_range, tasks)
+
+    try:
+        for res in results:
+            if res["error"] is not None:
+                rownum, detail = res["error"]
+                _die(f"Row {base + rownum}: {detail}")
+            for key, data in res["row_data"].items():
+                h = hashes.get(key)
+                if h is None:
+                    hashes[key] = h = hashlib.sha256()
+                h.update(data)
+            for key, points in res["groups"].items():
+                existing = grouped.get(key)
+                if existing is None:
+                    grouped[key] = points
+                else:
+                    existing.extend(points)
+            offenders.extend(base + n for n in res["offenders"])
+            base += res["records"]
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    _check_replace_me(offenders, allow=allow_replace_me)
+    return grouped
+
+
+def point_to_dict(p: PointRow) -> Dict[str, Any]:
+    d: Dict[str, Any] = {
+        "point_id": p.point_id,
+        "name": p.name,
+        "data_type": p.data_type,
+        "tier": p.tier,
+        "source_ref": p.source_ref,
+    }
+    if p.deadband is not None:
+        d["deadband"] = p.deadband
+    if p.min_publish_seconds is not None:
+        d["min_publish_seconds"] = p.min_publish_seconds
+    return d
+
+
+def _render_asset(key: AssetKey, points: List[PointRow], indent: str) -> str:
+    """
+    Render one metasys.assets[] entry as YAML, indented to sit under `assets:`.
+    """
+    asset_id, asset_name = key
+    # stable sort by tier then point name
+    ordered = sorted(points, key=lambda p: (p.tier, p.name, p.point_id))
+    asset = {"asset_id": asset_id, "name": asset_name, "points": [point_to_dict(p) for p in ordered]}
+
+    text = yaml_dump([asset], sort_keys=False, allow_unicode=True, width=_YAML_WIDTH - len(indent))
+    # yaml leaves blank lines (inside multi-line scalars) unindented; so must we
+    return "".join(line if line == "\n" else indent + line for line in text.splitlines(keepends=True))
+
+
+def _render_frame(base_cfg: Dict[str, Any]) -> Tuple[str, str, str]:
+    """
+    Dump the base config with a placeholder in metasys.assets.
+    Returns (text before the assets value, indent for asset entries, text after).
+    """
+    base_cfg["metasys"]["assets"] = _ASSETS_PLACEHOLDER
+    try:
+        text = yaml_dump(base_cfg, sort_keys=False, allow_unicode=True)
+    finally:
+        base_cfg["metasys"]["assets"] = []
+
+    marker = f"assets: {_ASSETS_PLACEHOLDER}\n"
+    pos = text.index(marker)
+    line_start = text.rfind("\n", 0, pos) + 1
+    return text[: pos + len("assets:")], text[line_start:pos], text[pos + len(marker) :]
+
+
+@dataclass
+class _PreviousOutput:
+    """
+    A prior generated YAML plus its manifest's per-asset index
+    (asset key -> {"rows_sha256", "points", "tiers", "offset", "length"}).
+    """
+    yaml_path: Path
+    entries: Dict[AssetKey, Dict[str, Any]]
+
+
+def _iter_yaml_chunks(
+    frame: Tuple[str, str, str],
+    keys: List[AssetKey],
+    grouped: Dict[AssetKey, List[PointRow]],
+    previous: Optional[_PreviousOutput],
+    index: Dict[AssetKey, Tuple[int, int]],
+) -> Iterator[str]:
+    """
+    Yield the generated YAML document piece by piece, one asset at a time.
+    Assets in `grouped` are rendered; the rest are copied verbatim from `previous`.
+    The (byte offset, byte length) of every asset block is recorded in `index`.
+    """
+    head, indent, tail = frame
+    if not keys:
+        yield head + " []\n"
+        yield tail
+        return
+
+    head += "\n"
+    yield head
+    pos = len(head.encode("utf-8"))
+
+    with (previous.yaml_path.open("rb") if previous else contextlib.nullcontext()) as prev_f:
+        for key in keys:
+            points = grouped.get(key)
+            if points is not None:
+                block = _render_asset(key, points, indent)
+                size = len(block.encode("utf-8"))
+            else:
+                entry = previous.entries[key]
+                prev_f.seek(int(entry["offset"]))
+                size = int(entry["length"])
+                block = prev_f.read(size).decode("utf-8")
+            index[key] = (pos, size)
+            pos += size
+            yield block
+    yield tail
+
+
+def _hashing(chunks: Iterable[str], h: Any) -> Iterator[str]:
+    for chunk in chunks:
+        h.update(chunk.encode("utf-8"))
+        yield chunk
+
+
+def _hash_rows(
+    rows: Iterable[Tuple[int, List[str]]], hashes: Dict[AssetKey, Any]
+) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Pass rows through unchanged while feeding each into its asset's sha256.
+    """
+    for rownum, fields in rows:
+        key = (fields[0], fields[1])
+        h = hashes.get(key)
+        if h is None:
+            hashes[key] = h = hashlib.sha256()
+        h.update("\x1f".join(fields).encode("utf-8"))
+        h.update(b"\x1e")
+        yield rownum, fields
+
+
+def _load_previous(
+    out_path: Path, options: Dict[str, Any]
+) -> Tuple[Dict[AssetKey, Dict[str, Any]], Optional[str]]:
+    """
+    Returns (previous per-asset entries, reason the previous output cannot be
+    spliced or None if it can).
+    """
+    manifest = read_manifest(out_path)
+    if manifest is None:
+        return {}, "no previous manifest"
+
+    assets = manifest.get("assets")
+    if not isinstance(assets, list):
+        return {}, "previous manifest has no per-asset hashes"
+    try:
+        entries = {(str(e["asset_id"]), str(e["name"])): e for e in assets}
+    except (KeyError, TypeError):
+        return {}, "previous manifest has a malformed asset index"
+
+    if manifest.get("options") != options:
+        return entries, "import options or output format changed"
+    if not out_path.exists():
+        return entries, "previous output is missing"
+    if sha256_file(out_path) != manifest.get("output", {}).get("yaml_sha256"):
+        return entries, "previous output was modified after generation"
+    return entries, None
+
+
+def _diff_assets(
+    previous: Dict[AssetKey, Dict[str, Any]], row_hashes: Dict[AssetKey, str]
+) -> Tuple[List[AssetKey], List[AssetKey], List[AssetKey]]:
+    """
+    (added, changed, removed) asset keys between a previous manifest and the current CSV.
+    """
+    added = sorted(k for k in row_hashes if k not in previous)
+    changed = sorted(
+        k for k in row_hashes if k in previous and previous[k].get("rows_sha256") != row_hashes[k]
+    )
+    removed = sorted(k for k in previous if k not in row_hashes)
+    return added, changed, removed
+
+
+def _print_changes(label: str, keys: List[AssetKey], limit: int = 20) -> None:
+    for asset_id, asset_name in keys[:limit]:
+        print(f"       {label} {asset_id} ({asset_name})")
+    if len(keys) > limit:
+        print(f"       {label} ... (+{len(keys) - limit} more)")
+
+
+def _read_text_with_fallback(path: Path) -> str:
+    for enc in ("utf-8", "utf-8-sig", "cp1252"):
+        try:
+            return path.read_text(encoding=enc)
+        except UnicodeDecodeError:
+            continue
+    _die(f"Could not decode base config file: {path} (try saving as UTF-8)")
+    raise AssertionError("unreachable")
+
+
 def main() -> int:
+    started = time.perf_counter()
+
     parser = argparse.ArgumentParser(description="Generate metasys.assets config from CSV.")
     parser.add_argument(
         "--base",
@@ -213,6 +531,22 @@ def main() -> int:
         action="store_true",
         help="Allow source_ref containing REPLACE_ME placeholders without failing.",
     )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-validate and re-render every asset even if a previous output can be reused.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Validate rows in N worker processes (0 = one per CPU). Used for full regeneration.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print wall time and peak RSS when done.",
+    )
     args = parser.parse_args()
 
     base_path = Path(args.base)
@@ -229,47 +563,130 @@ def main() -> int:
 
     # Load base YAML with encoding fallback
     base_text = _read_text_with_fallback(base_path)
-    base_cfg = yaml.safe_load(base_text) or {}
-
-    # Load CSV rows
-    rows = _read_csv(csv_path)
-
-    # Enforce / normalize REPLACE_ME policy
-    _normalize_replace_me(rows, allow=bool(args.allow_replace_me))
-
-    # Build assets structure and attach to config
-    assets = _build_assets(rows)
+    base_cfg = yaml_load(base_text) or {}
     if "metasys" not in base_cfg or not isinstance(base_cfg["metasys"], dict):
         base_cfg["metasys"] = {}
-    base_cfg["metasys"]["assets"] = assets
+    base_cfg["metasys"]["assets"] = []
 
-    # Validate before writing
+    # Validate the base before doing any row work. The schema does not describe
+    # metasys.assets; rows are validated one by one in parse_point.
     validate_config(base_cfg, schema_path=str(schema_path))
 
-    # Two-phase commit YAML write
-    out_text = yaml.safe_dump(base_cfg, sort_keys=False, allow_unicode=True)
-    atomic_write_text(out_path, out_text)
+    frame = _render_frame(base_cfg)
+    allow_replace_me = bool(args.allow_replace_me)
+    jobs = args.jobs if args.jobs > 0 else default_jobs()
+    options = {
+        "format_version": _FORMAT_VERSION,
+        "allow_replace_me": allow_replace_me,
+        "assets_indent": len(frame[1]),
+        "yaml_backend": YAML_BACKEND,
+    }
+
+    previous_entries, full_reason = _load_previous(out_path, options)
+    if args.full:
+        full_reason = "--full requested"
+
+    hashes: Dict[AssetKey, Any] = {}
+    previous: Optional[_PreviousOutput] = None
+    if full_reason is None:
+        # Pass 1: hash rows per asset. Pass 2: validate only assets whose rows changed.
+        for _ in _hash_rows(_iter_csv(csv_path), hashes):
+            pass
+        dirty = {
+            k
+            for k, h in hashes.items()
+            if previous_entries.get(k, {}).get("rows_sha256") != h.hexdigest()
+        }
+        rows = (r for r in _iter_csv(csv_path) if (r[1][0], r[1][1]) in dirty)
+        grouped = _group_points(rows, allow_replace_me=allow_replace_me)
+        previous = _PreviousOutput(out_path, previous_entries)
+    elif jobs > 1:
+        grouped = _group_points_parallel(csv_path, jobs, allow_replace_me, hashes)
+    else:
+        # Stream CSV rows -> validated, grouped compact records (one pass)
+        grouped = _group_points(_hash_rows(_iter_csv(csv_path), hashes), allow_replace_me=allow_replace_me)
+
+    row_hashes = {k: h.hexdigest() for k, h in hashes.items()}
+    keys = sorted(row_hashes)
+    added, changed, removed = _diff_assets(previous_entries, row_hashes)
+
+    # Two-phase commit YAML write, rendered (or spliced) asset by asset
+    yaml_hash = hashlib.sha256()
+    index: Dict[AssetKey, Tuple[int, int]] = {}
+    chunks = _iter_yaml_chunks(frame, keys, grouped, previous, index)
+    atomic_write_chunks(out_path, _hashing(chunks, yaml_hash))
+
+    asset_entries: List[Dict[str, Any]] = []
+    tier_counts: Counter = Counter()
+    for key in keys:
+        points = grouped.get(key)
+        if points is not None:
+            tiers = Counter(str(p.tier) for p in points)
+            n_points = len(points)
+        else:
+            tiers = Counter(previous_entries[key]["tiers"])
+            n_points = int(previous_entries[key]["points"])
+        tier_counts.update(tiers)
+        offset, length = index[key]
+        asset_entries.append(
+            {
+                "asset_id": key[0],
+                "name": key[1],
+                "rows_sha256": row_hashes[key],
+                "points": n_points,
+                "tiers": dict(sorted(tiers.items())),
+                "offset": offset,
+                "length": length,
+            }
+        )
+
+    changes = {
+        "mode": "full" if previous is None else "incremental",
+        "rendered_assets": len(grouped),
+        "unchanged": len(keys) - len(added) - len(changed),
+        "added": [k[0] for k in added],
+        "changed": [k[0] for k in changed],
+        "removed": [k[0] for k in removed],
+    }
 
     # Manifest + LAST_GOOD
     manifest_path = write_manifest(
         out_yaml_path=out_path,
-        out_yaml_text=out_text,
+        out_yaml_sha256=yaml_hash.hexdigest(),
         base_path=base_path,
         csv_path=csv_path,
         schema_path=schema_path,
-        assets=assets,
+        asset_count=len(keys),
+        tier_counts=tier_counts,
+        options=options,
+        assets=asset_entries,
+        changes=changes,
     )
     print(f"[OK] Manifest written: {manifest_path}")
     last_good = write_last_good(out_path)
     print(f"[OK] LAST_GOOD updated: {last_good}")
 
     print(f"[OK] Generated config: {out_path}")
-    print(f"[OK] Assets: {len(assets)} | Points: {sum(len(a['points']) for a in assets)}")
+    print(f"[OK] Assets: {len(keys)} | Points: {sum(tier_counts.values())}")
+
+    if previous is None:
+        print(f"[INFO] Full regeneration ({full_reason}); rendered {len(grouped)} assets.")
+    else:
+        print(f"[INFO] Incremental regeneration; rendered {len(grouped)} of {len(keys)} assets.")
+    if previous_entries:
+        print(
+            f"[OK] Changes: added={len(added)} changed={len(changed)} "
+            f"removed={len(removed)} unchanged={changes['unchanged']}"
+        )
+        _print_changes("+", added)
+        _print_changes("~", changed)
+        _print_changes("-", removed)
+
+    if args.stats:
+        elapsed = time.perf_counter() - started
+        print(f"[STATS] wall={elapsed:.2f}s peak_rss={format_mb(peak_rss_bytes())}")
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
-
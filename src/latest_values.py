@@ -0,0 +1,240 @@
+# src/latest_values.py
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.safe_write import atomic_write_text
+
+# File layout (little-endian), shared through mmap:
+#   header  <4sIIIQ>  magic, layout version, point count, record size, generation
+#   records <QdddBB6x> one per registry point id:
+#           seq, value, ts, last_published_at, quality code, kind
+# Keys ((asset_id, point_id) per id) live in a JSON sidecar carrying the same
+# generation, so a reader never pairs values with the wrong registry.
+#
+# Writers follow a seqlock: seq goes odd, fields are written, seq goes even.
+# Readers copy a record and retry if seq was odd or changed underneath them.
+#
+# The writer zeroes the header generation when it closes, so readers can tell
+# a table left behind by a stopped connector from a live one.
+
+MAGIC = b"MSLV"
+LAYOUT_VERSION = 1
+_HEADER = struct.Struct("<4sIIIQ")
+_RECORD = struct.Struct("<QdddBB6x")
+_SEQ = struct.Struct("<Q")
+_FIELDS = struct.Struct("<dddBB")
+
+QUALITIES = ("good", "uncertain", "bad", "unknown")
+_QUALITY_CODES = {q: i for i, q in enumerate(QUALITIES)}
+
+KIND_EMPTY, KIND_NUMBER, KIND_BOOL, KIND_OTHER = 0, 1, 2, 3
+
+
+def keys_path_for(path: Path) -> Path:
+    return path.with_name(path.name + ".json")
+
+
+class LatestValues:
+    """
+    Writer side, owned by the poller: latest reading per point id plus when it
+    was last published. update() is a handful of struct.pack_into calls on the
+    mapped file; there is no lock and no syscall.
+
+    Non-numeric values are recorded as kind=other with value NaN; the table
+    only carries numbers.
+    """
+
+    def __init__(self, path: Path, keys: List[Tuple[str, str]]) -> None:
+        self.path = path
+        self.count = len(keys)
+        self.generation = time.time_ns()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(
+            keys_path_for(path),
+            json.dumps({"generation": self.generation, "keys": keys}, separators=(",", ":")),
+        )
+
+        # build the new table beside the old one and swap it in, so a reader still
+        # mapping the previous file keeps valid memory until it notices the swap
+        size = _HEADER.size + _RECORD.size * max(1, self.count)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.truncate(size)
+            f.write(_HEADER.pack(MAGIC, LAYOUT_VERSION, self.count, _RECORD.size, self.generation))
+        os.replace(tmp, path)
+
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._seq = [0] * self.count
+
+    @classmethod
+    def for_registry(cls, path: Path, registry: Any) -> "LatestValues":
+        return cls(path, [(registry.asset_id[i], registry.point_id[i]) for i in range(len(registry))])
+
+    def update(self, pid: int, value: Any, ts: float, quality: str, published_at: Optional[float]) -> None:
+        """
+        Record a reading; published_at is the publish time when this reading was
+        published, else None (the previous publish time is kept).
+        """
+        if isinstance(value, bool):
+            kind, number = KIND_BOOL, 1.0 if value else 0.0
+        elif isinstance(value, (int, float)):
+            kind, number = KIND_NUMBER, float(value)
+        else:
+            kind, number = KIND_OTHER, float("nan")
+
+        off = _HEADER.size + pid * _RECORD.size
+        m = self._map
+        if published_at is None:
+            published_at = struct.unpack_from("<d", m, off + 24)[0]
+
+        seq = self._seq[pid] + 1
+        _SEQ.pack_into(m, off, seq)  # odd: write in progress
+        _FIELDS.pack_into(m, off + 8, number, ts, published_at, _QUALITY_CODES.get(quality, 3), kind)
+        _SEQ.pack_into(m, off, seq + 1)
+        self._seq[pid] = seq + 1
+
+    def close(self) -> None:
+        _HEADER.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, self.count, _RECORD.size, 0)
+        self._map.close()
+        self._file.close()
+
+
+class LatestValuesReader:
+    """
+    Reader side for other processes (local API, health checks, scripts). Maps
+    the table read-only and reads records in place; it reopens by itself when
+    the connector restarts and swaps in a new table.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        self._ino: Optional[int] = None
+        self.generation = 0
+        self.count = 0
+        self.keys: List[Tuple[str, str]] = []
+
+    def _open(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self.close()
+            return False
+        if self._map is not None and st.st_ino == self._ino:
+            return True
+
+        self.close()
+        with open(self.path, "rb") as f:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, layout, count, record_size, generation = _HEADER.unpack_from(m, 0)
+        if magic != MAGIC or layout != LAYOUT_VERSION or record_size != _RECORD.size:
+            m.close()
+            raise ValueError(f"{self.path} is not a latest-values table (layout {layout})")
+
+        try:
+            meta = json.loads(keys_path_for(self.path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = {}
+        if generation == 0 or meta.get("generation") != generation:
+            # writer gone, or keys for this table not written yet (connector starting up)
+            m.close()
+            return False
+
+        self._map, self._ino = m, st.st_ino
+        self.generation, self.count = generation, count
+        self.keys = [tuple(k) for k in meta["keys"]]  # type: ignore[misc]
+        return True
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._ino = None
+
+    def _record(self, pid: int) -> Tuple[float, float, float, int, int]:
+        m = self._map
+        assert m is not None
+        off = _HEADER.size + pid * _RECORD.size
+        fields = _FIELDS.unpack_from(m, off + 8)
+        for _ in range(1000):
+            before = _SEQ.unpack_from(m, off)[0]
+            if before & 1:
+                continue  # writer mid-update
+            fields = _FIELDS.unpack_from(m, off + 8)
+            if _SEQ.unpack_from(m, off)[0] == before:
+                return fields
+        # the writer died mid-update; the record is as good as it will get
+        return fields
+
+    def read(
+        self,
+        asset_ids: Iterable[str] = (),
+        point_ids: Iterable[str] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """
+        {"generation", "count", "values": [...]} for points matching the filters,
+        or None when no table is available or its writer has closed it.
+        """
+        if not self._open():
+            return None
+        if _HEADER.unpack_from(self._map, 0)[4] == 0:  # type: ignore[arg-type]
+            # the connector stopped since the table was opened
+            self.close()
+            return None
+        assets, points = set(asset_ids), set(point_ids)
+
+        values = []
+        for pid, (asset_id, point_id) in enumerate(self.keys):
+            if (assets and asset_id not in assets) or (points and point_id not in points):
+                continue
+            number, ts, published_at, quality, kind = self._record(pid)
+            if kind == KIND_EMPTY:
+                value: Any = None
+            elif kind == KIND_BOOL:
+                value = number != 0.0
+            elif kind == KIND_OTHER:
+                value = None
+            else:
+                value = number
+            values.append(
+                {
+                    "asset_id": asset_id,
+                    "point_id": point_id,
+                    "value": value,
+                    "numeric": kind in (KIND_NUMBER, KIND_BOOL),
+                    "ts": ts if kind != KIND_EMPTY else None,
+                    "quality": QUALITIES[quality] if kind != KIND_EMPTY else None,
+                    "last_published_at": published_at or None,
+                }
+            )
+        return {"generation": self.generation, "count": len(values), "values": values}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Print the running connector's latest values.")
+    ap.add_argument("--path", default="out/latest_values.bin")
+    ap.add_argument("--asset-id", action="append", default=[])
+    ap.add_argument("--point-id", action="append", default=[])
+    args = ap.parse_args()
+
+    snap = LatestValuesReader(Path(args.path)).read(args.asset_id, args.point_id)
+    if snap is None:
+        raise SystemExit(f"[ERROR] No latest-values table at {args.path} (is the connector running?)")
+    for v in snap["values"]:
+        print(f"{v['asset_id']}::{v['point_id']}  {v['value']!r:>14}  {v['quality'] or '-':<9} ts={v['ts']}")
+    print(f"[OK] {snap['count']} points (generation {snap['generation']})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
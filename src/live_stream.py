@@ -0,0 +1,303 @@
+# src/live_stream.py
+from __future__ import annotations
+
+import json
+import queue
+import socket
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.point_registry import PointRegistry
+
+# Distinct subscription filters whose point sets are kept (least recently used
+# first out), so clients varying their filters cannot grow memory.
+_SELECTION_CACHE = 64
+
+
+class LiveStream:
+    """
+    Ring buffer of recently published values, fanned out to Server-Sent Events
+    subscribers.
+
+    The publisher only appends to the ring. That is O(1) and never waits on a
+    client. Each subscriber keeps its own cursor into the ring. A subscriber that
+    falls more than `capacity` events behind skips ahead and is told how many it
+    missed, so a slow client never holds up the publisher.
+    """
+
+    def __init__(self, registry: PointRegistry, capacity: int = 10_000) -> None:
+        self.registry = registry
+        self.capacity = max(1, int(capacity))
+        # slot seq % capacity -> (point id, encoded SSE frame)
+        self._ring: List[Optional[Tuple[int, bytes]]] = [None] * self.capacity
+        self._next_seq = 1
+        self._lock = threading.Lock()
+        # maintained by the fan-out thread
+        self.subscribers = 0
+        self.backlogged = 0
+        self.dropped_total = 0
+        self._selections: "OrderedDict[Tuple[Tuple[str, ...], Tuple[str, ...]], FrozenSet[int]]" = OrderedDict()
+        self._selections_lock = threading.Lock()
+
+    def publish(self, pid: int, value: Any, ts: float, quality: str) -> None:
+        reg = self.registry
+        data = json.dumps(
+            {
+                "asset_id": reg.asset_id[pid],
+                "point_id": reg.point_id[pid],
+                "value": value,
+                "ts": ts,
+                "quality": quality,
+            },
+            separators=(",", ":"),
+            default=str,
+        )
+        with self._lock:
+            seq = self._next_seq
+            self._ring[seq % self.capacity] = (pid, f"id: {seq}\nevent: value\ndata: {data}\n\n".encode("utf-8"))
+            self._next_seq = seq + 1
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    def select(self, asset_ids: List[str], point_ids: List[str]) -> Optional[FrozenSet[int]]:
+        """
+        Point ids matching the filters (None = no filter). Lists are OR'd within
+        a filter and AND'd across filters.
+        """
+        if not asset_ids and not point_ids:
+            return None
+        key = (tuple(sorted(set(asset_ids))), tuple(sorted(set(point_ids))))
+        with self._selections_lock:
+            cached = self._selections.get(key)
+            if cached is not None:
+                self._selections.move_to_end(key)
+                return cached
+        reg = self.registry
+        assets, points = set(key[0]), set(key[1])
+        cached = frozenset(
+            pid
+            for pid in range(len(reg))
+            if (not assets or reg.asset_id[pid] in assets) and (not points or reg.point_id[pid] in points)
+        )
+        with self._selections_lock:
+            self._selections[key] = cached
+            if len(self._selections) > _SELECTION_CACHE:
+                self._selections.popitem(last=False)
+        return cached
+
+    def read_since(self, cursor: int, pids: Optional[FrozenSet[int]]) -> Tuple[bytes, int, int]:
+        """
+        (frames for events >= cursor, new cursor, events missed because the
+        cursor fell out of the ring).
+        """
+        with self._lock:
+            end = self._next_seq
+            oldest = max(1, end - self.capacity)
+            missed = 0
+            if cursor < oldest:
+                missed = oldest - cursor
+                cursor = oldest
+            ring, cap = self._ring, self.capacity
+            pending = [ring[seq % cap] for seq in range(cursor, end)]
+
+        # filtering and joining happen outside the lock
+        frames = b"".join(f for pid, f in pending if pids is None or pid in pids)  # type: ignore[misc]
+        return frames, end, missed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "backlogged": self.backlogged,
+            "next_seq": self._next_seq,
+            "capacity": self.capacity,
+            "dropped_total": self.dropped_total,
+        }
+
+
+def _csv_param(query: Dict[str, List[str]], name: str) -> List[str]:
+    return [v for raw in query.get(name, []) for v in raw.split(",") if v]
+
+
+class _Subscriber:
+    __slots__ = ("sock", "cursor", "pids", "out", "sent", "last_write")
+
+    def __init__(self, sock: socket.socket, cursor: int, pids: Optional[FrozenSet[int]]) -> None:
+        self.sock = sock
+        self.cursor = cursor
+        self.pids = pids
+        self.out = b""
+        self.sent = 0
+        self.last_write = time.monotonic()
+
+
+class _Fanout(threading.Thread):
+    """
+    One thread writes to every subscriber with non-blocking sends, once per
+    `interval`. Events published in between go out together. Subscribers with the
+    same cursor and filter share one read of the ring. A client whose socket is
+    full keeps its unsent bytes and reads nothing new until they drain. If it
+    stays stuck it falls out of the ring ("dropped") and, after `write_timeout`
+    with no progress, is disconnected.
+    """
+
+    def __init__(self, hub: LiveStream, interval: float, keepalive: float, write_timeout: float) -> None:
+        super().__init__(name="live-stream-fanout", daemon=True)
+        self.hub = hub
+        self.interval = interval
+        self.keepalive = keepalive
+        self.write_timeout = write_timeout
+        self._new: "queue.SimpleQueue[_Subscriber]" = queue.SimpleQueue()
+        self._subs: List[_Subscriber] = []
+
+    def add(self, sub: _Subscriber) -> None:
+        self._new.put(sub)
+
+    def run(self) -> None:
+        hub = self.hub
+        while True:
+            time.sleep(self.interval)
+            while not self._new.empty():
+                self._subs.append(self._new.get_nowait())
+            if not self._subs:
+                continue
+
+            now = time.monotonic()
+            reads: Dict[Tuple[int, int], Tuple[bytes, int, int]] = {}
+            alive: List[_Subscriber] = []
+            for sub in self._subs:
+                if sub.sent >= len(sub.out):
+                    key = (sub.cursor, id(sub.pids))
+                    got = reads.get(key)
+                    if got is None:
+                        got = reads[key] = hub.read_since(sub.cursor, sub.pids)
+                    frames, sub.cursor, missed = got
+                    if missed:
+                        hub.dropped_total += missed
+                        frames = f"event: dropped\ndata: {{\"missed\":{missed}}}\n\n".encode("utf-8") + frames
+                    if not frames and now - sub.last_write >= self.keepalive:
+                        frames = b": keepalive\n\n"
+                    sub.out, sub.sent = frames, 0
+
+                if sub.sent < len(sub.out):
+                    try:
+                        n = sub.sock.send(memoryview(sub.out)[sub.sent :])
+                    except BlockingIOError:
+                        n = 0
+                    except OSError:
+                        self._close(sub)
+                        continue
+                    sub.sent += n
+                    if n:
+                        sub.last_write = now
+                    elif now - sub.last_write >= self.write_timeout:
+                        self._close(sub)
+                        continue
+                alive.append(sub)
+            self._subs = alive
+            hub.subscribers = len(alive)
+            hub.backlogged = sum(1 for sub in alive if sub.sent < len(sub.out))
+
+    @staticmethod
+    def _close(sub: _Subscriber) -> None:
+        try:
+            sub.sock.close()
+        except OSError:
+            pass
+
+
+class LiveStreamHandler(BaseHTTPRequestHandler):
+    """
+    GET /live[?asset_id=A,B&point_id=P]   text/event-stream of published values
+    GET /live/stats                       subscriber / ring counters (JSON)
+
+    The handler only sends the response headers; the socket is then handed to
+    the server's fan-out thread, so subscribers don't each hold a thread.
+    """
+
+    def do_GET(self):
+        hub: LiveStream = self.server.hub  # type: ignore[attr-defined]
+        url = urlsplit(self.path)
+
+        if url.path == "/live/stats":
+            payload = json.dumps(hub.stats()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        if url.path != "/live":
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        query = parse_qs(url.query)
+        pids = hub.select(_csv_param(query, "asset_id"), _csv_param(query, "point_id"))
+
+        # EventSource resends the last id it saw on reconnect; resume from there
+        # if it is still in the ring, otherwise start at the live edge.
+        cursor = hub.next_seq
+        last_id = self.headers.get("Last-Event-ID", "")
+        if last_id.isdigit():
+            cursor = min(int(last_id) + 1, hub.next_seq)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(b"retry: 3000\n\n")
+        self.wfile.flush()
+
+        # bound what the kernel buffers for a slow client; past that it falls behind in the ring instead
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 256 * 1024)
+        self.connection.setblocking(False)
+        self.server.detach(self.connection)  # type: ignore[attr-defined]
+        self.server.fanout.add(_Subscriber(self.connection, cursor, pids))  # type: ignore[attr-defined]
+
+    def log_message(self, format, *args):
+        # silence default HTTP logging
+        return
+
+
+class _LiveStreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # a UI reload reconnects every tab at once; the default backlog of 5 refuses most of them
+    request_queue_size = 512
+
+    def __init__(self, addr, handler, hub: LiveStream, interval: float, keepalive: float, write_timeout: float):
+        super().__init__(addr, handler)
+        self.hub = hub
+        self.fanout = _Fanout(hub, interval, keepalive, write_timeout)
+        self.fanout.start()
+        self._detached: Set[int] = set()
+
+    def detach(self, sock: socket.socket) -> None:
+        self._detached.add(id(sock))
+
+    def shutdown_request(self, request):
+        # streaming sockets now belong to the fan-out thread
+        if id(request) in self._detached:
+            self._detached.discard(id(request))
+            return
+        super().shutdown_request(request)
+
+
+def start_live_stream_server(
+    port: int,
+    hub: LiveStream,
+    interval: float = 0.1,
+    keepalive: float = 15.0,
+    write_timeout: float = 30.0,
+):
+    server = _LiveStreamServer(("0.0.0.0", port), LiveStreamHandler, hub, interval, keepalive, write_timeout)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
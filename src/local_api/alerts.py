@@ -0,0 +1,181 @@
+# src/local_api/alerts.py
+from __future__ import annotations
+
+import html
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+Sender = Callable[[str, str], None]  # (subject, html) -> None, raises on failure
+
+
+@dataclass
+class PushEvent:
+    repo: str
+    ref: str
+    pusher: str
+    commit_count: int
+    # (first line of message, url) for up to the first 10 commits
+    commits: List[Tuple[str, str]] = field(default_factory=list)
+
+    @classmethod
+    def from_payload(cls, payload: Dict) -> "PushEvent":
+        commits = payload.get("commits", []) or []
+        return cls(
+            repo=payload.get("repository", {}).get("full_name", "unknown/repo"),
+            ref=payload.get("ref", ""),
+            pusher=payload.get("pusher", {}).get("name", "unknown"),
+            commit_count=len(commits),
+            commits=[
+                (((c.get("message") or "").splitlines() or [""])[0], c.get("url") or "")
+                for c in commits[:10]
+            ],
+        )
+
+
+@dataclass
+class _Digest:
+    repo: str
+    due: float
+    events: List[PushEvent] = field(default_factory=list)
+    attempts: int = 0
+
+
+def render_digest(repo: str, events: List[PushEvent]) -> Tuple[str, str]:
+    """
+    (subject, html) for one or more pushes to the same repo.
+    """
+    commits = sum(e.commit_count for e in events)
+    if len(events) == 1:
+        e = events[0]
+        subject = f"[GitHub Push] {repo} {e.ref} by {e.pusher}"
+    else:
+        subject = f"[GitHub Push] {repo}: {len(events)} pushes, {commits} commits"
+
+    sections = []
+    for e in events:
+        items = "".join(
+            f"<li><b>{html.escape(msg)}</b><br/><a href='{html.escape(url, quote=True)}'>{html.escape(url)}</a></li>"
+            for msg, url in e.commits
+        )
+        sections.append(
+            f"<p><b>Ref:</b> {html.escape(e.ref)}<br/>"
+            f"<b>Pusher:</b> {html.escape(e.pusher)}<br/>"
+            f"<b>Commits:</b> {e.commit_count}</p>"
+            f"<ol>{items or '<li>(no commit details)</li>'}</ol>"
+        )
+    body = f"<h2>GitHub Push</h2><p><b>Repo:</b> {html.escape(repo)}</p>" + "<hr/>".join(sections)
+    return subject, body
+
+
+class AlertDispatcher:
+    """
+    Delivers push alerts from a background thread so the webhook can answer
+    GitHub immediately.
+
+    Pushes to the same repo that arrive within `window_seconds` of the first one
+    go out as a single digest e-mail. A failed send is retried with exponential
+    backoff (backoff_seconds, x2 each time, capped at max_backoff_seconds) up to
+    `max_attempts` times, then dropped with a warning. `send` is any callable
+    taking (subject, html), so tests can pass a fake.
+    """
+
+    def __init__(
+        self,
+        send: Sender,
+        window_seconds: float = 30.0,
+        max_attempts: int = 5,
+        backoff_seconds: float = 5.0,
+        max_backoff_seconds: float = 300.0,
+    ) -> None:
+        self._send = send
+        self.window_seconds = float(window_seconds)
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_seconds = float(backoff_seconds)
+        self.max_backoff_seconds = float(max_backoff_seconds)
+
+        self._cond = threading.Condition()
+        self._collecting: Dict[str, _Digest] = {}
+        self._retrying: List[_Digest] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+
+    def submit(self, event: PushEvent) -> None:
+        with self._cond:
+            digest = self._collecting.get(event.repo)
+            if digest is None:
+                digest = self._collecting[event.repo] = _Digest(event.repo, time.monotonic() + self.window_seconds)
+            digest.events.append(event)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._collecting) + len(self._retrying)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Send what is queued now (one attempt each) and stop the thread.
+        """
+        with self._cond:
+            self._stopping = True
+            thread = self._thread
+            self._cond.notify()
+        if thread is not None:
+            thread.join(timeout)
+
+    # -- worker ----------------------------------------------------------------
+    def _take_due(self) -> Optional[List[_Digest]]:
+        """
+        Block until something is due; None means stopped with nothing left.
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                due = [d for d in self._collecting.values() if self._stopping or d.due <= now]
+                due += [d for d in self._retrying if self._stopping or d.due <= now]
+                if due:
+                    for d in due:
+                        if self._collecting.get(d.repo) is d:
+                            del self._collecting[d.repo]
+                    self._retrying = [d for d in self._retrying if d not in due]
+                    return due
+                if self._stopping:
+                    self._thread = None
+                    return None
+                waits = [d.due for d in self._collecting.values()] + [d.due for d in self._retrying]
+                self._cond.wait(min(waits) - now if waits else None)
+
+    def _run(self) -> None:
+        while True:
+            due = self._take_due()
+            if due is None:
+                return
+            for digest in due:
+                self._deliver(digest)
+
+    def _deliver(self, digest: _Digest) -> None:
+        subject, body = render_digest(digest.repo, digest.events)
+        try:
+            self._send(subject, body)
+        except Exception as e:
+            digest.attempts += 1
+            with self._cond:
+                if digest.attempts < self.max_attempts and not self._stopping:
+                    delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (digest.attempts - 1))
+                    digest.due = time.monotonic() + delay
+                    self._retrying.append(digest)
+                    self.retries += 1
+                    return
+                self.failed += 1
+            print(f"[WARN] Alert for {digest.repo} dropped after {digest.attempts} attempt(s): {e!r}")
+            return
+        with self._cond:
+            self.sent += 1
@@ -0,0 +1,310 @@
+# src/local_api/config_history.py
+from __future__ import annotations
+
+import difflib
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.safe_write import atomic_write_text
+
+# A config is stored as a tree: one object for the "frame" (everything except
+# metasys.assets) and one object per asset. Objects are gzip'd canonical JSON
+# named by their sha256, so an unchanged asset is stored once no matter how many
+# versions reference it, and diffing two versions only opens the assets whose
+# hashes differ.
+#
+#   <project>/history/index.jsonl          one line per saved version (append-only)
+#   <project>/history/objects/ab/<sha>.gz   frame / asset / tree objects
+
+AssetRef = Tuple[str, str]  # (asset key, object sha256)
+
+
+def _canonical(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@lru_cache(maxsize=4096)
+def _read_object(path: str) -> bytes:
+    # objects are immutable, so caching by path is safe; the bytes are cached
+    # rather than the parsed object so every caller gets its own copy to mutate
+    with gzip.open(path, "rb") as f:
+        return f.read()
+
+
+def _split(cfg: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[List[Tuple[str, Any]]]]:
+    """
+    (frame, [(asset key, asset), ...]) or (cfg, None) when there is no metasys.assets list.
+    Asset keys are asset_id, made unique with the list position when needed.
+    """
+    metasys = cfg.get("metasys")
+    assets = metasys.get("assets") if isinstance(metasys, dict) else None
+    if not isinstance(assets, list):
+        return cfg, None
+
+    frame = dict(cfg)
+    frame["metasys"] = {k: v for k, v in metasys.items() if k != "assets"}
+
+    keyed: List[Tuple[str, Any]] = []
+    seen = set()
+    for i, asset in enumerate(assets):
+        key = asset.get("asset_id") if isinstance(asset, dict) else None
+        key = str(key) if key not in (None, "") else f"#{i}"
+        if key in seen:
+            key = f"{key}#{i}"
+        seen.add(key)
+        keyed.append((key, asset))
+    return frame, keyed
+
+
+def _render(obj: Any) -> List[str]:
+    from src.utils.config_io import yaml_dump
+
+    return yaml_dump(obj, sort_keys=False, allow_unicode=True).splitlines(keepends=True)
+
+
+def _points_by_id(asset: Any) -> Dict[str, Any]:
+    points = asset.get("points") if isinstance(asset, dict) else None
+    out: Dict[str, Any] = {}
+    for i, p in enumerate(points if isinstance(points, list) else []):
+        pid = p.get("point_id") if isinstance(p, dict) else None
+        out[str(pid) if pid not in (None, "") else f"#{i}"] = p
+    return out
+
+
+def _changed_keys(old: Any, new: Any, skip: Tuple[str, ...] = ()) -> List[str]:
+    old = old if isinstance(old, dict) else {}
+    new = new if isinstance(new, dict) else {}
+    return sorted(k for k in set(old) | set(new) if k not in skip and old.get(k) != new.get(k))
+
+
+class ConfigHistory:
+    """
+    Append-only, content-addressed version history of one project's connector config.
+    """
+
+    def __init__(self, project_dir: Path, keep_versions: int = 100) -> None:
+        self.root = project_dir / "history"
+        self.objects = self.root / "objects"
+        self.index_path = self.root / "index.jsonl"
+        self.keep_versions = max(1, int(keep_versions))
+
+    # -- objects ---------------------------------------------------------------
+    def _object_path(self, sha: str) -> Path:
+        return self.objects / sha[:2] / f"{sha}.gz"
+
+    def _put(self, obj: Any) -> str:
+        data = _canonical(obj)
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._object_path(sha)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6, mtime=0))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        return sha
+
+    def _get(self, sha: str) -> Any:
+        path = self._object_path(sha)
+        if not path.exists():
+            raise KeyError(f"history object missing: {sha}")
+        return json.loads(_read_object(str(path)))
+
+    # -- versions --------------------------------------------------------------
+    def entries(self) -> List[Dict[str, Any]]:
+        if not self.index_path.exists():
+            return []
+        out = []
+        for line in self.index_path.read_text(encoding="utf-8").splitlines():
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                continue  # torn last line after a crash
+        return out
+
+    def entry(self, version: int) -> Optional[Dict[str, Any]]:
+        for e in reversed(self.entries()):
+            if e.get("version") == version:
+                return e
+        return None
+
+    def record(self, version: int, cfg: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store `cfg` (without _version) as `version`. Caller serializes writers.
+        """
+        cfg = {k: v for k, v in cfg.items() if k != "_version"}
+        frame, assets = _split(cfg)
+        tree = {
+            "frame": self._put(frame),
+            "assets": None if assets is None else [[key, self._put(a)] for key, a in assets],
+        }
+        entry = {
+            "version": int(version),
+            "tree": self._put(tree),
+            "saved_at": _utc_now(),
+            "assets": 0 if assets is None else len(assets),
+        }
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        if len(self.entries()) > self.keep_versions:
+            self.prune()
+        return entry
+
+    def _tree(self, entry: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Optional[List[AssetRef]]]:
+        if entry is None:
+            return {}, []
+        tree = self._get(entry["tree"])
+        assets = tree.get("assets")
+        return self._get(tree["frame"]), None if assets is None else [tuple(a) for a in assets]
+
+    def load(self, version: int) -> Optional[Dict[str, Any]]:
+        entry = self.entry(version)
+        if entry is None:
+            return None
+        frame, assets = self._tree(entry)
+        cfg = dict(frame)
+        if assets is not None:
+            cfg["metasys"] = dict(cfg.get("metasys") or {})
+            cfg["metasys"]["assets"] = [self._get(sha) for _, sha in assets]
+        return cfg
+
+    def prune(self) -> int:
+        """
+        Keep the newest keep_versions entries and delete objects nothing references.
+        Returns the number of versions dropped.
+        """
+        entries = self.entries()
+        drop = len(entries) - self.keep_versions
+        if drop <= 0:
+            return 0
+        kept = entries[drop:]
+        atomic_write_text(
+            self.index_path,
+            "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in kept),
+        )
+
+        live = set()
+        for e in kept:
+            live.add(e["tree"])
+            tree = self._get(e["tree"])
+            live.add(tree["frame"])
+            live.update(sha for _, sha in tree.get("assets") or [])
+        for path in self.objects.glob("*/*.gz"):
+            if path.name[:-3] not in live:
+                path.unlink()
+        return drop
+
+    # -- diffs -----------------------------------------------------------------
+    def resolve(self, from_version: Optional[int], to_version: Optional[int]) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Entries for a diff. Defaults: to = latest, from = the version before `to`.
+        A missing `from` (e.g. first version) diffs against an empty config.
+        """
+        entries = self.entries()
+        if not entries:
+            return None, None
+        by_version = {e["version"]: e for e in entries}
+
+        to_entry = entries[-1] if to_version is None else by_version.get(to_version)
+        if to_entry is None:
+            raise KeyError(f"version {to_version} not in history")
+        if from_version is None:
+            older = [e for e in entries if e["version"] < to_entry["version"]]
+            return (older[-1] if older else None), to_entry
+        from_entry = by_version.get(from_version)
+        if from_entry is None:
+            raise KeyError(f"version {from_version} not in history")
+        return from_entry, to_entry
+
+    def _asset_changes(
+        self, old: Optional[List[AssetRef]], new: Optional[List[AssetRef]]
+    ) -> Tuple[List[str], List[str], List[Tuple[str, Optional[str], Optional[str]]]]:
+        old_map = dict(old or [])
+        new_map = dict(new or [])
+        added = [k for k, _ in new or [] if k not in old_map]
+        removed = [k for k, _ in old or [] if k not in new_map]
+        changed = [(k, old_map[k], sha) for k, sha in new or [] if k in old_map and old_map[k] != sha]
+        return added, removed, changed
+
+    def diff(self, from_entry: Optional[Dict], to_entry: Optional[Dict]) -> Dict[str, Any]:
+        """
+        Structural diff: changed top-level sections, and assets added/removed/changed
+        with their point-level changes. Only assets whose hashes differ are opened.
+        """
+        old_frame, old_assets = self._tree(from_entry)
+        new_frame, new_assets = self._tree(to_entry)
+        added, removed, changed = self._asset_changes(old_assets, new_assets)
+
+        changed_assets = []
+        for key, old_sha, new_sha in changed:
+            old_a, new_a = self._get(old_sha), self._get(new_sha)
+            old_pts, new_pts = _points_by_id(old_a), _points_by_id(new_a)
+            changed_assets.append(
+                {
+                    "asset_id": key,
+                    "fields": _changed_keys(old_a, new_a, skip=("points",)),
+                    "points_added": [p for p in new_pts if p not in old_pts],
+                    "points_removed": [p for p in old_pts if p not in new_pts],
+                    "points_changed": [p for p in new_pts if p in old_pts and old_pts[p] != new_pts[p]],
+                }
+            )
+
+        sections = _changed_keys(old_frame, new_frame, skip=("metasys",))
+        sections += [f"metasys.{k}" for k in _changed_keys(old_frame.get("metasys"), new_frame.get("metasys"))]
+        return {
+            "from": None if from_entry is None else from_entry["version"],
+            "to": None if to_entry is None else to_entry["version"],
+            "sections_changed": sections,
+            "assets_added": added,
+            "assets_removed": removed,
+            "assets_changed": changed_assets,
+        }
+
+    def yaml_diff(self, from_entry: Optional[Dict], to_entry: Optional[Dict], context: int = 3) -> str:
+        """
+        Unified diff of the YAML rendering, hunk by hunk: the frame first, then each
+        added/removed/changed asset. Unchanged assets are never rendered.
+        """
+        old_frame, old_assets = self._tree(from_entry)
+        new_frame, new_assets = self._tree(to_entry)
+        a = "empty" if from_entry is None else f"v{from_entry['version']}"
+        b = "empty" if to_entry is None else f"v{to_entry['version']}"
+
+        out: List[str] = []
+        if old_frame != new_frame:
+            out += difflib.unified_diff(
+                _render(old_frame) if old_frame else [], _render(new_frame), f"{a}/config", f"{b}/config", n=context
+            )
+
+        added, removed, changed = self._asset_changes(old_assets, new_assets)
+        new_map = dict(new_assets or [])
+        old_map = dict(old_assets or [])
+        hunks = [(k, None, new_map[k]) for k in added]
+        hunks += [(k, old_map[k], None) for k in removed]
+        hunks += changed
+        for key, old_sha, new_sha in hunks:
+            out += difflib.unified_diff(
+                _render(self._get(old_sha)) if old_sha else [],
+                _render(self._get(new_sha)) if new_sha else [],
+                f"{a}/metasys.assets[{key}]",
+                f"{b}/metasys.assets[{key}]",
+                n=context,
+            )
+        return "".join(line if line.endswith("\n") else line + "\n" for line in out)
@@ -0,0 +1,298 @@
+# src/local_api/csv_import.py
+from __future__ import annotations
+
+import codecs
+import csv
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.import_points_csv import COLUMNS, REQUIRED_COLS, RowError, parse_point, point_to_dict
+from src.utils.csv_chunks import column_positions
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# Decompressed bytes handled per step, so a small gzip chunk that expands a lot
+# is still processed in bounded pieces.
+_INFLATE_STEP = 1024 * 1024
+
+# Longest record (characters) held while its quotes are open; past this a
+# stray '"' is assumed and the upload fails instead of buffering the rest.
+_MAX_RECORD_CHARS = 256 * 1024
+
+AssetKey = Tuple[str, str]  # (asset_id, asset_name)
+Event = Dict[str, Any]
+
+
+def _split_lines(text: str) -> List[str]:
+    # "\n" only: str.splitlines() would also break on \r, \x1c, \u2028, ... inside fields
+    parts = text.split("\n")
+    lines = [p + "\n" for p in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+class StreamingCsvImport:
+    """
+    Validates a points CSV fed to it chunk by chunk (raw or gzip bytes) with the
+    rules of src.import_points_csv, keeping only the validated points, never the file.
+
+    feed() and finish() return events to stream back to the client:
+      {"event": "progress", "rows": n}
+      {"event": "error", "row": n, "detail": ...}   row 1 is the header
+      {"event": "warning", "row": n, "detail": ...}
+    Only the first `max_reported_errors` errors are reported; all are counted.
+    A row with any error is left out, and the import only applies if there
+    were none (see assets()).
+    """
+
+    def __init__(
+        self,
+        allow_replace_me: bool = True,
+        gzip: Optional[bool] = None,
+        progress_every: int = 10_000,
+        max_reported_errors: int = 200,
+    ) -> None:
+        self.allow_replace_me = allow_replace_me
+        self.progress_every = max(1, int(progress_every))
+        self.max_reported_errors = int(max_reported_errors)
+
+        self._gzip = gzip  # None: decide from the first bytes
+        self._inflate = None
+        self._decode = codecs.getincrementaldecoder("utf-8-sig")()
+        self._tail = ""  # text after the last newline
+        self._pending: List[str] = []  # lines of a record whose quotes are still open
+        self._pending_chars = 0
+        self._quotes = 0
+
+        self._positions: Optional[List[int]] = None
+        self._width = 0
+        self.fatal: Optional[str] = None
+
+        self.rows = 0
+        self.errors = 0
+        self.replace_me = 0
+        self.duplicates = 0
+        self.bytes_in = 0
+        self._rownum = 1
+        self._next_progress = self.progress_every
+        self._seen: Dict[Tuple[str, str], int] = {}
+        self._grouped: Dict[AssetKey, List[Dict[str, Any]]] = {}
+
+    # -- input -----------------------------------------------------------------
+    def feed(self, data: bytes) -> List[Event]:
+        events: List[Event] = []
+        if self.fatal is not None or not data:
+            return events
+        self.bytes_in += len(data)
+
+        if self._gzip is None:
+            self._gzip = data[:2] == _GZIP_MAGIC
+        if not self._gzip:
+            self._feed_bytes(data, events)
+            return events
+
+        if self._inflate is None:
+            self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            while data and self.fatal is None:
+                self._feed_bytes(self._inflate.decompress(data, _INFLATE_STEP), events)
+                data = self._inflate.unconsumed_tail
+        except zlib.error as e:
+            self._fail(f"Invalid gzip data: {e}", events)
+        return events
+
+    def finish(self) -> List[Event]:
+        events: List[Event] = []
+        if self.fatal is None and self._inflate is not None:
+            try:
+                self._feed_bytes(self._inflate.flush(), events)
+            except zlib.error as e:
+                self._fail(f"Invalid gzip data: {e}", events)
+            if self.fatal is None and not self._inflate.eof:
+                self._fail("Gzip upload is truncated.", events)
+        if self.fatal is None:
+            try:
+                text = self._tail + self._decode.decode(b"", final=True)
+            except UnicodeDecodeError as e:
+                self._fail(f"CSV is not valid UTF-8: {e}", events)
+                return events
+            self._tail = ""
+            if text:
+                self._take_lines(_split_lines(text), events)
+            if self._pending:
+                self._parse("".join(self._pending), events)
+                self._pending = []
+        if self.fatal is None and self._positions is None:
+            self._fail("CSV has no header row.", events)
+        elif self.fatal is None and self.rows == 0:
+            self._fail("CSV has no data rows.", events)
+        events.append({"event": "progress", "rows": self.rows})
+        return events
+
+    def _fail(self, detail: str, events: List[Event]) -> None:
+        self.fatal = detail
+        events.append({"event": "error", "row": None, "detail": detail})
+
+    def _feed_bytes(self, data: bytes, events: List[Event]) -> None:
+        if not data:
+            return
+        try:
+            text = self._tail + self._decode.decode(data)
+        except UnicodeDecodeError as e:
+            self._fail(f"CSV is not valid UTF-8: {e}", events)
+            return
+        lines = _split_lines(text)
+        # the last piece may be half a line; keep it for the next chunk
+        self._tail = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        self._take_lines(lines, events)
+
+    def _take_lines(self, lines: List[str], events: List[Event]) -> None:
+        """
+        Group physical lines into records: a newline only ends a record when an
+        even number of '"' came before it (same rule as split_ranges).
+        """
+        complete: List[str] = []
+        for line in lines:
+            self._pending.append(line)
+            self._pending_chars += len(line)
+            self._quotes += line.count('"')
+            if self._quotes % 2 == 0:
+                complete.extend(self._pending)
+                self._pending = []
+                self._pending_chars = 0
+                self._quotes = 0
+            elif self._pending_chars > _MAX_RECORD_CHARS:
+                if complete:
+                    self._parse("".join(complete), events)
+                self._pending = []
+                self._fail(
+                    f"Unbalanced quote: the record after row {self._rownum} runs past "
+                    f"{_MAX_RECORD_CHARS:,} characters.",
+                    events,
+                )
+                return
+        if complete:
+            self._parse("".join(complete), events)
+
+    # -- validation ------------------------------------------------------------
+    def _parse(self, text: str, events: List[Event]) -> None:
+        try:
+            self._parse_records(text, events)
+        except csv.Error as e:
+            self._fail(f"Malformed CSV after row {self._rownum}: {e}", events)
+
+    def _parse_records(self, text: str, events: List[Event]) -> None:
+        for raw in csv.reader(_split_lines(text)):
+            if self.fatal is not None:
+                return
+            if not raw:
+                continue
+            if self._positions is None:
+                self._header(raw, events)
+                continue
+            self._rownum += 1
+            self.rows += 1
+            if len(raw) < self._width:
+                raw.extend([""] * (self._width - len(raw)))
+            self._row(self._rownum, [raw[i].strip() if i >= 0 else "" for i in self._positions], events)
+            if self.rows >= self._next_progress:
+                events.append({"event": "progress", "rows": self.rows})
+                self._next_progress += self.progress_every
+
+    def _header(self, raw: List[str], events: List[Event]) -> None:
+        header = [h.strip() for h in raw]
+        missing = [c for c in REQUIRED_COLS if c not in header]
+        if missing:
+            self._fail(f"CSV missing required columns: {', '.join(missing)}", events)
+            return
+        self._positions = column_positions(header, COLUMNS)
+        self._width = len(header)
+
+    def _error(self, rownum: int, detail: str, events: List[Event]) -> None:
+        self.errors += 1
+        if self.errors <= self.max_reported_errors:
+            events.append({"event": "error", "row": rownum, "detail": detail})
+
+    def _row(self, rownum: int, fields: List[str], events: List[Event]) -> None:
+        # the same row rules as src.import_points_csv (first problem only)
+        replace_me: List[int] = []
+        try:
+            key, point = parse_point(rownum, fields, replace_me)
+        except RowError as e:
+            self.replace_me += len(replace_me)
+            self._error(rownum, e.detail, events)
+            return
+        if replace_me:
+            self.replace_me += 1
+            if not self.allow_replace_me:
+                self._error(rownum, "source_ref contains REPLACE_ME (not allowed in strict mode).", events)
+                return
+            if self.replace_me <= self.max_reported_errors:
+                events.append({"event": "warning", "row": rownum, "detail": "source_ref contains REPLACE_ME."})
+
+        # a repeated (asset_id, point_id) is only a warning, as in preflight;
+        # like the CLI import, both rows are kept
+        first = self._seen.setdefault((key[0], point.point_id), rownum)
+        if first != rownum:
+            self.duplicates += 1
+            if self.duplicates <= self.max_reported_errors:
+                events.append(
+                    {
+                        "event": "warning",
+                        "row": rownum,
+                        "detail": f"Duplicate (asset_id, point_id) ({key[0]}, {point.point_id}); first seen on row {first}.",
+                    }
+                )
+
+        points = self._grouped.get(key)
+        if points is None:
+            self._grouped[key] = points = []
+        points.append(point_to_dict(point))
+
+    # -- result ----------------------------------------------------------------
+    @property
+    def ok(self) -> bool:
+        return self.fatal is None and self.errors == 0
+
+    def assets(self) -> List[Dict[str, Any]]:
+        """
+        metasys.assets entries in the order src.import_points_csv writes them:
+        assets by (asset_id, name), points by (tier, name, point_id).
+        """
+        return [
+            {
+                "asset_id": asset_id,
+                "name": asset_name,
+                "points": sorted(points, key=lambda p: (p["tier"], p["name"], p["point_id"])),
+            }
+            for (asset_id, asset_name), points in sorted(self._grouped.items())
+        ]
+
+
+def merge_assets(config: Dict[str, Any], assets: List[Dict[str, Any]], replace: bool) -> Dict[str, Any]:
+    """
+    Copy of `config` with the imported assets in metasys.assets. With replace,
+    the imported list is all there is; otherwise an imported asset takes the
+    place of existing ones with the same asset_id and new ones are appended.
+    """
+    merged = {k: v for k, v in config.items() if k != "_version"}
+    metasys = dict(merged.get("metasys") or {})
+    if replace:
+        metasys["assets"] = assets
+    else:
+        incoming = {a["asset_id"]: a for a in assets}
+        result: List[Dict[str, Any]] = []
+        placed = set()
+        for existing in metasys.get("assets") or []:
+            asset_id = existing.get("asset_id")
+            if asset_id in incoming:
+                if asset_id not in placed:
+                    result.extend(a for a in assets if a["asset_id"] == asset_id)
+                    placed.add(asset_id)
+            else:
+                result.append(existing)
+        result.extend(a for a in assets if a["asset_id"] not in placed)
+        metasys["assets"] = result
+    merged["metasys"] = metasys
+    return merged
@@ -4,21 +4,46 @@ from __future__ import annotations
 import os
 import json
 import hmac
+import asyncio
 import hashlib
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import Request, HTTPException
 
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
+from src.history_store import query_history
+from src.latest_values import LatestValuesReader
+from src.local_api.alerts import AlertDispatcher, PushEvent
+from src.local_api.config_history import ConfigHistory
+from src.local_api.csv_import import StreamingCsvImport, merge_assets
+from src.point_registry import PointRegistry
+from src.utils.safe_write import atomic_write_text
+
 APP_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = APP_DIR / "projects"
 
-app = FastAPI(title="Metasys Connector Local API", version="0.1.0")
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    yield
+    # send queued push alerts before exiting
+    await run_in_threadpool(_ALERTS.stop)
+
+
+app = FastAPI(title="Metasys Connector Local API", version="0.1.0", lifespan=_lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +51,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
+)
+# Configs and YAML are large and very compressible; small bodies aren't worth it.
+# NDJSON progress streams are left alone so each line goes out as it is written.
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=1024,
+    compresslevel=6,
+    exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/x-ndjson",),
 )
 
 
@@ -75,8 +109,312 @@ def _read_json(path: Path) -> Dict[str, Any]:
 
 
 def _write_json(path: Path, obj: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(obj, indent=2, sort_keys=True), encoding="utf-8")
+    # atomic replace: concurrent readers see the old or the new file, never half of one
+    atomic_write_text(path, json.dumps(obj, indent=2, sort_keys=True))
+
+
+# Blocking file work (and YAML rendering) runs on this pool, never on the event
+# loop. It is bounded so a burst of requests queues here instead of piling
+# threads onto one disk.
+_IO_POOL = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("LOCAL_API_IO_THREADS", "8")),
+    thread_name_prefix="local-api-io",
+)
+
+_T = TypeVar("_T")
+
+
+async def _io(fn: Callable[..., _T], *args: Any) -> _T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_IO_POOL, functools.partial(fn, *args))
+
+
+_LOCKS_GUARD = threading.Lock()
+_PROJECT_LOCKS: Dict[str, threading.Lock] = {}
+
+
+def _project_lock(project_id: str) -> threading.Lock:
+    """
+    Serializes writes (and read-modify-write sequences) within one project.
+    Readers don't take it; see _write_json.
+    """
+    with _LOCKS_GUARD:
+        lock = _PROJECT_LOCKS.get(project_id)
+        if lock is None:
+            lock = _PROJECT_LOCKS[project_id] = threading.Lock()
+        return lock
+
+
+_Stamp = Optional[Tuple[int, int]]
+
+
+def _stamp(path: Path) -> _Stamp:
+    """
+    (mtime_ns, size) of a file, or None if it does not exist.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _ProjectEntry:
+    __slots__ = ("meta", "version", "meta_stamp", "config_stamp", "checked_at", "summary")
+
+    def __init__(self) -> None:
+        self.meta: Dict[str, Any] = {}
+        self.version = 0
+        self.meta_stamp: _Stamp = None
+        self.config_stamp: _Stamp = None
+        self.checked_at = 0.0
+        self.summary: Dict[str, Any] = {}
+
+
+class ProjectIndex:
+    """
+    Process-wide cache of what GET /projects returns: each project's meta.json
+    fields plus its config _version.
+
+    Writes made through the API update the index directly. Edits made outside the
+    API are picked up by comparing (mtime, size) stamps, at most once per
+    `revalidate_seconds` per project (and for the project directory listing), so a
+    UI polling the list costs dictionary lookups, not JSON parsing.
+
+    The index also hands out ETags: one for the listing (bumped on every change it
+    observes) and one per project config (version + file stamp).
+    """
+
+    def __init__(self, data_dir: Path, revalidate_seconds: float = 1.0) -> None:
+        self._data_dir = data_dir
+        self._revalidate_seconds = revalidate_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _ProjectEntry] = {}
+        self._order: List[str] = []
+        self._dir_stamp: Optional[Tuple[int, int]] = None
+        self._dir_checked_at = float("-inf")
+        # listing ETag = process epoch + change counter, so tags never repeat across restarts
+        self._epoch = time.time_ns()
+        self._generation = 0
+
+    # -- reads --------------------------------------------------------------
+    def snapshot(self) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        (ETag, project summaries sorted by project_id).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refresh_listing(now)
+            out = []
+            for project_id in self._order:
+                entry = self._entries[project_id]
+                if now - entry.checked_at >= self._revalidate_seconds:
+                    self._revalidate(project_id, entry, now)
+                out.append(entry.summary)
+            return f'W/"p{self._epoch:x}-{self._generation}"', out
+
+    def config_etag(self, project_id: str) -> str:
+        """
+        ETag for the project's config.json: its _version plus (mtime, size), so
+        external edits that keep the version still change the tag.
+        """
+        with self._lock:
+            entry = self._entries.get(project_id)
+            now = time.monotonic()
+            if entry is None:
+                entry = self._entry_for_write(project_id)
+            elif now - entry.checked_at >= self._revalidate_seconds:
+                self._revalidate(project_id, entry, now)
+            mtime_ns, size = entry.config_stamp or (0, 0)
+            return f'W/"v{entry.version}-{mtime_ns:x}-{size:x}"'
+
+    # -- writes made through the API -----------------------------------------
+    def record_meta(self, project_id: str, meta: Dict[str, Any]) -> None:
+        with self._lock:
+            entry = self._entry_for_write(project_id)
+            entry.meta = dict(meta)
+            entry.meta_stamp = _stamp(self._data_dir / project_id / "meta.json")
+            entry.summary = self._summary(project_id, entry)
+            self._generation += 1
+
+    def record_version(self, project_id: str, version: int) -> None:
+        with self._lock:
+            entry = self._entry_for_write(project_id)
+            entry.version = int(version)
+            entry.config_stamp = _stamp(self._data_dir / project_id / "config.json")
+            entry.summary = self._summary(project_id, entry)
+            self._generation += 1
+
+    def forget(self, project_id: str) -> None:
+        with self._lock:
+            if self._entries.pop(project_id, None) is not None:
+                self._order = sorted(self._entries)
+                self._generation += 1
+
+    # -- internals (caller holds the lock) ------------------------------------
+    def _entry_for_write(self, project_id: str) -> _ProjectEntry:
+        entry = self._entries.get(project_id)
+        if entry is None:
+            entry = self._entries[project_id] = _ProjectEntry()
+            self._revalidate(project_id, entry, time.monotonic())
+            self._order = sorted(self._entries)
+            self._generation += 1
+        return entry
+
+    def _refresh_listing(self, now: float) -> None:
+        if now - self._dir_checked_at < self._revalidate_seconds:
+            return
+        self._dir_checked_at = now
+
+        self._data_dir.mkdir(parents=True, exist_ok=True)
+        st = self._data_dir.stat()
+        # nlink changes when a subdirectory is added or removed, even within one mtime tick
+        dir_stamp = (st.st_mtime_ns, st.st_nlink)
+        if dir_stamp == self._dir_stamp:
+            return
+        self._dir_stamp = dir_stamp
+
+        present = {
+            p.name for p in self._data_dir.iterdir() if p.is_dir() and not p.name.startswith("_")
+        }
+        for project_id in list(self._entries):
+            if project_id not in present:
+                del self._entries[project_id]
+        for project_id in present:
+            if project_id not in self._entries:
+                entry = self._entries[project_id] = _ProjectEntry()
+                self._revalidate(project_id, entry, now)
+        self._order = sorted(self._entries)
+        self._generation += 1
+
+    def _revalidate(self, project_id: str, entry: _ProjectEntry, now: float) -> None:
+        proj = self._data_dir / project_id
+        meta_stamp = _stamp(proj / "meta.json")
+        config_stamp = _stamp(proj / "config.json")
+        changed = not entry.summary
+
+        if meta_stamp != entry.meta_stamp or changed:
+            entry.meta_stamp = meta_stamp
+            meta: Dict[str, Any] = {}
+            if meta_stamp is not None:
+                try:
+                    meta = _read_json(proj / "meta.json")
+                except (OSError, ValueError):
+                    meta = {}
+            entry.meta = meta or _default_meta(project_id)
+            changed = True
+
+        if config_stamp != entry.config_stamp or changed:
+            entry.config_stamp = config_stamp
+            version = 0
+            if config_stamp is not None:
+                try:
+                    version = int(_read_json(proj / "config.json").get("_version", 0))
+                except Exception:
+                    version = 0
+            entry.version = version
+            changed = True
+
+        if changed:
+            entry.summary = self._summary(project_id, entry)
+            self._generation += 1
+        entry.checked_at = now
+
+    @staticmethod
+    def _summary(project_id: str, entry: _ProjectEntry) -> Dict[str, Any]:
+        meta = entry.meta
+        return {
+            "project_id": project_id,
+            "name": meta.get("name", project_id),
+            "updated_at": meta.get("updated_at") or _utc_now(),
+            "publishing_enabled": bool(meta.get("publishing_enabled", False)),
+            "last_scan_at": meta.get("last_scan_at"),
+            "device_count": meta.get("device_count"),
+            "version": entry.version,
+        }
+
+
+_PROJECTS = ProjectIndex(DATA_DIR)
+
+
+# project_id -> (config _version, registry built from that version)
+_REGISTRIES: Dict[str, tuple[int, PointRegistry]] = {}
+
+
+def _project_registry(project_id: str) -> tuple[int, PointRegistry]:
+    """
+    PointRegistry for a project's saved connector config, rebuilt only when
+    the config _version changes.
+    """
+    cfg = _read_json(_config_path(project_id))
+    if not cfg:
+        raise HTTPException(status_code=404, detail="No config saved for project yet.")
+
+    version = int(cfg.get("_version", 0))
+    cached = _REGISTRIES.get(project_id)
+    if cached is not None and cached[0] == version:
+        return cached
+
+    try:
+        registry = PointRegistry.from_config(cfg)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Config has no usable metasys.assets / polling.defaults: {e!r}",
+        )
+    _REGISTRIES[project_id] = (version, registry)
+    return version, registry
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """
+    True if the request's If-None-Match matches etag (weak comparison, RFC 9110).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    want = etag[2:] if etag.startswith("W/") else etag
+    for tag in header.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == want:
+            return True
+    return False
+
+
+def _conditional(request: Request, etag: str) -> Optional[Response]:
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def _tagged(content: Any, etag: str) -> JSONResponse:
+    return JSONResponse(content, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+class _UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator is still reading the request body.
+    Starlette's default disconnect listener would consume receive() and steal
+    upload chunks, so it is left out; a disconnect surfaces in request.stream().
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+def _render_yaml(cfg: Dict[str, Any]) -> str:
+    try:
+        from src.utils.config_io import yaml_dump
+
+        return yaml_dump(cfg, sort_keys=False)
+    except Exception:
+        return json.dumps(cfg, indent=2)
+
+
+# project_id -> (config ETag, YAML rendered from that config)
+_RENDERED_YAML: Dict[str, Tuple[str, str]] = {}
 
 
 def _delete_tree(p: Path) -> None:
@@ -97,6 +435,210 @@ def _delete_tree(p: Path) -> None:
     p.rmdir()
 
 
+# ----------------------------
+# Storage (blocking; called through _io)
+# ----------------------------
+def _load_config(project_id: str) -> Dict[str, Any]:
+    path = _config_path(project_id)
+    return _read_json(path) if path.exists() else {"connector": {}}
+
+
+_HISTORY_KEEP = int(os.environ.get("LOCAL_API_HISTORY_KEEP", "100"))
+
+
+def _history(project_id: str) -> ConfigHistory:
+    return ConfigHistory(_proj_dir(project_id), keep_versions=_HISTORY_KEEP)
+
+
+def _store_config(project_id: str, config_json: Dict[str, Any]) -> Dict[str, Any]:
+    with _project_lock(project_id):
+        return _store_config_locked(project_id, config_json)
+
+
+def _store_config_locked(project_id: str, config_json: Dict[str, Any]) -> Dict[str, Any]:
+    path = _config_path(project_id)
+    existing = _read_json(path) if path.exists() else {}
+    version = int(existing.get("_version", 0)) + 1
+
+    to_save = dict(config_json)
+    to_save["_version"] = version
+
+    _write_json(path, to_save)
+    _PROJECTS.record_version(project_id, version)
+
+    history = _history(project_id)
+    if existing and not history.entries():
+        # config saved before history existed: keep it as the diff baseline
+        history.record(int(existing.get("_version", 0)), existing)
+    history.record(version, to_save)
+    return to_save
+
+
+def _import_points(project_id: str, assets: List[Dict[str, Any]], replace: bool) -> Dict[str, Any]:
+    # read-merge-write under one lock so a concurrent save can't be lost
+    with _project_lock(project_id):
+        merged = merge_assets(_load_config(project_id), assets, replace)
+        return _store_config_locked(project_id, merged)
+
+
+def _create_project_files(project_id: str, name: str) -> Dict[str, Any]:
+    with _project_lock(project_id):
+        # create directory
+        _proj_dir(project_id)
+
+        # write meta.json
+        meta = _default_meta(project_id)
+        meta["name"] = name or project_id
+        meta["updated_at"] = _utc_now()
+        _write_json(_meta_path(project_id), meta)
+        _PROJECTS.record_meta(project_id, meta)
+
+    # do NOT overwrite config.json automatically
+    return meta
+
+
+def _delete_project_files(project_id: str) -> None:
+    with _project_lock(project_id):
+        p = DATA_DIR / project_id
+        if not p.exists():
+            return
+        if p.name.startswith("_"):
+            raise HTTPException(status_code=400, detail="Refusing to delete protected project folder.")
+        _delete_tree(p)
+        _REGISTRIES.pop(project_id, None)
+        _RENDERED_YAML.pop(project_id, None)
+        _PROJECTS.forget(project_id)
+
+
+def _generate_yaml_files(project_id: str, write_to_disk: bool) -> Tuple[str, Optional[Path]]:
+    cfg = _read_json(_config_path(project_id))
+    if not cfg:
+        raise HTTPException(status_code=404, detail="No config saved for project yet.")
+
+    yaml_text = _render_yaml(cfg)
+    if not write_to_disk:
+        return yaml_text, None
+
+    with _project_lock(project_id):
+        out_path = atomic_write_text(_proj_dir(project_id) / "generated.yml", yaml_text)
+    return yaml_text, out_path
+
+
+def _rendered_yaml(project_id: str, etag: str) -> str:
+    cached = _RENDERED_YAML.get(project_id)
+    if cached is not None and cached[0] == etag:
+        return cached[1]
+
+    cfg = _read_json(_config_path(project_id))
+    if not cfg:
+        raise HTTPException(status_code=404, detail="No config saved for project yet.")
+    yaml_text = _render_yaml(cfg)
+    _RENDERED_YAML[project_id] = (etag, yaml_text)
+    return yaml_text
+
+
+def _history_entries(project_id: str) -> List[Dict[str, Any]]:
+    return _history(project_id).entries()
+
+
+def _history_version(project_id: str, version: int) -> Dict[str, Any]:
+    # under the project lock: a save can prune the objects this version points at
+    with _project_lock(project_id):
+        cfg = _history(project_id).load(version)
+    if cfg is None:
+        raise HTTPException(status_code=404, detail=f"Version {version} not in history.")
+    return cfg
+
+
+def _history_diff(
+    project_id: str, from_version: Optional[int], to_version: Optional[int], unified: bool
+) -> Dict[str, Any]:
+    history = _history(project_id)
+    with _project_lock(project_id):
+        try:
+            old, new = history.resolve(from_version, to_version)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e.args[0]))
+        if new is None:
+            return {"from": None, "to": None, "diff_unified": ""} if unified else history.diff(None, None)
+        if unified:
+            return {
+                "from": None if old is None else old["version"],
+                "to": new["version"],
+                "diff_unified": history.yaml_diff(old, new),
+            }
+        return history.diff(old, new)
+
+
+def _connector_file(project_id: str, section: str, default_name: str) -> Path:
+    """
+    Where the connector for this project writes a runtime file (same rule as
+    src.main): cfg[section].path, else <polling.out_dir>/<default_name>.
+    """
+    cfg = _read_json(_config_path(project_id))
+    sect = cfg.get(section) or {}
+    polling = cfg.get("polling") or {}
+    path = Path(sect.get("path") or Path(polling.get("out_dir", "out")) / default_name)
+    return path if path.is_absolute() else APP_DIR / path
+
+
+def _point_history(
+    project_id: str, asset_id: str, point_id: str, start: float, end: float, buckets: int
+) -> Dict[str, Any]:
+    db = _connector_file(project_id, "history", "history.sqlite")
+    return query_history(db, asset_id, point_id, start, end, buckets)
+
+
+# table path -> reader (keeps the mapping open between requests)
+_VALUE_READERS: Dict[Path, LatestValuesReader] = {}
+_VALUE_READERS_LOCK = threading.Lock()
+
+
+def _latest_values(project_id: str, asset_ids: List[str], point_ids: List[str]) -> Dict[str, Any]:
+    path = _connector_file(project_id, "latest_values", "latest_values.bin")
+    with _VALUE_READERS_LOCK:
+        reader = _VALUE_READERS.get(path)
+        if reader is None:
+            reader = _VALUE_READERS[path] = LatestValuesReader(path)
+        try:
+            snap = reader.read(asset_ids, point_ids)
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    if snap is None:
+        raise HTTPException(status_code=503, detail="No live values: the connector is not running for this project.")
+    return snap
+
+
+def _select_points(
+    project_id: str,
+    asset_id: Optional[str],
+    point_id: Optional[str],
+    source_ref: Optional[str],
+    tier: Optional[int],
+) -> Dict[str, Any]:
+    version, reg = _project_registry(project_id)
+
+    if asset_id is not None and point_id is not None:
+        pid = reg.id_of(asset_id, point_id)
+        ids = [] if pid is None else [pid]
+    elif source_ref is not None:
+        ids = list(reg.ids_for_source_ref(source_ref))
+    elif tier is not None:
+        ids = list(reg.ids_for_tier(tier))
+    else:
+        ids = list(range(len(reg)))
+
+    # remaining filters narrow whichever index was used
+    if asset_id is not None:
+        ids = [i for i in ids if reg.asset_id[i] == asset_id]
+    if source_ref is not None:
+        ids = [i for i in ids if reg.source_ref[i] == source_ref]
+    if tier is not None:
+        ids = [i for i in ids if reg.tier[i] == tier]
+
+    return {"version": version, "count": len(ids), "points": [reg.to_dict(i) for i in ids]}
+
+
 # ----------------------------
 # Models
 # ----------------------------
@@ -122,224 +664,216 @@ def health():
 
 
 @app.get("/api/v1/projects")
-def list_projects():
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    projects = []
-
-    for p in sorted(DATA_DIR.iterdir()):
-        if not p.is_dir():
-            continue
-        if p.name.startswith("_"):
-            continue
-
-        project_id = p.name
-        meta_path = p / "meta.json"
-        cfg_path = p / "config.json"
-
-        meta = _read_json(meta_path) if meta_path.exists() else _default_meta(project_id)
-
-        # read version from config.json if present
-        version = 0
-        if cfg_path.exists():
-            try:
-                cfg = _read_json(cfg_path)
-                version = int(cfg.get("_version", 0))
-            except Exception:
-                version = 0
-
-        # normalize expected fields
-        meta.setdefault("name", project_id)
-        meta.setdefault("updated_at", _utc_now())
-        meta.setdefault("publishing_enabled", False)
-        meta.setdefault("last_scan_at", None)
-        meta.setdefault("device_count", None)
-
-        projects.append(
-            {
-                "project_id": project_id,
-                "name": meta.get("name", project_id),
-                "updated_at": meta.get("updated_at", _utc_now()),
-                "publishing_enabled": bool(meta.get("publishing_enabled", False)),
-                "last_scan_at": meta.get("last_scan_at"),
-                "device_count": meta.get("device_count"),
-                "version": version,
-            }
-        )
-
-    return {"projects": projects}
+async def list_projects(request: Request):
+    etag, projects = await _io(_PROJECTS.snapshot)
+    return _conditional(request, etag) or _tagged({"projects": projects}, etag)
 
 
 @app.post("/api/v1/projects")
-def create_project(body: CreateProjectBody):
+async def create_project(body: CreateProjectBody):
     project_id = body.project_id.strip()
     if not project_id:
         raise HTTPException(status_code=400, detail="project_id required")
 
-    # create directory
-    _proj_dir(project_id)
-
-    # write meta.json
-    meta = _default_meta(project_id)
-    meta["name"] = (body.name or "").strip() or project_id
-    meta["updated_at"] = _utc_now()
-    _write_json(_meta_path(project_id), meta)
-
-    # do NOT overwrite config.json automatically
+    meta = await _io(_create_project_files, project_id, (body.name or "").strip())
     return {"ok": True, "project": meta}
 
 
 @app.delete("/api/v1/projects/{project_id}")
-def delete_project(project_id: str):
-    p = DATA_DIR / project_id
-    if not p.exists():
-        return {"ok": True}
-    if p.name.startswith("_"):
-        raise HTTPException(status_code=400, detail="Refusing to delete protected project folder.")
-    _delete_tree(p)
+async def delete_project(project_id: str):
+    await _io(_delete_project_files, project_id)
     return {"ok": True}
 
 
 @app.get("/api/v1/projects/{project_id}/connector/config")
-def get_connector_config(project_id: str):
-    path = _config_path(project_id)
-    config_json = _read_json(path) if path.exists() else {"connector": {}}
+async def get_connector_config(project_id: str, request: Request):
+    etag = await _io(_PROJECTS.config_etag, project_id)
+    unchanged = _conditional(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    config_json = await _io(_load_config, project_id)
 
     version = int(config_json.get("_version", 0))
     cleaned = {k: v for k, v in config_json.items() if k != "_version"}
 
-    return {"config_json": cleaned, "version": version}
+    return _tagged({"config_json": cleaned, "version": version}, etag)
 
 
 @app.put("/api/v1/projects/{project_id}/connector/config")
-def save_connector_config(project_id: str, body: SaveConfigBody):
+async def save_connector_config(project_id: str, body: SaveConfigBody):
     if body.config_json is None or body.config_json == {}:
         raise HTTPException(status_code=400, detail="config_json cannot be empty")
 
-    path = _config_path(project_id)
-    existing = _read_json(path) if path.exists() else {}
-    version = int(existing.get("_version", 0)) + 1
-
-    to_save = dict(body.config_json)
-    to_save["_version"] = version
-
-    _write_json(path, to_save)
-
-    cleaned = {k: v for k, v in to_save.items() if k != "_version"}
-    return {"ok": True, "version": version, "config_json": cleaned}
+    saved = await _io(_store_config, project_id, body.config_json)
 
+    cleaned = {k: v for k, v in saved.items() if k != "_version"}
+    return {"ok": True, "version": saved["_version"], "config_json": cleaned}
 
-@app.post("/api/v1/projects/{project_id}/connector/generate-yaml")
-def generate_yaml(project_id: str, body: GenerateYamlBody):
-    cfg = _read_json(_config_path(project_id))
-    if not cfg:
-        raise HTTPException(status_code=404, detail="No config saved for project yet.")
-
-    try:
-        import yaml  # type: ignore
 
-        yaml_text = yaml.safe_dump(cfg, sort_keys=False)
-    except Exception:
-        yaml_text = json.dumps(cfg, indent=2)
+# Upload chunks are batched to about this size before each hop to the I/O pool.
+_IMPORT_BATCH_BYTES = 256 * 1024
 
-    if body.write_to_disk:
-        out_path = _proj_dir(project_id) / "generated.yml"
-        out_path.write_text(yaml_text, encoding="utf-8")
-        return {"yaml_text": yaml_text, "path": str(out_path)}
 
-    return {"yaml_text": yaml_text}
+@app.post("/api/v1/projects/{project_id}/connector/import-csv")
+async def import_csv(
+    project_id: str,
+    request: Request,
+    replace: bool = False,
+    strict_source_ref: bool = False,
+    dry_run: bool = False,
+):
+    """
+    Import a points CSV sent as the raw request body (gzip allowed, by
+    Content-Encoding or magic bytes) into metasys.assets as a new config version.
 
+    Rows are validated as they arrive; the response is NDJSON with progress,
+    row errors and warnings as they are found, then one "done" line. Nothing is
+    saved if any row fails. Imported assets replace same-id assets in the
+    config (all assets with replace=true).
+    """
+    encoding = request.headers.get("content-encoding", "").lower()
+    importer = StreamingCsvImport(
+        allow_replace_me=not strict_source_ref,
+        gzip=True if "gzip" in encoding else None,
+    )
 
-@app.get("/api/v1/projects/{project_id}/connector/yaml-diff")
-def yaml_diff(project_id: str):
-    return {"diff_unified": ""}
+    async def events():
+        batch: List[bytes] = []
+        size = 0
+        async for chunk in request.stream():
+            batch.append(chunk)
+            size += len(chunk)
+            if size >= _IMPORT_BATCH_BYTES:
+                for event in await _io(importer.feed, b"".join(batch)):
+                    yield json.dumps(event) + "\n"
+                batch, size = [], 0
+        if batch:
+            for event in await _io(importer.feed, b"".join(batch)):
+                yield json.dumps(event) + "\n"
+        for event in await _io(importer.finish):
+            yield json.dumps(event) + "\n"
+
+        assets = importer.assets()
+        done: Dict[str, Any] = {
+            "event": "done",
+            "ok": importer.ok,
+            "applied": False,
+            "rows": importer.rows,
+            "errors": importer.errors,
+            "replace_me": importer.replace_me,
+            "duplicates": importer.duplicates,
+            "assets": len(assets),
+            "points": sum(len(a["points"]) for a in assets),
+        }
+        if importer.ok and not dry_run:
+            saved = await _io(_import_points, project_id, assets, replace)
+            done["applied"] = True
+            done["version"] = saved["_version"]
+        yield json.dumps(done) + "\n"
 
+    return _UploadStreamingResponse(events(), media_type="application/x-ndjson")
 
-@app.get("/api/v1/projects/{project_id}/secrets/{key}")
-def secret_exists(project_id: str, key: str):
-    return {"exists": bool(os.environ.get(key))}
 
-def _require_env(name: str) -> str:
-    v = (os.environ.get(name) or "").strip()
-    if not v:
-        raise HTTPException(status_code=500, detail=f"Missing env var: {name}")
-    return v
+@app.post("/api/v1/projects/{project_id}/connector/generate-yaml")
+async def generate_yaml(project_id: str, body: GenerateYamlBody):
+    yaml_text, out_path = await _io(_generate_yaml_files, project_id, body.write_to_disk)
+    if out_path is not None:
+        return {"yaml_text": yaml_text, "path": str(out_path)}
+    return {"yaml_text": yaml_text}
 
 
-def _verify_github_signature(body: bytes, signature_header: str | None) -> None:
+@app.get("/api/v1/projects/{project_id}/connector/yaml")
+async def get_connector_yaml(project_id: str, request: Request):
     """
-    Validates GitHub webhook signature using X-Hub-Signature-256 (HMAC-SHA256).
-    GitHub sends header like: sha256=<hexdigest>
+    The saved config rendered as YAML (same text as generate-yaml), cached per config ETag.
     """
-    secret = _require_env("GITHUB_WEBHOOK_SECRET")
-
-    if not signature_header or not signature_header.startswith("sha256="):
-        raise HTTPException(status_code=401, detail="Missing/invalid X-Hub-Signature-256")
-
-    expected = "sha256=" + hmac.new(
-        secret.encode("utf-8"),
-        body,
-        hashlib.sha256,
-    ).hexdigest()
-
-    # constant-time compare
-    if not hmac.compare_digest(signature_header, expected):
-        raise HTTPException(status_code=401, detail="Signature mismatch")
-
-
-def _send_resend_email(subject: str, html: str) -> None:
-    import resend  # pip install resend
-
-    resend.api_key = _require_env("RESEND_API_KEY")
-
-    to_list = _require_env("ALERT_TO").split()
-    from_addr = _require_env("ALERT_FROM")
-
-    params = {
-        "from": from_addr,
-        "to": to_list,
-        "subject": subject,
-        "html": html,
-    }
-
-    resend.Emails.send(params)
+    etag = await _io(_PROJECTS.config_etag, project_id)
+    unchanged = _conditional(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    yaml_text = await _io(_rendered_yaml, project_id, etag)
+    return Response(
+        yaml_text,
+        media_type="application/x-yaml",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
 
 
-@app.post("/api/v1/webhooks/github")
-async def github_webhook(request: Request):
-    body = await request.body()
+@app.get("/api/v1/projects/{project_id}/connector/history")
+async def list_config_history(project_id: str):
+    return {"versions": await _io(_history_entries, project_id)}
 
-    # Verify GitHub signature (recommended by GitHub)
-    _verify_github_signature(body, request.headers.get("X-Hub-Signature-256"))
 
-    event = request.headers.get("X-GitHub-Event", "")
-    if event != "push":
-        return {"ok": True, "ignored_event": event}
+@app.get("/api/v1/projects/{project_id}/connector/history/{version}")
+async def get_config_version(project_id: str, version: int):
+    return {"version": version, "config_json": await _io(_history_version, project_id, version)}
 
-    payload = json.loads(body.decode("utf-8") or "{}")
 
-    repo = payload.get("repository", {}).get("full_name", "unknown/repo")
-    ref = payload.get("ref", "")
-    pusher = payload.get("pusher", {}).get("name", "unknown")
-    commits = payload.get("commits", []) or []
+@app.get("/api/v1/projects/{project_id}/connector/diff")
+async def config_diff(project_id: str, from_version: Optional[int] = None, to_version: Optional[int] = None):
+    """
+    Structural diff between two saved versions (default: latest vs the one before).
+    """
+    return await _io(_history_diff, project_id, from_version, to_version, False)
 
-    lines = []
-    for c in commits[:10]:
-        msg = (c.get("message") or "").splitlines()[0]
-        url = c.get("url") or ""
-        lines.append(f"- {msg}<br/>{url}")
 
-    subject = f"[GitHub Push] {repo} {ref} by {pusher}"
-    html = f"""
-    <h2>GitHub Push Event</h2>
-    <p><b>Repo:</b> {repo}<br/>
-       <b>Ref:</b> {ref}<br/>
-       <b>Pusher:</b> {pusher}<br/>
-       <b>Commits:</b> {len(commits)}</p>
-    <p>{'<br/><br/>'.join(lines) if lines else '(no commit details)'}</p>
+@app.get("/api/v1/projects/{project_id}/connector/yaml-diff")
+async def yaml_diff(project_id: str, from_version: Optional[int] = None, to_version: Optional[int] = None):
+    """
+    Unified YAML diff between two saved versions (default: latest vs the one before).
+    """
+    return await _io(_history_diff, project_id, from_version, to_version, True)
+
+
+@app.get("/api/v1/projects/{project_id}/points")
+async def list_points(
+    project_id: str,
+    asset_id: Optional[str] = None,
+    point_id: Optional[str] = None,
+    source_ref: Optional[str] = None,
+    tier: Optional[int] = None,
+):
+    return await _io(_select_points, project_id, asset_id, point_id, source_ref, tier)
+
+
+@app.get("/api/v1/projects/{project_id}/points/history")
+async def point_history(
+    project_id: str,
+    asset_id: str,
+    point_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    buckets: int = 300,
+):
+    """
+    Downsampled trend (min/max/avg per bucket) from the connector's local history.
+    Defaults to the last 24h; start/end are unix seconds.
+    """
+    if not 1 <= buckets <= 5000:
+        raise HTTPException(status_code=400, detail="buckets must be between 1 and 5000")
+    end = time.time() if end is None else end
+    start = end - 86400.0 if start is None else start
+    return await _io(_point_history, project_id, asset_id, point_id, start, end, buckets)
+
+
+@app.get("/api/v1/projects/{project_id}/values")
+async def latest_values(
+    project_id: str,
+    asset_id: List[str] = Query(default=[]),
+    point_id: List[str] = Query(default=[]),
+):
     """
+    Current value, ts, quality and last publish time per point, read straight
+    from the running connector's shared latest-values table.
+    """
+    return await _io(_latest_values, project_id, asset_id, point_id)
 
-    _send_resend_email(subject, html)
-    return {"ok": True, "sent": True, "commits": len(commits)}
+
+@app.get("/api/v1/projects/{project_id}/secrets/{key}")
+def secret_exists(project_id: str, key: str):
+    return {"exists": bool(os.environ.get(key))}
 
 def _require_env(name: str) -> str:
     v = (os.environ.get(name) or "").strip()
@@ -361,6 +895,7 @@ def _verify_github_signature(body: bytes, signature_header: str | None) -> None:
     mac = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
     expected = f"sha256={mac}"
 
+    # constant-time compare
     if not hmac.compare_digest(signature_header, expected):
         raise HTTPException(status_code=401, detail="Signature mismatch")
 
@@ -382,6 +917,20 @@ def _send_resend_email(subject: str, html: str) -> None:
     )
 
 
+def _deliver_alert(subject: str, html: str) -> None:
+    # looked up at call time so the sender can be swapped (tests, load tools)
+    _send_resend_email(subject, html)
+
+
+# Pushes are acknowledged right away and e-mailed from a background thread,
+# one digest per repo per window (LOCAL_API_ALERT_WINDOW seconds, default 30).
+_ALERTS = AlertDispatcher(
+    _deliver_alert,
+    window_seconds=float(os.environ.get("LOCAL_API_ALERT_WINDOW", "30")),
+    max_attempts=int(os.environ.get("LOCAL_API_ALERT_ATTEMPTS", "5")),
+)
+
+
 @app.post("/api/v1/webhooks/github")
 async def github_webhook(request: Request):
     body = await request.body()
@@ -393,29 +942,11 @@ async def github_webhook(request: Request):
     if event != "push":
         return {"ok": True, "ignored_event": event}
 
-    payload = json.loads(body.decode("utf-8") or "{}")
-
-    repo = payload.get("repository", {}).get("full_name", "unknown/repo")
-    ref = payload.get("ref", "")
-    pusher = payload.get("pusher", {}).get("name", "unknown")
-    commits = payload.get("commits", []) or []
-
-    items = []
-    for c in commits[:10]:
-        msg = (c.get("message") or "").splitlines()[0]
-        url = c.get("url") or ""
-        items.append(f"<li><b>{msg}</b><br/><a href='{url}'>{url}</a></li>")
-
-    subject = f"[GitHub Push] {repo} {ref} by {pusher}"
-    html = f"""
-      <h2>GitHub Push</h2>
-      <p><b>Repo:</b> {repo}<br/>
-         <b>Ref:</b> {ref}<br/>
-         <b>Pusher:</b> {pusher}<br/>
-         <b>Commits:</b> {len(commits)}</p>
-      <ol>{''.join(items) if items else '<li>(no commit details)</li>'}</ol>
-    """
-
-    _send_resend_email(subject, html)
-    return {"ok": True, "sent": True, "commits": len(commits)}
+    try:
+        payload = json.loads(body.decode("utf-8") or "{}")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
+    push = PushEvent.from_payload(payload)
+    _ALERTS.submit(push)
+    return {"ok": True, "queued": True, "commits": push.commit_count}
@@ -4,21 +4,12 @@ from __future__ import annotations
 import argparse
 import time
 from pathlib import Path
-from typing import Any, Dict
-
-import yaml
-
 from src.schema_validate import validate_config
 from src.planner import build_poll_plan, summarize_plan
-from src.health import start_health_server, health_state
-from src.prometheus import start_prometheus_server
+from src.utils.config_io import load_config
 from src.utils.root_guard import require_project_root
 
 
-def _load_yaml(path: Path) -> Dict[str, Any]:
-    return yaml.safe_load(path.read_text(encoding="utf-8-sig")) or {}
-
-
 def main() -> int:
     require_project_root()
 
@@ -26,12 +17,17 @@ def main() -> int:
     parser.add_argument("--config", required=True, help="Path to YAML config (config/generated/*.yml).")
     parser.add_argument("--schema", default="schemas/metasys_connector_config.schema.json", help="Schema path.")
     parser.add_argument("--dry-run", action="store_true", help="Validate + print plan, then exit.")
+    parser.add_argument(
+        "--json-sidecar",
+        action="store_true",
+        help="Load from (and refresh) a JSON copy of the config next to it (<config>.json) for faster startup.",
+    )
     args = parser.parse_args()
 
     cfg_path = Path(args.config)
     schema_path = Path(args.schema)
 
-    cfg = _load_yaml(cfg_path)
+    cfg = load_config(cfg_path, use_sidecar=args.json_sidecar)
 
     # Validate config
     validate_config(cfg, schema_path=str(schema_path))
@@ -46,6 +42,19 @@ def main() -> int:
     for tier in sorted(by_tier):
         print(f"Tier {tier}: {by_tier[tier]} points")
 
+    if args.dry_run:
+        print("\n[INFO] Dry-run complete. Exiting.")
+        return 0
+
+    # Runtime imports only when running for real (keeps dry-run/pipeline steps fast)
+    from src.health import start_health_server, health_state
+    from src.prometheus import start_prometheus_server
+    from src.live_stream import LiveStream, start_live_stream_server
+    from src.history_store import HistoryStore
+    from src.latest_values import LatestValues
+    from src.point_registry import PointRegistry
+    from src.poller import Poller
+
     # Health + metrics
     health_port = int(cfg.get("health", {}).get("port", 8081))
     metrics_port = int(cfg.get("prometheus", {}).get("port", 8082))
@@ -54,14 +63,43 @@ def main() -> int:
     print(f"\nHealth:     http://localhost:{health_port}/health")
     print(f"Prometheus: http://localhost:{metrics_port}/metrics")
 
-    if args.dry_run:
-        print("\n[INFO] Dry-run complete. Exiting.")
-        return 0
-
-    # Runtime import only when running for real
-    from src.poller import Poller
-
-    poller = Poller(cfg, plan)
+    registry = PointRegistry(plan)
+
+    # Live values (SSE) for UI clients
+    live = None
+    live_cfg = cfg.get("live_stream", {})
+    if live_cfg.get("enabled", False):
+        live_port = int(live_cfg.get("port", 8083))
+        live = LiveStream(registry, capacity=int(live_cfg.get("buffer_events", 10_000)))
+        start_live_stream_server(live_port, live)
+        print(f"Live:       http://localhost:{live_port}/live")
+
+    # Local trend history (SQLite), written off the poll path
+    history = None
+    hist_cfg = cfg.get("history", {})
+    if hist_cfg.get("enabled", False):
+        hist_path = Path(hist_cfg.get("path") or Path(cfg["polling"].get("out_dir", "out")) / "history.sqlite")
+        history = HistoryStore(
+            hist_path,
+            registry,
+            retention_days=float(hist_cfg.get("retention_days", 35)),
+            max_bytes=int(float(hist_cfg.get("max_mb", 512)) * 1024 * 1024),
+        )
+        print(f"History:    {hist_path}")
+
+    # Latest value per point, readable by other processes (local API, scripts)
+    latest = None
+    lv_cfg = cfg.get("latest_values", {})
+    if lv_cfg.get("enabled", False):
+        lv_path = Path(lv_cfg.get("path") or Path(cfg["polling"].get("out_dir", "out")) / "latest_values.bin")
+        try:
+            latest = LatestValues.for_registry(lv_path, registry)
+            print(f"Latest:     {lv_path}")
+        except OSError as e:
+            # e.g. Windows refuses to replace a table another process still has mapped
+            print(f"[WARN] Latest-values table disabled: {e}")
+
+    poller = Poller(cfg, plan, registry, live, history, latest)
     print("\n[INFO] Starting poller loop (Ctrl+C to stop)...")
 
     try:
@@ -72,6 +110,8 @@ def main() -> int:
         print("\n[INFO] Stopping...")
     finally:
         poller.close()
+        if history is not None:
+            history.close()
 
     return 0
 
@@ -1,12 +1,13 @@
 ﻿
 # src/metasys_client.py
 import os
-import requests
 from typing import Dict, Any
 
 
 class MetasysClient:
     def __init__(self, cfg: Dict[str, Any]):
+        import requests  # heavy; only needed once we actually talk to Metasys
+
         self.host = cfg["metasys"]["host"].rstrip("/")
         self.auth = cfg["metasys"]["auth"]
         self.session = requests.Session()
@@ -31,3 +32,6 @@ class MetasysClient:
             "value": value,
             "quality": "good",
         }
+
+    def close(self) -> None:
+        self.session.close()
@@ -3,52 +3,38 @@ from __future__ import annotations
 
 import argparse
 import json
-import shutil
 import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
-from jsonschema import validate
+from src.bacnet_scanner.devices_io import is_ndjson
+from src.bacnet_scanner.validate_output import validate_devices_file
+from src.utils.artifact_io import HashCache, copy_files
 
 
 def now_iso() -> str:
     return time.strftime("%Y-%m-%dT%H:%M:%S%z")
 
 
-def read_json(path: Path) -> Any:
-    return json.loads(path.read_text(encoding="utf-8"))
-
-
 def write_json(path: Path, data: Any) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(json.dumps(data, indent=2), encoding="utf-8")
 
 
-def sha256_file(path: Path) -> str:
-    import hashlib
-
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
-def copy_file(src: Path, dst: Path) -> None:
-    dst.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(src, dst)
-
-
 def main() -> int:
     ap = argparse.ArgumentParser(description="Package app-ingestion bundle under out/ingest/")
     ap.add_argument("--out-dir", default="out/ingest", help="Bundle output directory.")
-    ap.add_argument("--bacnet-json", default="out/bacnet/devices.json", help="BACnet devices.json path.")
+    ap.add_argument(
+        "--bacnet-json", default="out/bacnet/devices.json", help="BACnet devices.json (or devices.ndjson) path."
+    )
     ap.add_argument(
         "--bacnet-schema",
         default="schemas/bacnet_devices_output.schema.json",
         help="BACnet output schema path.",
     )
     ap.add_argument("--include-metasys", action="store_true", help="Include Metasys artifacts (if present).")
+    ap.add_argument("--workers", type=int, default=0, help="Copy/hash threads (default: up to 8).")
+    ap.add_argument("--no-hash-cache", action="store_true", help="Hash every file again, ignoring out/.cache.")
     args = ap.parse_args()
 
     out_dir = Path(args.out_dir)
@@ -63,27 +49,33 @@ def main() -> int:
     if not bacnet_schema.exists():
         raise SystemExit(f"[ERROR] Missing BACnet schema: {bacnet_schema}")
 
-    data = read_json(bacnet_json)
-    schema = read_json(bacnet_schema)
-    validate(instance=data, schema=schema)
-
-    bacnet_dst_json = out_dir / "bacnet" / "devices.json"
-    bacnet_dst_schema = out_dir / "bacnet" / "bacnet_devices_output.schema.json"
-
-    copy_file(bacnet_json, bacnet_dst_json)
-    copy_file(bacnet_schema, bacnet_dst_schema)
+    # record by record for NDJSON, so a large inventory is never held in memory
+    bacnet_meta, device_count, errors = validate_devices_file(bacnet_json, bacnet_schema)
+    if errors:
+        raise SystemExit(f"[ERROR] BACnet output failed schema validation: {bacnet_json}\n  - " + "\n  - ".join(errors))
+
+    # (logical name, source, bundle path); the enumeration outputs ride along when present.
+    # The bundle name is fixed per layout, whatever the input file is called.
+    bundle_name = "devices.ndjson" if is_ndjson(bacnet_json) else "devices.json"
+    artifacts: List[Tuple[str, Path, Path]] = [
+        ("bacnet.devices_json", bacnet_json, out_dir / "bacnet" / bundle_name),
+        ("bacnet.schema_json", bacnet_schema, out_dir / "bacnet" / "bacnet_devices_output.schema.json"),
+    ]
+    for logical_name, pattern in (("bacnet.objects", "objects.*json"), ("bacnet.points_csv", "points_from_bacnet.csv")):
+        for src in sorted(bacnet_json.parent.glob(pattern)):
+            artifacts.append((logical_name, src, out_dir / "bacnet" / src.name))
+            break
+
+    # each file is read once: hashed as it is copied, or not at all if unchanged since the last pack
+    cache = HashCache(None) if args.no_hash_cache else HashCache.default()
+    t0 = time.perf_counter()
+    copied = copy_files([(src, dst) for _, src, dst in artifacts], cache=cache, workers=args.workers or None)
+    cache.save()
 
     files: Dict[str, Any] = {}
-
-    def add_manifest_entry(logical_name: str, path: Path) -> None:
-        files[logical_name] = {
-            "path": str(path).replace("\\", "/"),
-            "bytes": path.stat().st_size,
-            "sha256": sha256_file(path),
-        }
-
-    add_manifest_entry("bacnet.devices_json", bacnet_dst_json)
-    add_manifest_entry("bacnet.schema_json", bacnet_dst_schema)
+    for logical_name, _, dst in artifacts:
+        sha256, size = copied[dst]
+        files[logical_name] = {"path": str(dst).replace("\\", "/"), "bytes": size, "sha256": sha256}
 
     # --- Metasys (optional; safe if you don't have artifacts yet) ---
     metasys_entries: Dict[str, Any] = {}
@@ -103,8 +95,8 @@ def main() -> int:
         },
         "contents": {
             "bacnet": {
-                "meta": data.get("meta", {}),
-                "device_records": data.get("meta", {}).get("device_records", len(data.get("devices", []))),
+                "meta": bacnet_meta,
+                "device_records": bacnet_meta.get("device_records", device_count),
             },
             "metasys": metasys_entries if args.include_metasys else None,
         },
@@ -114,6 +106,10 @@ def main() -> int:
     manifest_path = out_dir / "manifest.json"
     write_json(manifest_path, manifest)
 
+    print(
+        f"[INFO] {len(artifacts)} artifacts copied+hashed in {time.perf_counter() - t0:.2f}s "
+        f"(hash cache: {cache.hits} hits, {cache.misses} misses)"
+    )
     print("[OK] Ingest bundle created:")
     print(f"     {out_dir}")
     print(f"[OK] Manifest: {manifest_path}")
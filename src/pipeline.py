@@ -41,6 +41,12 @@ def main() -> int:
         action="store_true",
         help="Fail if CSV contains REPLACE_ME in source_ref (strict mode). Default is pilot-friendly (allows REPLACE_ME).",
     )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for CSV preflight/validation (0 = one per CPU).",
+    )
     args = ap.parse_args()
 
     # Normalize legacy default if it sneaks in (old path is now forbidden)
@@ -67,7 +73,7 @@ def main() -> int:
     if not args.skip_preflight:
         run_step(
             "Preflight CSV",
-            [py, "-m", "src.preflight_points_csv", "--csv", str(csv_path)],
+            [py, "-m", "src.preflight_points_csv", "--csv", str(csv_path), "--jobs", str(args.jobs)],
         )
 
     # Pilot-friendly default: allow REPLACE_ME placeholders unless strict mode is requested
@@ -81,6 +87,8 @@ def main() -> int:
         str(csv_path),
         "--out",
         str(out_path),
+        "--jobs",
+        str(args.jobs),
     ]
     if not args.strict_source_ref:
         import_cmd.append("--allow-replace-me")
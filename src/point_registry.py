@@ -0,0 +1,134 @@
+# src/point_registry.py
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.planner import PlannedPoint, build_poll_plan
+
+_EMPTY_IDS = array("l")
+
+
+class PointRegistry:
+    """
+    Every configured point, built once from the config and shared by the poller,
+    delta store, publisher and local API.
+
+    Points get dense integer ids (0..n-1) in poll-plan order. Fields are stored
+    column-wise: interned strings in lists, numbers in typed arrays. On the poll
+    path a point is just its id; strings are only looked up when publishing.
+    """
+
+    __slots__ = (
+        "asset_id",
+        "asset_name",
+        "point_id",
+        "point_name",
+        "data_type",
+        "source_ref",
+        "tier",
+        "poll_seconds",
+        "min_publish_seconds",
+        "deadband",
+        "_by_key",
+        "_by_source_ref",
+        "_by_tier",
+    )
+
+    def __init__(self, plan: Sequence[PlannedPoint]) -> None:
+        intern = sys.intern
+
+        self.asset_id: List[str] = []
+        self.asset_name: List[str] = []
+        self.point_id: List[str] = []
+        self.point_name: List[str] = []
+        self.data_type: List[str] = []
+        self.source_ref: List[str] = []
+        self.tier = array("b")
+        self.poll_seconds = array("l")
+        self.min_publish_seconds = array("l")
+        self.deadband = array("d")
+
+        self._by_key: Dict[Tuple[str, str], int] = {}
+        self._by_source_ref: Dict[str, array] = {}
+        self._by_tier: Dict[int, array] = {}
+
+        for pid, p in enumerate(plan):
+            asset_id = intern(str(p.asset_id))
+            point_id = intern(str(p.point_id))
+            source_ref = intern(str(p.source_ref))
+
+            self.asset_id.append(asset_id)
+            self.asset_name.append(intern(str(p.asset_name)))
+            self.point_id.append(point_id)
+            self.point_name.append(str(p.point_name))
+            self.data_type.append(intern(str(p.data_type)))
+            self.source_ref.append(source_ref)
+            self.tier.append(int(p.tier))
+            self.poll_seconds.append(int(p.poll_seconds))
+            self.min_publish_seconds.append(int(p.min_publish_seconds))
+            self.deadband.append(float(p.deadband))
+
+            # Duplicate (asset_id, point_id) keys are flagged by preflight; the
+            # first occurrence owns the key, later ones stay reachable by id.
+            self._by_key.setdefault((asset_id, point_id), pid)
+            self._by_source_ref.setdefault(source_ref, array("l")).append(pid)
+            self._by_tier.setdefault(int(p.tier), array("l")).append(pid)
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "PointRegistry":
+        return cls(build_poll_plan(cfg))
+
+    def __len__(self) -> int:
+        return len(self.point_id)
+
+    def id_of(self, asset_id: str, point_id: str) -> Optional[int]:
+        return self._by_key.get((asset_id, point_id))
+
+    def ids_for_source_ref(self, source_ref: str) -> Sequence[int]:
+        """
+        Several points can share a source_ref (e.g. REPLACE_ME placeholders).
+        """
+        return self._by_source_ref.get(source_ref, _EMPTY_IDS)
+
+    def ids_for_tier(self, tier: int) -> Sequence[int]:
+        return self._by_tier.get(int(tier), _EMPTY_IDS)
+
+    def tiers(self) -> List[int]:
+        return sorted(self._by_tier)
+
+    def key(self, pid: int) -> str:
+        """
+        Human-readable key, as used in logs: "<asset_id>::<point_id>".
+        """
+        return f"{self.asset_id[pid]}::{self.point_id[pid]}"
+
+    def planned(self, pid: int) -> PlannedPoint:
+        return PlannedPoint(
+            asset_id=self.asset_id[pid],
+            asset_name=self.asset_name[pid],
+            point_id=self.point_id[pid],
+            point_name=self.point_name[pid],
+            data_type=self.data_type[pid],
+            tier=self.tier[pid],
+            poll_seconds=self.poll_seconds[pid],
+            min_publish_seconds=self.min_publish_seconds[pid],
+            deadband=self.deadband[pid],
+            source_ref=self.source_ref[pid],
+        )
+
+    def to_dict(self, pid: int) -> Dict[str, Any]:
+        return {
+            "id": pid,
+            "asset_id": self.asset_id[pid],
+            "asset_name": self.asset_name[pid],
+            "point_id": self.point_id[pid],
+            "point_name": self.point_name[pid],
+            "data_type": self.data_type[pid],
+            "tier": self.tier[pid],
+            "poll_seconds": self.poll_seconds[pid],
+            "min_publish_seconds": self.min_publish_seconds[pid],
+            "deadband": self.deadband[pid],
+            "source_ref": self.source_ref[pid],
+        }
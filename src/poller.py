@@ -3,69 +3,82 @@
 from __future__ import annotations
 
 import time
-from typing import Any, Dict, List
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from src.planner import PlannedPoint
+from src.point_registry import PointRegistry
 from src.metasys_client import MetasysClient
 from src.delta_store import DeltaStore
 from src.publisher import Publisher, Event
 
+if TYPE_CHECKING:
+    from src.history_store import HistoryStore
+    from src.latest_values import LatestValues
+    from src.live_stream import LiveStream
+
 
 class Poller:
-    def __init__(self, cfg: Dict[str, Any], plan: List[PlannedPoint]) -> None:
+    def __init__(
+        self,
+        cfg: Dict[str, Any],
+        plan: List[PlannedPoint],
+        registry: Optional[PointRegistry] = None,
+        live: Optional[LiveStream] = None,
+        history: Optional[HistoryStore] = None,
+        latest: Optional[LatestValues] = None,
+    ) -> None:
         self.cfg = cfg
         self.plan = plan
+        self.registry = registry if registry is not None else PointRegistry(plan)
         self.client = MetasysClient(cfg)
-        self.deltas = DeltaStore()
-        self.publisher = Publisher(cfg)
+        self.deltas = DeltaStore(len(self.registry))
+        self.publisher = Publisher(cfg, self.registry, live, history)
+        self.latest = latest
 
-        # schedule: next_due per point (simple, robust)
+        # schedule: next_due per point id (simple, robust)
         now = time.time()
-        self.next_due = {self._key(p): now for p in plan}
-
-    def _key(self, p: PlannedPoint) -> str:
-        return f"{p.asset_id}::{p.point_id}"
+        self.next_due = array("d", [now]) * len(self.registry)
 
     def run_forever(self) -> None:
+        next_due = self.next_due
+        poll_seconds = self.registry.poll_seconds
+        ids = range(len(self.registry))
+
         while True:
             now = time.time()
-            soonest = None
-
-            for p in self.plan:
-                k = self._key(p)
-                due = self.next_due[k]
-                if now >= due:
-                    self._poll_one(p, now)
-                    self.next_due[k] = now + float(p.poll_seconds)
 
-                soonest = due if soonest is None else min(soonest, due)
+            for pid in ids:
+                if now >= next_due[pid]:
+                    self._poll_one(pid, now)
+                    next_due[pid] = now + poll_seconds[pid]
 
             self.publisher.flush()  # allows time-based flush even if no new events
 
             # sleep a little so we don't spin CPU
             time.sleep(float(self.cfg["polling"].get("tick_seconds", 0.25)))
 
-    def _poll_one(self, p: PlannedPoint, now: float) -> None:
-        mv = self.client.read_point(p.source_ref)
+    def _poll_one(self, pid: int, now: float) -> None:
+        reg = self.registry
+        mv = self.client.read_point(reg.source_ref[pid])
+        value = mv["value"]
+        ts = float(mv.get("ts", now))
+        quality = mv.get("quality", "good")
 
-        if self.deltas.should_publish(
-            key=self._key(p),
-            new_value=mv.value,
-            new_ts=mv.ts,
-            deadband=float(p.deadband),
-            min_publish_seconds=int(p.min_publish_seconds),
-        ):
-            self.publisher.add(
-                Event(
-                    asset_id=p.asset_id,
-                    point_id=p.point_id,
-                    value=mv.value,
-                    ts=mv.ts,
-                    quality=mv.quality,
-                    source_ref=p.source_ref,
-                )
-            )
+        published = self.deltas.should_publish(
+            pid,
+            new_value=value,
+            new_ts=ts,
+            deadband=reg.deadband[pid],
+            min_publish_seconds=reg.min_publish_seconds[pid],
+        )
+        if published:
+            self.publisher.add(Event(pid=pid, value=value, ts=ts, quality=quality))
+        if self.latest is not None:
+            self.latest.update(pid, value, ts, quality, ts if published else None)
 
     def close(self) -> None:
         self.publisher.close()
         self.client.close()
+        if self.latest is not None:
+            self.latest.close()
@@ -2,9 +2,18 @@
 from __future__ import annotations
 
 import argparse
-import csv
-from collections import Counter, defaultdict
+from collections import Counter
 from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from src.utils.csv_chunks import (
+    column_positions,
+    default_jobs,
+    iter_range_lines,
+    iter_records,
+    read_header,
+    split_ranges,
+)
 
 
 REQUIRED_COLS = [
@@ -29,31 +38,100 @@ def norm(s: str) -> str:
     return (s or "").strip()
 
 
+# Columns the preflight looks at, in the order _scan_range unpacks them.
+SCAN_COLS = ["asset_id", "point_id", "tier", "data_type", "source_ref"]
+
+
+def _scan_range(task: Tuple[str, int, int, List[int], int]) -> Dict[str, Any]:
+    """
+    Scan one byte range of the CSV (whole file when not running in parallel).
+    Row numbers in the result are local to the range (first record = 1).
+    """
+    path, start, end, positions, width = task
+
+    tier_counts: Counter = Counter()
+    dtype_counts: Counter = Counter()
+    missing_source: List[int] = []
+    replace_me: List[int] = []
+    bad_tier: List[Tuple[int, str]] = []
+    bad_dtype: List[Tuple[int, str]] = []
+    dupes: Counter = Counter()
+    total = 0
+
+    lines = iter_range_lines(Path(path), start, end)
+    for total, (asset_id, point_id, tier, dtype, src) in enumerate(
+        iter_records(lines, positions, width), start=1
+    ):
+        dtype = dtype.lower()
+
+        dupes[(asset_id, point_id)] += 1
+
+        if tier:
+            tier_counts[tier] += 1
+        if dtype:
+            dtype_counts[dtype] += 1
+
+        if tier not in ALLOWED_TIERS:
+            bad_tier.append((total, tier))
+        if dtype not in ALLOWED_DATA_TYPES:
+            bad_dtype.append((total, dtype))
+
+        if src == "":
+            missing_source.append(total)
+        elif "REPLACE_ME" in src.upper():
+            replace_me.append(total)
+
+    return {
+        "total": total,
+        "tier_counts": tier_counts,
+        "dtype_counts": dtype_counts,
+        "missing_source": missing_source,
+        "replace_me": replace_me,
+        "bad_tier": bad_tier,
+        "bad_dtype": bad_dtype,
+        "dupes": dupes,
+    }
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="Preflight a points CSV for the Metasys connector.")
     ap.add_argument("--csv", required=True, help="Path to points CSV (UTF-8 or UTF-8 with BOM).")
     ap.add_argument("--max-missing", type=int, default=50, help="Max missing source_ref rows to print.")
     ap.add_argument("--max-dupes", type=int, default=50, help="Max duplicate keys to print.")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Scan the CSV in N worker processes (0 = one per CPU).",
+    )
     args = ap.parse_args()
 
     csv_path = Path(args.csv)
     if not csv_path.exists():
         die(f"CSV not found: {csv_path}")
 
-    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        if reader.fieldnames is None:
-            die("CSV has no header row.")
-        header = [h.strip() for h in reader.fieldnames]
-        missing_cols = [c for c in REQUIRED_COLS if c not in header]
-        if missing_cols:
-            die(f"CSV missing required columns: {', '.join(missing_cols)}")
-
-        rows = list(reader)
+    fieldnames, data_offset = read_header(csv_path)
+    if fieldnames is None:
+        die("CSV has no header row.")
+    header = [h.strip() for h in fieldnames]
+    missing_cols = [c for c in REQUIRED_COLS if c not in header]
+    if missing_cols:
+        die(f"CSV missing required columns: {', '.join(missing_cols)}")
+
+    # Split into byte ranges on record boundaries; with --jobs 1 this is one range
+    # scanned in-process. Only counters and offending row numbers are kept.
+    jobs = args.jobs if args.jobs > 0 else default_jobs()
+    positions = column_positions(header, SCAN_COLS)
+    ranges = split_ranges(csv_path, data_offset, jobs)
+    tasks = [(str(csv_path), start, end, positions, len(header)) for start, end in ranges]
+
+    if len(tasks) == 1:
+        results = [_scan_range(tasks[0])]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
 
-    total = len(rows)
-    if total == 0:
-        die("CSV has no data rows.")
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(_scan_range, tasks))
 
     tier_counts = Counter()
     dtype_counts = Counter()
@@ -61,32 +139,23 @@ def main() -> int:
     replace_me = []
     bad_tier = []
     bad_dtype = []
-    dupes = defaultdict(int)
+    dupes = Counter()
+    total = 0
+
+    # Merge in file order, rebasing chunk-local row numbers (row 1 is header).
+    for res in results:
+        base = total + 1
+        tier_counts.update(res["tier_counts"])
+        dtype_counts.update(res["dtype_counts"])
+        missing_source.extend(base + n for n in res["missing_source"])
+        replace_me.extend(base + n for n in res["replace_me"])
+        bad_tier.extend((base + n, v) for n, v in res["bad_tier"])
+        bad_dtype.extend((base + n, v) for n, v in res["bad_dtype"])
+        dupes.update(res["dupes"])
+        total += res["total"]
 
-    for i, r in enumerate(rows, start=2):  # row 1 is header
-        asset_id = norm(r["asset_id"])
-        point_id = norm(r["point_id"])
-        tier = norm(r["tier"])
-        dtype = norm(r["data_type"]).lower()
-        src = norm(r["source_ref"])
-
-        key = (asset_id, point_id)
-        dupes[key] += 1
-
-        if tier:
-            tier_counts[tier] += 1
-        if dtype:
-            dtype_counts[dtype] += 1
-
-        if tier not in ALLOWED_TIERS:
-            bad_tier.append((i, tier))
-        if dtype not in ALLOWED_DATA_TYPES:
-            bad_dtype.append((i, dtype))
-
-        if src == "":
-            missing_source.append(i)
-        elif "REPLACE_ME" in src.upper():
-            replace_me.append(i)
+    if total == 0:
+        die("CSV has no data rows.")
 
     dup_list = [(k, c) for k, c in dupes.items() if c > 1]
     dup_list.sort(key=lambda x: x[1], reverse=True)
@@ -6,17 +6,21 @@ import json
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from src.point_registry import PointRegistry
+
+if TYPE_CHECKING:  # the SSE server (http.server) is only imported when main starts it
+    from src.history_store import HistoryStore
+    from src.live_stream import LiveStream
 
 
 @dataclass
 class Event:
-    asset_id: str
-    point_id: str
+    pid: int  # PointRegistry id; names are resolved at flush time
     value: Any
     ts: float
     quality: str
-    source_ref: str
 
 
 class Publisher:
@@ -25,8 +29,17 @@ class Publisher:
     Next step: HTTPS POST to ingest endpoint.
     """
 
-    def __init__(self, cfg: Dict[str, Any]) -> None:
+    def __init__(
+        self,
+        cfg: Dict[str, Any],
+        registry: PointRegistry,
+        live: Optional[LiveStream] = None,
+        history: Optional[HistoryStore] = None,
+    ) -> None:
         self.cfg = cfg
+        self.registry = registry
+        self.live = live
+        self.history = history
         self.flush_interval = int(cfg["polling"].get("flush_interval_seconds", 5))
         self.max_batch = int(cfg["polling"].get("max_points_per_batch", 200))
         self._buf: List[Event] = []
@@ -38,6 +51,10 @@ class Publisher:
 
     def add(self, ev: Event) -> None:
         self._buf.append(ev)
+        if self.live is not None:
+            self.live.publish(ev.pid, ev.value, ev.ts, ev.quality)
+        if self.history is not None:
+            self.history.append(ev.pid, ev.value, ev.ts)
         self._maybe_flush()
 
     def _maybe_flush(self) -> None:
@@ -49,17 +66,18 @@ class Publisher:
         if not self._buf:
             return
 
+        reg = self.registry
         batch = {
             "sent_at": time.time(),
             "count": len(self._buf),
             "events": [
                 {
-                    "asset_id": e.asset_id,
-                    "point_id": e.point_id,
+                    "asset_id": reg.asset_id[e.pid],
+                    "point_id": reg.point_id[e.pid],
                     "value": e.value,
                     "ts": e.ts,
                     "quality": e.quality,
-                    "source_ref": e.source_ref,
+                    "source_ref": reg.source_ref[e.pid],
                 }
                 for e in self._buf
             ],
@@ -2,15 +2,97 @@
 from __future__ import annotations
 
 import argparse
-import subprocess
+import hashlib
 import sys
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, List
 
+if TYPE_CHECKING:
+    from src.utils.dag import Step
 
-def run(cmd: list[str]) -> int:
-    print("\n==== RUN ====")
-    print("CMD:", " ".join(cmd))
-    return subprocess.call(cmd)
+DEFAULT_CACHE_PATH = Path("out") / ".cache" / "run_all.json"
+
+
+def code_fingerprint(root: Path) -> str:
+    """Changes to the repo's code or schemas invalidate every cached step."""
+    from src.utils.artifact_io import HashCache, hash_files
+
+    files = sorted(list((root / "src").rglob("*.py")) + list((root / "schemas").glob("*.json")))
+    cache = HashCache.default()
+    digests = hash_files(files, cache=cache)
+    cache.save()
+    h = hashlib.sha256(sys.version.encode("utf-8"))
+    for p in files:
+        h.update(f"\n{p.relative_to(root).as_posix()}|{digests[p]}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def build_steps(args: argparse.Namespace) -> List[Step]:
+    """
+    The pipeline as a DAG: BACnet (scan -> validate -> pack) and Metasys
+    (pipeline) are independent branches.
+    """
+    from src.bacnet_scanner.devices_io import output_path
+    from src.utils.config_io import load_config
+    from src.utils.dag import Step
+
+    py = sys.executable
+    root = Path(".").resolve()
+    steps: List[Step] = []
+
+    bacnet_cfg = (root / args.bacnet_config).resolve()
+    cfg = load_config(bacnet_cfg) if bacnet_cfg.exists() else {}
+    devices, _ = output_path(cfg.get("output", {}) or {})
+    schema = Path("schemas/bacnet_devices_output.schema.json")
+
+    if not args.skip_bacnet:
+        offline = bool((cfg.get("safety", {}) or {}).get("offline_mode", False))
+        steps.append(
+            Step(
+                "bacnet_scan",
+                [py, "-m", "src.bacnet_scanner.cli", "--config", str(bacnet_cfg)],
+                inputs=(bacnet_cfg,),
+                outputs=(devices,),
+                # a live scan reads the network; only the offline (mock) scan is a function of the config
+                volatile=not offline,
+            )
+        )
+        steps.append(
+            Step(
+                "bacnet_validate",
+                [py, "-m", "src.bacnet_scanner.validate_output", "--json", str(devices)],
+                deps=("bacnet_scan",),
+                inputs=(devices, schema),
+            )
+        )
+
+    if not args.skip_metasys:
+        steps.append(
+            Step(
+                "metasys_pipeline",
+                [py, "-m", "src.pipeline", "--csv", args.metasys_csv, "--base", args.metasys_base],
+                inputs=(
+                    Path(args.metasys_csv),
+                    Path(args.metasys_base),
+                    Path("schemas/metasys_connector_config.schema.json"),
+                ),
+                outputs=(Path("config/generated/pilot_generated.yml"),),
+            )
+        )
+
+    if args.pack:
+        extras = [p for pattern in ("objects.*json", "points_from_bacnet.csv") for p in sorted(devices.parent.glob(pattern))]
+        steps.append(
+            Step(
+                "pack_ingest",
+                [py, "-m", "src.pack_ingest", "--out-dir", args.pack_out_dir, "--bacnet-json", str(devices)],
+                deps=() if args.skip_bacnet else ("bacnet_validate",),
+                inputs=(devices, schema, *extras),
+                outputs=(Path(args.pack_out_dir) / "manifest.json",),
+            )
+        )
+    return steps
 
 
 def main() -> int:
@@ -25,33 +107,38 @@ def main() -> int:
     ap.add_argument("--pack", action="store_true", help="After pipelines, build out/ingest bundle.")
     ap.add_argument("--pack-out-dir", default="out/ingest")
 
-    args = ap.parse_args()
-
-    root = Path(".").resolve()
-    bacnet_cfg = str((root / args.bacnet_config).resolve())
+    ap.add_argument("--jobs", type=int, default=2, help="Steps run at the same time (BACnet and Metasys branches).")
+    ap.add_argument("--force", action="store_true", help="Run every step, even with unchanged inputs.")
+    ap.add_argument("--cache-file", default=str(DEFAULT_CACHE_PATH), help="Step cache ('' to disable caching).")
 
-    # 1) BACnet
-    if not args.skip_bacnet:
-        rc = run([sys.executable, "-m", "src.bacnet_scanner.cli", "--config", bacnet_cfg])
-        if rc != 0:
-            return rc
-
-        # validate
-        rc = run([sys.executable, "-m", "src.bacnet_scanner.validate_output", "--json", "out/bacnet/devices.json"])
-        if rc != 0:
-            return rc
-
-    # 2) Metasys (pipeline only for now)
-    if not args.skip_metasys:
-        rc = run([sys.executable, "-m", "src.pipeline", "--csv", args.metasys_csv, "--base", args.metasys_base])
-        if rc != 0:
-            return rc
+    args = ap.parse_args()
 
-    # 3) Pack ingest bundle
-    if args.pack:
-        rc = run([sys.executable, "-m", "src.pack_ingest", "--out-dir", args.pack_out_dir])
-        if rc != 0:
-            return rc
+    # the executor (thread pool, hashing) loads only once a run is under way
+    from src.utils.dag import run_dag, timing_report
+
+    steps = build_steps(args)
+    if not steps:
+        print("[WARN] Nothing selected.")
+        return 0
+
+    t0 = time.perf_counter()
+    results = run_dag(
+        steps,
+        cache_path=Path(args.cache_file) if args.cache_file else None,
+        jobs=args.jobs,
+        force=args.force or not args.cache_file,
+        salt=code_fingerprint(Path(".").resolve()),
+    )
+    wall = time.perf_counter() - t0
+
+    print("\n==== TIMING ====")
+    for line in timing_report(steps, results, wall):
+        print(line)
+
+    failed = [r for r in results.values() if r.status == "failed"]
+    if failed:
+        print(f"\n[STOP] Step failed: {failed[0].name} (exit={failed[0].rc})")
+        return failed[0].rc or 1
 
     print("\n✅ DONE: All selected steps completed.")
     return 0
@@ -1,16 +1,42 @@
 import json
-from jsonschema import Draft202012Validator
+import os
+from typing import Any, Dict, Tuple
 
+# (schema_path, subschema keys) -> ((mtime_ns, size), compiled validator)
+_VALIDATORS: Dict[Tuple[str, Tuple[str, ...]], Tuple[Tuple[int, int], Any]] = {}
 
-def validate_config(config: dict, schema_path: str) -> None:
+
+def validator_for(schema_path: str, *keys: str) -> Any:
     """
-    Validate loaded YAML config against a JSON Schema.
-    Raises ValueError with a readable error list if invalid.
+    Compiled validator for the schema file, or for the subschema reached by
+    `keys` (e.g. "properties", "devices", "items") to check one record at a
+    time. Cached until the file changes.
     """
+    # jsonschema is slow to import; only pay for it when something is validated.
+    from jsonschema import Draft202012Validator
+
+    st = os.stat(schema_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _VALIDATORS.get((schema_path, keys))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
     with open(schema_path, "r", encoding="utf-8") as f:
         schema = json.load(f)
+    for k in keys:
+        schema = schema[k]
 
     validator = Draft202012Validator(schema)
+    _VALIDATORS[(schema_path, keys)] = (stamp, validator)
+    return validator
+
+
+def validate_config(config: dict, schema_path: str) -> None:
+    """
+    Validate loaded YAML config against a JSON Schema.
+    Raises ValueError with a readable error list if invalid.
+    """
+    validator = validator_for(schema_path)
     errors = sorted(validator.iter_errors(config), key=lambda e: list(e.path))
 
     if errors:
@@ -19,4 +45,3 @@ def validate_config(config: dict, schema_path: str) -> None:
             path = ".".join([str(p) for p in e.path]) or "<root>"
             lines.append(f"- {path}: {e.message}")
         raise ValueError("Config validation failed:\n" + "\n".join(lines))
-
@@ -2,20 +2,374 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import os
-import sys
+import time
 import zipfile
+import zlib
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-import requests
+from src.utils.artifact_io import CHUNK, HashCache
 
+# Content-addressed upload (--mode cas), against the ingest endpoint as base URL:
+#   POST {endpoint}/blobs/missing  {"sha256": [...]}  -> {"missing": [...]}
+#   PUT  {endpoint}/blobs/{sha256} file bytes, gzip Content-Encoding unless already compressed;
+#                                  the server checks the decompressed bytes hash to {sha256}
+#   POST {endpoint}/bundles        manifest.json plus a "blobs" list naming each file's sha256
+# Only blobs the server lacks are sent, so an unchanged artifact costs one hash in the query.
 
-def zip_folder(folder: Path, zip_path: Path) -> None:
-    zip_path.parent.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
-        for p in folder.rglob("*"):
-            if p.is_file():
-                z.write(p, arcname=str(p.relative_to(folder)).replace("\\", "/"))
+# Resumable zip upload (--mode resumable): the archive is streamed as it is built,
+# in fixed-size chunks at explicit offsets within an upload session:
+#   POST {endpoint}/uploads                   {"filename", "chunk_size", "fingerprint"} -> {"session_id", "offset"}
+#   GET  {endpoint}/uploads/{id}              -> {"offset"}: bytes acknowledged so far
+#   PUT  {endpoint}/uploads/{id}?offset=N     one chunk; 409 + {"offset"} if N is not the acknowledged end
+#   POST {endpoint}/uploads/{id}/complete     {"sha256", "bytes"} of the whole archive
+# The archive bytes are a pure function of the bundle files, so after a
+# dropped connection (or a re-run) the stream is rebuilt and skipped up to
+# the acknowledged offset; only the chunk in flight is ever held in memory.
+
+# Compressing these again only burns CPU.
+_COMPRESSED_SUFFIXES = {".gz", ".zip", ".zst", ".bz2", ".xz", ".png", ".jpg", ".jpeg"}
+
+# zstd inside zip needs Python 3.14+ (zipfile.ZIP_ZSTANDARD); deflate otherwise.
+_TEXT_METHOD = getattr(zipfile, "ZIP_ZSTANDARD", zipfile.ZIP_DEFLATED)
+
+DEFAULT_CHUNK_MB = 8
+DEFAULT_SESSION_PATH = Path("out") / ".cache" / "upload_session.json"
+
+
+def _bundle_files(folder: Path) -> List[Path]:
+    return sorted((p for p in folder.rglob("*") if p.is_file()), key=lambda p: p.relative_to(folder).as_posix())
+
+
+def _compress_type(path: Path) -> int:
+    return zipfile.ZIP_STORED if path.suffix.lower() in _COMPRESSED_SUFFIXES else _TEXT_METHOD
+
+
+class _StreamSink:
+    """Write-only, unseekable file object for zipfile; written bytes are taken back out in chunks."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buf += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self, size: int) -> Iterator[bytes]:
+        while len(self._buf) >= size:
+            chunk = bytes(self._buf[:size])
+            del self._buf[:size]
+            yield chunk
+
+    def rest(self) -> bytes:
+        chunk = bytes(self._buf)
+        self._buf.clear()
+        return chunk
+
+
+def stream_zip(folder: Path, chunk_size: int) -> Iterator[bytes]:
+    """
+    The zip of folder, built on the fly and yielded as chunk_size pieces
+    (the last one shorter). Entries are sorted and stamped with the files'
+    mtimes, so the same files always give the same bytes.
+    """
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as z:
+        for p in _bundle_files(folder):
+            info = zipfile.ZipInfo.from_file(p, p.relative_to(folder).as_posix())
+            info.compress_type = _compress_type(p)
+            with p.open("rb") as src, z.open(info, "w") as dst:
+                for piece in iter(lambda: src.read(CHUNK), b""):
+                    dst.write(piece)
+                    yield from sink.take(chunk_size)
+    yield from sink.take(chunk_size)
+    tail = sink.rest()
+    if tail:
+        yield tail
+
+
+def bundle_fingerprint(folder: Path, chunk_size: int) -> str:
+    """Identifies the archive stream_zip would produce, so a saved session is only resumed for the same bytes."""
+    h = hashlib.sha256(f"{chunk_size}|{zlib.ZLIB_RUNTIME_VERSION}|{_TEXT_METHOD}".encode("utf-8"))
+    for p in _bundle_files(folder):
+        st = p.stat()
+        h.update(f"\n{p.relative_to(folder).as_posix()}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()
+
+
+@dataclass
+class Blob:
+    name: str  # logical name from the manifest, e.g. bacnet.devices_json
+    path: str  # bundle-relative, forward slashes
+    local: Path
+    sha256: str
+    bytes: int
+
+
+def bundle_blobs(bundle_dir: Path, manifest: Dict[str, Any], cache: HashCache) -> List[Blob]:
+    """
+    The manifest's files, located under bundle_dir and checked against their
+    recorded sha256 (through the hash cache, so normally without reading them).
+    """
+    root = bundle_dir.resolve()
+    blobs: List[Blob] = []
+    for name, entry in (manifest.get("files") or {}).items():
+        local = Path(str(entry.get("path", "")))
+        if not local.is_absolute() and not local.exists():
+            local = bundle_dir / local
+        local = local.resolve()
+        try:
+            rel = local.relative_to(root).as_posix()
+        except ValueError:
+            raise SystemExit(f"[ERROR] {name}: {local} is outside the bundle dir {root}")
+        if not local.exists():
+            raise SystemExit(f"[ERROR] {name}: missing {local}")
+        sha256 = str(entry.get("sha256", ""))
+        if cache.sha256(local) != sha256:
+            raise SystemExit(f"[ERROR] {name}: {rel} changed since the manifest was written; re-run src.pack_ingest")
+        blobs.append(Blob(name, rel, local, sha256, local.stat().st_size))
+    return blobs
+
+
+def gzip_chunks(path: Path, level: int = 6) -> Iterator[bytes]:
+    """The file gzip-compressed, produced a chunk at a time."""
+    comp = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            out = comp.compress(chunk)
+            if out:
+                yield out
+    yield comp.flush()
+
+
+def file_chunks(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        yield from iter(lambda: f.read(CHUNK), b"")
+
+
+class _Counted:
+    """Wraps a chunk iterator, counting the bytes that go out."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self.sent = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for c in self._chunks:
+            self.sent += len(c)
+            yield c
+
+
+def upload_cas(
+    session: Any,
+    endpoint: str,
+    headers: Dict[str, str],
+    bundle_dir: Path,
+    compress: bool = True,
+    timeout: float = 60.0,
+) -> Dict[str, Any]:
+    """
+    Upload the bundle content-addressed: ask which blobs the server lacks,
+    stream only those (gzip unless already compressed), then post the
+    manifest. Returns counts for the summary line.
+    """
+    base = endpoint.rstrip("/")
+    manifest_path = bundle_dir / "manifest.json"
+    if not manifest_path.exists():
+        raise SystemExit(f"[ERROR] No manifest in {bundle_dir}; run src.pack_ingest first.")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    cache = HashCache.default()
+    blobs = bundle_blobs(bundle_dir, manifest, cache)
+    cache.save()
+
+    unique = sorted({b.sha256 for b in blobs})
+    resp = session.post(f"{base}/blobs/missing", json={"sha256": unique}, headers=headers, timeout=timeout)
+    resp.raise_for_status()
+    missing = set(resp.json().get("missing") or [])
+
+    stats: Dict[str, Any] = {"blobs": len(unique), "uploaded": 0, "skipped": len(unique) - len(missing)}
+    stats.update({"bytes_total": sum(b.bytes for b in blobs), "bytes_raw": 0, "bytes_sent": 0})
+    sent = set()
+    for blob in blobs:
+        if blob.sha256 not in missing or blob.sha256 in sent:
+            continue
+        put_headers = dict(headers, **{"Content-Type": "application/octet-stream"})
+        if compress and blob.local.suffix.lower() not in _COMPRESSED_SUFFIXES:
+            body = _Counted(gzip_chunks(blob.local))
+            put_headers["Content-Encoding"] = "gzip"
+        else:
+            body = _Counted(file_chunks(blob.local))
+        resp = session.put(f"{base}/blobs/{blob.sha256}", data=body, headers=put_headers, timeout=timeout)
+        resp.raise_for_status()
+        sent.add(blob.sha256)
+        stats["uploaded"] += 1
+        stats["bytes_raw"] += blob.bytes
+        stats["bytes_sent"] += body.sent
+        print(f"[INFO] uploaded {blob.path} ({blob.bytes:,} bytes, {body.sent:,} on the wire)")
+
+    document = dict(manifest, blobs=[{"name": b.name, "path": b.path, "sha256": b.sha256, "bytes": b.bytes} for b in blobs])
+    resp = session.post(f"{base}/bundles", json=document, headers=headers, timeout=timeout)
+    resp.raise_for_status()
+    stats["response"] = resp.text[:1000]
+    return stats
+
+
+def multipart_zip(folder: Path, boundary: str, filename: str = "ingest_bundle.zip") -> Iterator[bytes]:
+    """multipart/form-data body with the bundle zip as its "file" field, streamed."""
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/zip\r\n\r\n"
+    ).encode("utf-8")
+    yield from stream_zip(folder, CHUNK)
+    yield f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+
+class _Retry:
+    """Bounded retries with exponential backoff for one upload step."""
+
+    def __init__(self, retries: int, backoff: float, sleep: Callable[[float], None] = time.sleep) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.failures = 0
+
+    def failed(self, attempt: int, what: str, err: str) -> None:
+        self.failures += 1
+        if attempt >= self.retries:
+            raise SystemExit(f"[ERROR] {what} failed after {attempt + 1} attempts: {err}")
+        delay = min(30.0, self.backoff * (2**attempt))
+        print(f"[WARN] {what} failed ({err}); retrying in {delay:.1f}s")
+        self.sleep(delay)
+
+
+def _load_session(path: Optional[Path]) -> Dict[str, Any]:
+    if path is None or not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_session(path: Optional[Path], data: Dict[str, Any]) -> None:
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def upload_resumable(
+    session: Any,
+    endpoint: str,
+    headers: Dict[str, str],
+    bundle_dir: Path,
+    chunk_size: int = DEFAULT_CHUNK_MB * 1024 * 1024,
+    timeout: float = 60.0,
+    retries: int = 5,
+    backoff: float = 1.0,
+    session_path: Optional[Path] = DEFAULT_SESSION_PATH,
+) -> Dict[str, Any]:
+    """
+    Stream the bundle zip in chunk_size pieces within an upload session,
+    resuming from the server's acknowledged offset after a failed request
+    and, via session_path, across runs. Returns counts for the summary line.
+    """
+    from requests import exceptions as rexc
+
+    network_errors = (rexc.ConnectionError, rexc.Timeout)
+    base = endpoint.rstrip("/")
+    retry = _Retry(retries, backoff)
+
+    def call(what: str, method: str, url: str, **kwargs: Any) -> Any:
+        for attempt in range(retries + 1):
+            try:
+                resp = session.request(method, url, headers=headers, timeout=timeout, **kwargs)
+            except network_errors as e:
+                retry.failed(attempt, what, str(e))
+                continue
+            if resp.status_code >= 500:
+                retry.failed(attempt, what, f"HTTP {resp.status_code}")
+                continue
+            return resp
+        raise AssertionError("unreachable")
+
+    def acknowledged(sid: str) -> Optional[int]:
+        resp = call("offset query", "GET", f"{base}/uploads/{sid}")
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return int(resp.json()["offset"])
+
+    fingerprint = bundle_fingerprint(bundle_dir, chunk_size)
+    saved = _load_session(session_path)
+    sid: Optional[str] = None
+    offset = 0
+    if saved.get("endpoint") == base and saved.get("fingerprint") == fingerprint:
+        offset_or_none = acknowledged(str(saved["session_id"]))
+        if offset_or_none is not None:
+            sid, offset = str(saved["session_id"]), offset_or_none
+            print(f"[INFO] resuming upload session {sid} at byte {offset:,}")
+    if sid is None:
+        body = {"filename": "ingest_bundle.zip", "chunk_size": chunk_size, "fingerprint": fingerprint}
+        resp = call("session start", "POST", f"{base}/uploads", json=body)
+        resp.raise_for_status()
+        sid, offset = str(resp.json()["session_id"]), 0
+        _save_session(session_path, {"endpoint": base, "fingerprint": fingerprint, "session_id": sid})
+
+    stats: Dict[str, Any] = {"session_id": sid, "resumed_at": offset, "chunks_sent": 0, "bytes_sent": 0}
+    chunk_headers = dict(headers, **{"Content-Type": "application/octet-stream"})
+    h = hashlib.sha256()
+    pos = 0
+    for chunk in stream_zip(bundle_dir, chunk_size):
+        h.update(chunk)
+        end = pos + len(chunk)
+        attempt = 0
+        # chunks up to offset were acknowledged already (earlier run, or an ack that got lost)
+        while end > offset:
+            if offset != pos:
+                raise SystemExit(f"[ERROR] Server acknowledged byte {offset:,}, expected {pos:,}; restart the upload.")
+            what = f"chunk at byte {pos:,}"
+            url = f"{base}/uploads/{sid}?offset={pos}"
+            try:
+                resp = session.put(url, data=chunk, headers=chunk_headers, timeout=timeout)
+                stats["chunks_sent"] += 1
+                stats["bytes_sent"] += len(chunk)
+                if resp.status_code == 409:
+                    offset = int(resp.json()["offset"])
+                    continue
+                if resp.status_code < 500:
+                    resp.raise_for_status()
+                    offset = int(resp.json()["offset"])
+                    continue
+                err = f"HTTP {resp.status_code}"
+            except network_errors as e:
+                err = str(e)
+            retry.failed(attempt, what, err)
+            attempt += 1
+            acked = acknowledged(sid)
+            if acked is None:
+                raise SystemExit(f"[ERROR] Upload session {sid} expired on the server; run again to start over.")
+            offset = acked
+        pos = end
+
+    resp = call("complete", "POST", f"{base}/uploads/{sid}/complete", json={"sha256": h.hexdigest(), "bytes": pos})
+    resp.raise_for_status()
+    if session_path is not None and session_path.exists():
+        session_path.unlink()
+    stats.update({"bytes": pos, "sha256": h.hexdigest(), "retries": retry.failures, "response": resp.text[:1000]})
+    return stats
 
 
 def main() -> int:
@@ -24,6 +378,24 @@ def main() -> int:
     ap.add_argument("--endpoint", default=os.environ.get("INGEST_ENDPOINT", ""))
     ap.add_argument("--api-key", default=os.environ.get("INGEST_API_KEY", ""))
     ap.add_argument("--enable", action="store_true", help="Required. Without this flag the script will not upload.")
+    ap.add_argument(
+        "--mode",
+        choices=["zip", "resumable", "cas"],
+        default=os.environ.get("INGEST_UPLOAD_MODE", "zip"),
+        help=(
+            "zip: whole bundle as one streamed zip POST. resumable: the same zip in chunks that resume "
+            "after a disconnect. cas: only the files the server does not have yet, by sha256."
+        ),
+    )
+    ap.add_argument("--no-compress", action="store_true", help="cas mode: send blobs without gzip.")
+    ap.add_argument("--timeout", type=float, default=60.0, help="Seconds per request (cas: per blob).")
+    ap.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_MB, help="resumable mode: chunk size in MiB.")
+    ap.add_argument("--retries", type=int, default=5, help="resumable mode: attempts per chunk after the first.")
+    ap.add_argument(
+        "--session-file",
+        default=str(DEFAULT_SESSION_PATH),
+        help="resumable mode: where the open session is kept so a re-run continues it ('' to disable).",
+    )
     args = ap.parse_args()
 
     bundle_dir = Path(args.bundle_dir)
@@ -41,16 +413,55 @@ def main() -> int:
         print(f"[ERROR] Bundle dir not found: {bundle_dir}")
         return 2
 
-    zip_path = Path("out") / "ingest_bundle.zip"
-    zip_folder(bundle_dir, zip_path)
+    import requests  # only needed when actually uploading
 
     headers = {}
     if args.api_key:
         headers["Authorization"] = f"Bearer {args.api_key}"
 
-    with zip_path.open("rb") as f:
-        files = {"file": ("ingest_bundle.zip", f, "application/zip")}
-        resp = requests.post(args.endpoint, headers=headers, files=files, timeout=60)
+    if args.mode == "cas":
+        with requests.Session() as session:
+            try:
+                stats = upload_cas(session, args.endpoint, headers, bundle_dir, not args.no_compress, args.timeout)
+            except requests.RequestException as e:
+                print(f"[ERROR] Upload failed: {e}")
+                return 3
+        print(
+            f"[OK] {stats['uploaded']} of {stats['blobs']} blobs uploaded ({stats['skipped']} already on the server); "
+            f"{stats['bytes_sent']:,} bytes sent for a {stats['bytes_total']:,}-byte bundle"
+        )
+        print(stats["response"])
+        return 0
+
+    if args.mode == "resumable":
+        with requests.Session() as session:
+            try:
+                stats = upload_resumable(
+                    session,
+                    args.endpoint,
+                    headers,
+                    bundle_dir,
+                    chunk_size=max(1, args.chunk_mb) * 1024 * 1024,
+                    timeout=args.timeout,
+                    retries=max(0, args.retries),
+                    session_path=Path(args.session_file) if args.session_file else None,
+                )
+            except requests.RequestException as e:
+                print(f"[ERROR] Upload failed: {e}")
+                return 3
+        print(
+            f"[OK] {stats['bytes']:,}-byte bundle uploaded in session {stats['session_id']} "
+            f"({stats['chunks_sent']} chunk requests, {stats['retries']} retried, resumed at byte {stats['resumed_at']:,})"
+        )
+        print(stats["response"])
+        return 0
+
+    # the zip is built while it is sent; nothing is written to disk
+    boundary = f"ingest-{os.urandom(12).hex()}"
+    zip_headers = dict(headers, **{"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    resp = requests.post(
+        args.endpoint, headers=zip_headers, data=multipart_zip(bundle_dir, boundary), timeout=args.timeout
+    )
 
     print("[INFO] HTTP status:", resp.status_code)
     print(resp.text[:1000])
@@ -0,0 +1,182 @@
+# src/utils/artifact_io.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CHUNK = 1024 * 1024
+
+# A file modified this recently could change again within the same mtime tick
+# without its size changing; such entries are not cached (git's "racy" rule).
+_RACY_SECONDS = 2.0
+
+DEFAULT_CACHE_PATH = Path("out") / ".cache" / "sha256.json"
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stamp(st: os.stat_result) -> Tuple[int, int]:
+    return st.st_size, st.st_mtime_ns
+
+
+class HashCache:
+    """
+    Persistent (path, size, mtime_ns) -> sha256 map, saved as JSON. A file
+    whose size or mtime differs from the recorded one is hashed again.
+    Thread-safe; call save() to persist.
+    """
+
+    def __init__(self, path: Optional[Path]) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, List] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                self._entries = {k: v for k, v in data.items() if isinstance(v, list) and len(v) == 3}
+            except (OSError, ValueError, AttributeError):
+                self._entries = {}
+
+    @classmethod
+    def default(cls) -> "HashCache":
+        """The repo-wide cache (ARTIFACT_HASH_CACHE overrides the path; empty disables it)."""
+        env = os.environ.get("ARTIFACT_HASH_CACHE")
+        if env is None:
+            return cls(DEFAULT_CACHE_PATH)
+        return cls(Path(env) if env.strip() else None)
+
+    def lookup(self, path: Path, st: os.stat_result) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(str(path.resolve()))
+        if entry is not None and (entry[0], entry[1]) == _stamp(st):
+            self.hits += 1
+            return str(entry[2])
+        self.misses += 1
+        return None
+
+    def store(self, path: Path, st: os.stat_result, sha256: str) -> None:
+        if time.time() - st.st_mtime_ns / 1e9 < _RACY_SECONDS:
+            return
+        size, mtime_ns = _stamp(st)
+        with self._lock:
+            self._entries[str(path.resolve())] = [size, mtime_ns, sha256]
+            self._dirty = True
+
+    def sha256(self, path: Path) -> str:
+        st = path.stat()
+        digest = self.lookup(path, st)
+        if digest is None:
+            digest = sha256_file(path)
+            self.store(path, st, digest)
+        return digest
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        with self._lock:
+            # drop entries for files that are gone, so the cache does not grow forever
+            entries = {k: v for k, v in self._entries.items() if os.path.exists(k)}
+            self._dirty = False
+        # several processes (parallel run_all steps) save the same cache: each
+        # writes its own temp file, and a save that fails only costs re-hashing
+        tmp: Optional[str] = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=self.path.name + ".", suffix=".tmp", dir=self.path.parent)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(entries, separators=(",", ":")))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[WARN] Could not save hash cache {self.path}: {e}")
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+
+
+def copy_and_hash(src: Path, dst: Path, cache: Optional[HashCache] = None) -> Tuple[str, int]:
+    """
+    Copy src to dst (data and stat, like shutil.copy2), hashing the bytes as
+    they pass so the file is read once. Returns (sha256, bytes).
+
+    With a cache, a dst left by an earlier copy of the unchanged src (same
+    size, mtime and recorded hash) is kept as is and nothing is read.
+    """
+    st = src.stat()
+    if cache is not None:
+        known = cache.lookup(src, st)
+        if known is not None and dst.exists():
+            dst_st = dst.stat()
+            if _stamp(dst_st) == _stamp(st) and cache.lookup(dst, dst_st) == known:
+                return known, st.st_size
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + ".tmp")
+    h = hashlib.sha256()
+    size = 0
+    try:
+        with src.open("rb") as fin, tmp.open("wb") as fout:
+            for chunk in iter(lambda: fin.read(CHUNK), b""):
+                h.update(chunk)
+                fout.write(chunk)
+                size += len(chunk)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+    digest = h.hexdigest()
+    if cache is not None:
+        cache.store(src, st, digest)
+        cache.store(dst, dst.stat(), digest)
+    return digest, size
+
+
+def _workers(n: int, workers: Optional[int]) -> int:
+    return max(1, min(n, workers or min(8, (os.cpu_count() or 2))))
+
+
+def hash_files(
+    paths: Iterable[Path], cache: Optional[HashCache] = None, workers: Optional[int] = None
+) -> Dict[Path, str]:
+    """sha256 of each path, hashed in a thread pool (hashlib releases the GIL on large reads)."""
+    paths = list(dict.fromkeys(paths))
+    one = cache.sha256 if cache is not None else sha256_file
+    if len(paths) <= 1:
+        return {p: one(p) for p in paths}
+    with ThreadPoolExecutor(max_workers=_workers(len(paths), workers)) as pool:
+        return dict(zip(paths, pool.map(one, paths)))
+
+
+def copy_files(
+    pairs: Iterable[Tuple[Path, Path]], cache: Optional[HashCache] = None, workers: Optional[int] = None
+) -> Dict[Path, Tuple[str, int]]:
+    """copy_and_hash() for each (src, dst) in a thread pool; dst -> (sha256, bytes)."""
+    pairs = list(pairs)
+    if len(pairs) <= 1:
+        return {dst: copy_and_hash(src, dst, cache) for src, dst in pairs}
+    with ThreadPoolExecutor(max_workers=_workers(len(pairs), workers)) as pool:
+        results = pool.map(lambda p: copy_and_hash(p[0], p[1], cache), pairs)
+        return {dst: r for (_, dst), r in zip(pairs, results)}
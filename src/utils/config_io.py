@@ -0,0 +1,110 @@
+# src/utils/config_io.py
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+from src.utils.safe_write import atomic_write_text
+
+# Prefer the libyaml C bindings; PyYAML wheels ship them on most platforms
+# but source installs may not. Output is the same either way.
+try:
+    from yaml import CSafeDumper as _Dumper
+    from yaml import CSafeLoader as _Loader
+
+    YAML_BACKEND = "libyaml"
+except ImportError:  # pragma: no cover - depends on how PyYAML was built
+    from yaml import SafeDumper as _Dumper  # type: ignore[assignment]
+    from yaml import SafeLoader as _Loader  # type: ignore[assignment]
+
+    YAML_BACKEND = "python"
+
+
+def yaml_load(text: str) -> Any:
+    """
+    Drop-in for yaml.safe_load using the fastest available safe loader.
+    """
+    return yaml.load(text, Loader=_Loader)
+
+
+def yaml_dump(data: Any, **kwargs: Any) -> str:
+    """
+    Drop-in for yaml.safe_dump (same defaults) using the fastest available safe dumper.
+    """
+    return yaml.dump(data, Dumper=_Dumper, **kwargs)
+
+
+def sidecar_path(path: Path) -> Path:
+    """
+    JSON sidecar for a YAML config: config/generated/x.yml -> config/generated/x.yml.json
+    """
+    return path.with_name(path.name + ".json")
+
+
+def _source_stamp(path: Path) -> Dict[str, int]:
+    st = path.stat()
+    return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+
+def _json_safe(obj: Any) -> bool:
+    """
+    True if obj survives a JSON round trip unchanged (str keys, JSON scalar types).
+    YAML can produce int keys, dates, etc. that JSON would silently stringify.
+    """
+    if isinstance(obj, dict):
+        return all(isinstance(k, str) and _json_safe(v) for k, v in obj.items())
+    if isinstance(obj, list):
+        return all(_json_safe(v) for v in obj)
+    return obj is None or isinstance(obj, (str, int, float, bool))
+
+
+def read_sidecar(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Config from the JSON sidecar if it exists and was written from the current
+    YAML (same size and mtime); otherwise None.
+    """
+    side = sidecar_path(path)
+    try:
+        if not side.exists():
+            return None
+        payload = json.loads(side.read_text(encoding="utf-8"))
+        if payload.get("source") != _source_stamp(path):
+            return None
+    except (OSError, ValueError, AttributeError):
+        return None
+    cfg = payload.get("config")
+    return cfg if isinstance(cfg, dict) else None
+
+
+def write_sidecar(path: Path, cfg: Dict[str, Any]) -> Optional[Path]:
+    """
+    Best-effort: write the JSON sidecar for `path`. Skipped (returns None) when the
+    config holds values JSON cannot represent faithfully.
+    """
+    if not _json_safe(cfg):
+        return None
+    payload = {"source": _source_stamp(path), "config": cfg}
+    try:
+        return atomic_write_text(sidecar_path(path), json.dumps(payload, separators=(",", ":")))
+    except OSError:
+        return None
+
+
+def load_config(path: Path, use_sidecar: bool = False) -> Dict[str, Any]:
+    """
+    Load a YAML config (BOM-safe). With use_sidecar=True a fresh JSON sidecar is
+    used when present, and (re)written after a YAML parse when it is not.
+    """
+    if use_sidecar:
+        cached = read_sidecar(path)
+        if cached is not None:
+            return cached
+
+    cfg = yaml_load(path.read_text(encoding="utf-8-sig")) or {}
+
+    if use_sidecar and isinstance(cfg, dict):
+        write_sidecar(path, cfg)
+    return cfg
@@ -0,0 +1,117 @@
+# src/utils/csv_chunks.py
+from __future__ import annotations
+
+import csv
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+_BOM = b"\xef\xbb\xbf"
+
+# Below this many bytes per chunk, process startup costs more than it saves.
+MIN_CHUNK_BYTES = 256 * 1024
+
+
+def default_jobs() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def read_header(path: Path) -> Tuple[Optional[List[str]], int]:
+    """
+    Read the CSV header row (UTF-8, optional BOM).
+    Returns (fieldnames or None if the file is empty, byte offset of the first data row).
+    """
+    with path.open("rb") as f:
+        line = f.readline()
+    if not line:
+        return None, 0
+    offset = len(line)
+    if line.startswith(_BOM):
+        line = line[len(_BOM) :]
+    fields = next(csv.reader([line.decode("utf-8")]), None)
+    return fields, offset
+
+
+def column_positions(header: Sequence[str], columns: Sequence[str]) -> List[int]:
+    """
+    Index of each wanted column in the (stripped) header, -1 if absent.
+    """
+    stripped = [h.strip() for h in header]
+    return [stripped.index(c) if c in stripped else -1 for c in columns]
+
+
+def iter_records(
+    lines: Iterable[str], positions: Sequence[int], width: int
+) -> Iterator[List[str]]:
+    """
+    Parse CSV lines into stripped field lists ordered like `positions`.
+    Blank records are skipped (as csv.DictReader does); absent columns come back as "".
+    """
+    for raw in csv.reader(lines):
+        if not raw:
+            continue
+        if len(raw) < width:
+            raw.extend([""] * (width - len(raw)))
+        yield [raw[i].strip() if i >= 0 else "" for i in positions]
+
+
+def iter_range_lines(path: Path, start: int, end: int) -> Iterator[str]:
+    """
+    Yield decoded lines from the byte range [start, end) of a UTF-8 file.
+    Ranges from split_ranges() always begin and end on record boundaries.
+    """
+    with path.open("rb") as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line.decode("utf-8")
+
+
+def split_ranges(
+    path: Path, start: int, parts: int, block_size: int = 1024 * 1024
+) -> List[Tuple[int, int]]:
+    """
+    Split the byte range [start, EOF) into up to `parts` ranges that end on
+    record boundaries. A newline only counts as a boundary when an even number
+    of '"' precede it, so quoted fields containing line breaks are never cut.
+    """
+    size = path.stat().st_size
+    if parts <= 1 or size - start < 2 * MIN_CHUNK_BYTES:
+        return [(start, size)]
+
+    parts = min(parts, max(1, (size - start) // MIN_CHUNK_BYTES))
+    targets = [start + (size - start) * i // parts for i in range(1, parts)]
+    bounds = [start]
+    quotes = 0  # number of '"' seen before the current block
+    ti = 0
+
+    with path.open("rb") as f:
+        f.seek(start)
+        pos = start
+        while ti < len(targets):
+            block = f.read(block_size)
+            if not block:
+                break
+            search_from = 0
+            while ti < len(targets):
+                rel = max(targets[ti], bounds[-1]) - pos
+                if rel >= len(block):
+                    break
+                nl = block.find(b"\n", max(rel, search_from))
+                while nl != -1 and (quotes + block.count(b'"', 0, nl)) % 2:
+                    nl = block.find(b"\n", nl + 1)
+                if nl == -1:
+                    break  # keep looking in the next block
+                bounds.append(pos + nl + 1)
+                search_from = nl + 1
+                ti += 1
+            quotes += block.count(b'"')
+            pos += len(block)
+
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
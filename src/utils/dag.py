@@ -0,0 +1,230 @@
+# src/utils/dag.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.artifact_io import HashCache
+
+# Step statuses: ran, cached (skipped: same inputs as the last good run), failed,
+# blocked (a dependency failed or was blocked).
+
+
+@dataclass
+class Step:
+    name: str
+    cmd: List[str]
+    deps: Tuple[str, ...] = ()
+    inputs: Tuple[Path, ...] = ()
+    outputs: Tuple[Path, ...] = ()
+    volatile: bool = False  # reads something that cannot be hashed (the live network): always runs
+
+
+@dataclass
+class StepResult:
+    name: str
+    status: str
+    rc: int = 0
+    start: float = 0.0
+    end: float = 0.0
+    output: str = ""
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class _Pending:
+    step: Step
+    key: str = ""
+    start: float = 0.0
+
+
+def topo_order(steps: Sequence[Step]) -> List[Step]:
+    """Steps with every dependency before its dependents; ValueError on unknown deps or cycles."""
+    by_name = {s.name: s for s in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("duplicate step names")
+    order: List[Step] = []
+    state: Dict[str, int] = {}  # 1 visiting, 2 done
+
+    def visit(name: str, chain: Tuple[str, ...]) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"dependency cycle: {' -> '.join(chain + (name,))}")
+        if name not in by_name:
+            raise ValueError(f"{chain[-1] if chain else '?'} depends on unknown step {name}")
+        state[name] = 1
+        for dep in by_name[name].deps:
+            visit(dep, chain + (name,))
+        state[name] = 2
+        order.append(by_name[name])
+
+    for s in steps:
+        visit(s.name, ())
+    return order
+
+
+def _digest(path: Path, cache: HashCache) -> str:
+    return cache.sha256(path) if path.is_file() else "missing"
+
+
+def step_key(step: Step, cache: HashCache, salt: str = "") -> str:
+    """Hash of the command, the declared inputs' contents and salt (e.g. a code fingerprint)."""
+    h = hashlib.sha256(json.dumps([salt, step.cmd]).encode("utf-8"))
+    for p in step.inputs:
+        h.update(f"\n{p}|{_digest(p, cache)}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class RunCache:
+    """step name -> {key, outputs: {path: sha256}} of its last successful run, kept as JSON."""
+
+    def __init__(self, path: Optional[Path]) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                self.entries = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def fresh(self, step: Step, key: str, cache: HashCache) -> bool:
+        entry = self.entries.get(step.name)
+        if not entry or entry.get("key") != key:
+            return False
+        recorded = entry.get("outputs") or {}
+        # outputs deleted or edited since then mean the step has to run again
+        return all(recorded.get(str(p)) == _digest(p, cache) for p in step.outputs)
+
+    def record(self, step: Step, key: str, cache: HashCache) -> None:
+        self.entries[step.name] = {"key": key, "outputs": {str(p): _digest(p, cache) for p in step.outputs}}
+
+    def forget(self, name: str) -> None:
+        self.entries.pop(name, None)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.entries, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def run_command(cmd: List[str]) -> Tuple[int, str]:
+    """Run one step, capturing its output so parallel steps do not interleave."""
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace")
+    return proc.returncode, proc.stdout
+
+
+def run_dag(
+    steps: Sequence[Step],
+    cache_path: Optional[Path] = None,
+    jobs: int = 2,
+    force: bool = False,
+    salt: str = "",
+    runner: Callable[[List[str]], Tuple[int, str]] = run_command,
+    log: Callable[[str], None] = print,
+) -> Dict[str, StepResult]:
+    """
+    Run steps as soon as their dependencies have succeeded, up to jobs at a
+    time. A non-volatile step whose key and outputs match its last good run
+    is skipped (unless force). Dependents of a failed step are not started.
+    """
+    order = topo_order(steps)
+    hashes = HashCache.default()
+    run_cache = RunCache(cache_path)
+    results: Dict[str, StepResult] = {}
+    pending: Dict[str, _Pending] = {s.name: _Pending(s) for s in order}
+    running: Dict[Future, _Pending] = {}
+    t0 = time.perf_counter()
+
+    def now() -> float:
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for name in [s.name for s in order if s.name in pending]:
+                    step = pending[name].step
+                    dep_status = [results[d].status if d in results else None for d in step.deps]
+                    if any(st in ("failed", "blocked") for st in dep_status):
+                        results[name] = StepResult(name, "blocked", start=(t := now()), end=t)
+                        del pending[name]
+                        progressed = True
+                        log(f"[WARN] {name}: skipped, a dependency failed")
+                        continue
+                    if None in dep_status:
+                        continue
+                    item = pending.pop(name)
+                    progressed = True
+                    item.key = step_key(step, hashes, salt)
+                    if not force and not step.volatile and run_cache.fresh(step, item.key, hashes):
+                        results[name] = StepResult(name, "cached", start=(t := now()), end=t)
+                        log(f"[INFO] {name}: unchanged inputs, skipped")
+                        continue
+                    log(f"[INFO] {name}: started")
+                    item.start = now()
+                    running[pool.submit(runner, step.cmd)] = item
+            if not running:
+                break
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                item = running.pop(fut)
+                step = item.step
+                try:
+                    rc, output = fut.result()
+                except OSError as e:
+                    rc, output = 127, str(e)
+                res = StepResult(step.name, "ran" if rc == 0 else "failed", rc, item.start, now(), output)
+                results[step.name] = res
+                log(f"\n==== {step.name} ({res.status}, {res.seconds:.1f}s) ====")
+                log("CMD: " + " ".join(step.cmd))
+                if output.strip():
+                    log(output.rstrip())
+                if rc == 0:
+                    run_cache.record(step, item.key, hashes)
+                else:
+                    run_cache.forget(step.name)
+    run_cache.save()
+    hashes.save()
+    return results
+
+
+def critical_path(steps: Sequence[Step], results: Dict[str, StepResult]) -> Tuple[List[str], float]:
+    """The dependency chain with the largest total step time, and that time."""
+    best: Dict[str, Tuple[float, List[str]]] = {}
+    for step in topo_order(steps):
+        res = results.get(step.name)
+        own = res.seconds if res is not None else 0.0
+        prior = max((best[d] for d in step.deps), key=lambda b: b[0], default=(0.0, []))
+        best[step.name] = (prior[0] + own, prior[1] + [step.name])
+    total, path = max(best.values(), key=lambda b: b[0], default=(0.0, []))
+    return (path, total) if total > 0 else ([], 0.0)
+
+
+def timing_report(steps: Sequence[Step], results: Dict[str, StepResult], wall: float) -> List[str]:
+    path, total = critical_path(steps, results)
+    lines = [f"{'step':<18} {'status':<8} {'start s':>8} {'secs':>7}"]
+    for step in topo_order(steps):
+        res = results.get(step.name)
+        if res is None:
+            continue
+        mark = " *" if step.name in path else ""
+        lines.append(f"{step.name:<18} {res.status:<8} {res.start:>8.1f} {res.seconds:>7.1f}{mark}")
+    busy = sum(r.seconds for r in results.values())
+    lines.append(f"critical path (*): {' -> '.join(path) or '-'} = {total:.1f}s; wall {wall:.1f}s; step time {busy:.1f}s")
+    return lines
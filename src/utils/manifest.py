@@ -7,63 +7,95 @@ import sys
 from collections import Counter
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, List, Mapping, Optional
 
-
-def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+from src.utils.artifact_io import HashCache, hash_files, sha256_file  # noqa: F401  (sha256_file re-exported)
 
 
 def sha256_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
-def _tier_counts(assets: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+def _tier_counts(tiers: Mapping[Any, int]) -> Dict[str, int]:
     c = Counter()
-    for a in assets:
-        for p in a.get("points", []):
-            c[str(p.get("tier", ""))] += 1
+    for tier, n in tiers.items():
+        c[str(tier)] += n
     return {k: int(c[k]) for k in sorted(c.keys(), key=lambda x: (x == "", x))}
 
 
+def manifest_path_for(out_yaml_path: Path) -> Path:
+    out_yaml_path = out_yaml_path.resolve()
+    return out_yaml_path.with_suffix(out_yaml_path.suffix + ".manifest.json")
+
+
+def read_manifest(out_yaml_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load the manifest written next to a generated YAML, or None if it is missing/unreadable.
+    """
+    path = manifest_path_for(out_yaml_path)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
 def write_manifest(
     *,
     out_yaml_path: Path,
-    out_yaml_text: str,
+    out_yaml_sha256: str,
     base_path: Path,
     csv_path: Path,
     schema_path: Path,
-    assets: list[dict[str, Any]],
+    asset_count: int,
+    tier_counts: Mapping[Any, int],
+    options: Optional[Dict[str, Any]] = None,
+    assets: Optional[List[Dict[str, Any]]] = None,
+    changes: Optional[Dict[str, Any]] = None,
 ) -> Path:
+    """
+    tier_counts maps tier -> number of points; the points total is derived from it.
+    options/assets/changes are recorded as-is when given (per-asset row hashes
+    and output offsets used for incremental regeneration).
+    """
     out_yaml_path = out_yaml_path.resolve()
-    manifest_path = out_yaml_path.with_suffix(out_yaml_path.suffix + ".manifest.json")
+    manifest_path = manifest_path_for(out_yaml_path)
+
+    points_count = sum(tier_counts.values())
+    tiers = _tier_counts(tier_counts)
 
-    points_count = sum(len(a.get("points", [])) for a in assets)
-    tiers = _tier_counts(assets)
+    # unchanged inputs (same size + mtime as last time) are not read again
+    inputs = [base_path.resolve(), csv_path.resolve(), schema_path.resolve()]
+    cache = HashCache.default()
+    digests = hash_files(inputs, cache=cache)
+    cache.save()
+    base_sha, csv_sha, schema_sha = (digests[p] for p in inputs)
 
     manifest = {
         "generated_at_utc": datetime.now(timezone.utc).isoformat(),
         "python": sys.version,
         "inputs": {
-            "base_config": {"path": str(base_path.resolve()), "sha256": sha256_file(base_path.resolve())},
-            "points_csv": {"path": str(csv_path.resolve()), "sha256": sha256_file(csv_path.resolve())},
-            "schema": {"path": str(schema_path.resolve()), "sha256": sha256_file(schema_path.resolve())},
+            "base_config": {"path": str(inputs[0]), "sha256": base_sha},
+            "points_csv": {"path": str(inputs[1]), "sha256": csv_sha},
+            "schema": {"path": str(inputs[2]), "sha256": schema_sha},
         },
         "output": {
             "yaml_path": str(out_yaml_path),
-            "yaml_sha256": sha256_text(out_yaml_text),
+            "yaml_sha256": out_yaml_sha256,
             "manifest_path": str(manifest_path),
         },
         "counts": {
-            "assets": int(len(assets)),
+            "assets": int(asset_count),
             "points": int(points_count),
             "tiers": tiers,
         },
     }
+    if options is not None:
+        manifest["options"] = options
+    if changes is not None:
+        manifest["changes"] = changes
+    if assets is not None:
+        manifest["assets"] = assets
 
     manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
     return manifest_path
@@ -5,6 +5,7 @@ import os
 import shutil
 import time
 from pathlib import Path
+from typing import Iterable
 
 
 def atomic_write_text(final_path: Path, content: str, encoding: str = "utf-8") -> Path:
@@ -15,6 +16,15 @@ def atomic_write_text(final_path: Path, content: str, encoding: str = "utf-8") -
       3) backup existing final file (.bak) best-effort
       4) atomic replace (os.replace)
     """
+    return atomic_write_chunks(final_path, [content], encoding=encoding)
+
+
+def atomic_write_chunks(final_path: Path, chunks: Iterable[str], encoding: str = "utf-8") -> Path:
+    """
+    Same two-phase commit as atomic_write_text, but the content is streamed
+    from `chunks` so large outputs never have to exist as one string.
+    If the iterable raises, the temp file is removed and the final file is untouched.
+    """
     final_path = final_path.resolve()
     final_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -22,10 +32,18 @@ def atomic_write_text(final_path: Path, content: str, encoding: str = "utf-8") -
     bak_path = final_path.with_suffix(final_path.suffix + ".bak")
 
     # 1) Write temp
-    with open(tmp_path, "w", encoding=encoding, newline="\n") as f:
-        f.write(content)
-        f.flush()
-        os.fsync(f.fileno())
+    try:
+        with open(tmp_path, "w", encoding=encoding, newline="\n") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
 
     # 2) Backup existing final (best-effort)
     if final_path.exists():
@@ -43,4 +61,4 @@ def atomic_write_text(final_path: Path, content: str, encoding: str = "utf-8") -
     except Exception:
         pass
 
-    return final_path
\ No newline at end of file
+    return final_path
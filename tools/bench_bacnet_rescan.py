@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.bacnet_scanner.enumerate_points import plan_probes  # noqa: E402
+from src.bacnet_scanner.inventory import merge_inventory  # noqa: E402
+from src.bacnet_scanner.objects import DeviceResult, EnumerationOptions, enumerate_devices  # noqa: E402
+from src.bacnet_scanner.simulator import SimulatedNetwork, build_device, build_site  # noqa: E402
+
+DAY = 86400.0
+
+
+def night(site: SimulatedNetwork, rng: random.Random, churn: int, offline: int) -> List[dict]:
+    """
+    One night on site: `churn` devices replaced or re-addressed, `offline`
+    devices powered down for the scan. Returns what discovery would find.
+    """
+    devices = list(site.devices.values())
+    for dev in rng.sample(devices, min(churn, len(devices))):
+        del site.devices[dev.address]
+        if rng.random() < 0.5:
+            dev.address = f"10.9.{dev.instance % 250}.{rng.randrange(1, 250)}"  # moved
+            site.devices[dev.address] = dev
+        else:
+            new = build_device(dev.instance + 500000, f"10.8.0.{rng.randrange(1, 250)}", 120)  # swapped out
+            site.devices[new.address] = new
+    silent = {d.address for d in rng.sample(list(site.devices.values()), offline)}
+    return [d.record() for d in site.devices.values() if d.address not in silent]
+
+
+async def rescan(
+    site: SimulatedNetwork,
+    found: List[dict],
+    inventory: List[dict],
+    probed: Dict[int, DeviceResult],
+    now: float,
+    incremental: bool,
+    ttl_hours: float,
+):
+    options = EnumerationOptions()
+    before = site.requests
+    devices, changes = merge_inventory(inventory if incremental else [], found, now, 72 * 3600.0)
+    if incremental:
+        todo, kept, _ = plan_probes(devices, probed, now, ttl_hours * 3600.0)
+    else:
+        todo, kept = devices, []
+    results, _ = await enumerate_devices(site.read, site.read_multiple, todo, options)
+    merged = {r.instance: r for r in kept + results}
+    return devices, changes, merged, site.requests - before, len(todo)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Nightly BACnet rescans: full re-enumeration vs incremental.")
+    ap.add_argument("--devices", type=int, default=40)
+    ap.add_argument("--nights", type=int, default=7)
+    ap.add_argument("--churn", type=int, default=2, help="Devices moved or replaced per night.")
+    ap.add_argument("--offline", type=int, default=1, help="Devices powered down during each scan.")
+    ap.add_argument("--probe-ttl-hours", type=float, default=168.0)
+    args = ap.parse_args()
+
+    totals = {}
+    start = time.time()
+    for incremental in (False, True):
+        rng = random.Random(7)
+        site = build_site(args.devices, 120, routed_share=0.2)
+        inventory: List[dict] = []
+        probed: Dict[int, DeviceResult] = {}
+        requests = 0
+        print(f"{'full' if not incremental else 'incremental'}:")
+        for n in range(args.nights + 1):
+            found = night(site, rng, args.churn if n else 0, args.offline if n else 0)
+            inventory, changes, probed, used, probes = asyncio.run(
+                rescan(site, found, inventory, probed, start + n * DAY, incremental, args.probe_ttl_hours)
+            )
+            if n:
+                requests += used
+                kinds = {k: sum(1 for c in changes if c["change"] == k) for k in ("added", "moved", "removed")}
+                log = kinds if incremental else "-"
+                print(f"  night {n}: probed {probes:>3} devices, {used:>5} requests, changes {log}")
+        totals[incremental] = requests
+
+    saved = 1 - totals[True] / max(1, totals[False])
+    print(
+        f"[INFO] requests over {args.nights} nights: full {totals[False]}, "
+        f"incremental {totals[True]} ({saved:.0%} less)"
+    )
+    ok = totals[True] < totals[False]
+    print("[OK] incremental rescans send less traffic" if ok else "[WARN] no saving")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
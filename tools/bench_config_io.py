@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.utils.config_io import YAML_BACKEND  # noqa: E402
+
+DATA_TYPES = ["float", "int", "bool", "string", "enum"]
+
+
+def synthetic_config(base: Dict[str, Any], points: int, points_per_asset: int) -> Dict[str, Any]:
+    assets: List[Dict[str, Any]] = []
+    for a in range(0, points, points_per_asset):
+        pts = []
+        for i in range(a, min(points, a + points_per_asset)):
+            dtype = DATA_TYPES[i % len(DATA_TYPES)]
+            p: Dict[str, Any] = {
+                "point_id": f"AHU_{a:05d}-PT{i:07d}",
+                "name": f"Point {i}",
+                "data_type": dtype,
+                "tier": 1 + (i % 3),
+                "source_ref": f"metasys02:SNE-{a % 64:02d}/IP.AHU{a:05d}.PT{i:07d}",
+            }
+            if dtype in ("float", "int"):
+                p["deadband"] = 0.5
+            pts.append(p)
+        assets.append({"asset_id": f"AHU_{a:05d}", "name": f"Air Handler {a}", "points": pts})
+
+    cfg = dict(base)
+    cfg["metasys"] = dict(cfg.get("metasys") or {})
+    cfg["metasys"]["assets"] = assets
+    return cfg
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark config load/dump for each YAML/JSON variant.")
+    ap.add_argument("--base", default=str(ROOT / "config" / "connector_pilot_central_plant.yml"))
+    ap.add_argument("--points", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--points-per-asset", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    base = yaml.safe_load(Path(args.base).read_text(encoding="utf-8-sig")) or {}
+
+    loaders: Dict[str, Callable[[str], Any]] = {
+        "yaml SafeLoader": lambda t: yaml.load(t, Loader=yaml.SafeLoader),
+    }
+    dumpers: Dict[str, Callable[[Any], str]] = {
+        "yaml SafeDumper": lambda d: yaml.dump(d, Dumper=yaml.SafeDumper, sort_keys=False, allow_unicode=True),
+    }
+    if getattr(yaml, "__with_libyaml__", False):
+        loaders["yaml CSafeLoader"] = lambda t: yaml.load(t, Loader=yaml.CSafeLoader)
+        dumpers["yaml CSafeDumper"] = lambda d: yaml.dump(
+            d, Dumper=yaml.CSafeDumper, sort_keys=False, allow_unicode=True
+        )
+    else:
+        print("[WARN] PyYAML built without libyaml; C variants skipped.")
+
+    print(f"[INFO] config_io backend: {YAML_BACKEND}")
+    print(f"{'points':>8}  {'variant':<18} {'op':<5} {'bytes':>12} {'seconds':>9}")
+
+    for n in args.points:
+        cfg = synthetic_config(base, n, max(1, args.points_per_asset))
+        yaml_text = yaml.dump(cfg, Dumper=yaml.SafeDumper, sort_keys=False, allow_unicode=True)
+        json_text = json.dumps({"source": {}, "config": cfg}, separators=(",", ":"))
+
+        for name, dump in dumpers.items():
+            secs = best_of(args.repeat, lambda: dump(cfg))
+            print(f"{n:>8}  {name:<18} {'dump':<5} {len(yaml_text):>12} {secs:>9.3f}")
+        secs = best_of(args.repeat, lambda: json.dumps({"config": cfg}, separators=(",", ":")))
+        print(f"{n:>8}  {'json sidecar':<18} {'dump':<5} {len(json_text):>12} {secs:>9.3f}")
+
+        for name, load in loaders.items():
+            secs = best_of(args.repeat, lambda: load(yaml_text))
+            print(f"{n:>8}  {name:<18} {'load':<5} {len(yaml_text):>12} {secs:>9.3f}")
+        secs = best_of(args.repeat, lambda: json.loads(json_text))
+        print(f"{n:>8}  {'json sidecar':<18} {'load':<5} {len(json_text):>12} {secs:>9.3f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
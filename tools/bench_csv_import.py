@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+import src.local_api.server as server  # noqa: E402
+from tools.bench_import_points import write_synthetic_csv  # noqa: E402
+
+
+async def file_chunks(path: Path, size: int) -> AsyncIterator[bytes]:
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def upload(path: Path, gzipped: bool, chunk_size: int, query: str) -> List[Dict[str, Any]]:
+    transport = httpx.ASGITransport(app=server.app)
+    headers = {"Content-Type": "text/csv"}
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    async with httpx.AsyncClient(transport=transport, base_url="http://local", timeout=None) as client:
+        r = await client.post(
+            f"/api/v1/projects/p000/connector/import-csv{query}",
+            content=file_chunks(path, chunk_size),
+            headers=headers,
+        )
+        r.raise_for_status()
+        return [json.loads(line) for line in r.text.splitlines() if line]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Stream a synthetic points CSV into the local API import endpoint.")
+    ap.add_argument("--rows", type=int, default=150_000)
+    ap.add_argument("--points-per-asset", type=int, default=40)
+    ap.add_argument("--bad-rows", type=int, default=0, help="Append this many invalid rows.")
+    ap.add_argument("--gzip", action="store_true", help="Upload gzip-compressed.")
+    ap.add_argument("--chunk-kb", type=int, default=64)
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_csv_import_") as tmp:
+        csv_path = Path(tmp) / "points.csv"
+        write_synthetic_csv(csv_path, args.rows, args.points_per_asset)
+        if args.bad_rows:
+            with csv_path.open("a", encoding="utf-8") as f:
+                for i in range(args.bad_rows):
+                    f.write(f"BAD_{i},Bad,BAD_{i}-PT,Bad point,decimal,7,,,\n")
+        upload_path = csv_path
+        if args.gzip:
+            upload_path = csv_path.with_suffix(".csv.gz")
+            with csv_path.open("rb") as src, gzip.open(upload_path, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+
+        server.DATA_DIR = Path(tmp) / "projects"
+        server._PROJECTS = server.ProjectIndex(server.DATA_DIR)
+
+        query = "?dry_run=true" if args.dry_run else ""
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        events = asyncio.run(upload(upload_path, args.gzip, args.chunk_kb * 1024, query))
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size = upload_path.stat().st_size
+        csv_size = csv_path.stat().st_size
+
+    kinds: Dict[str, int] = {}
+    for e in events:
+        kinds[e["event"]] = kinds.get(e["event"], 0) + 1
+    done = events[-1]
+    print(
+        f"[INFO] {args.rows + args.bad_rows:,} rows, {csv_size / 1e6:.1f} MB CSV "
+        f"({size / 1e6:.1f} MB uploaded{', gzip' if args.gzip else ''}) in {elapsed:.2f}s "
+        f"({(args.rows + args.bad_rows) / elapsed:,.0f} rows/s), peak traced memory {peak / 1e6:.1f} MB"
+    )
+    print(f"[INFO] events: {kinds}")
+    for e in events:
+        if e["event"] == "error":
+            print(f"  row {e['row']}: {e['detail']}")
+            break
+    print(f"[INFO] done: {done}")
+    return 0 if done["ok"] or args.bad_rows else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
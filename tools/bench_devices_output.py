@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.bacnet_scanner.devices_io import is_ndjson, iter_devices, write_devices  # noqa: E402
+from src.bacnet_scanner.validate_output import validate_devices_file  # noqa: E402
+
+SCHEMA = ROOT / "schemas" / "bacnet_devices_output.schema.json"
+
+
+def synthetic_devices(count: int, objects: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "device_instance": 100000 + n,
+            "address": f"10.{n // 62500}.{n // 250 % 250}.{n % 250 + 1}",
+            "vendor_name": "Simulated",
+            "model_name": "SIM-1",
+            "max_apdu": 1476,
+            "segmentation": "segmentedBoth",
+            "object_list": [f"analog-input,{i}" for i in range(1, objects + 1)],
+        }
+        for n in range(count)
+    ]
+
+
+def measured(fn: Callable[[], Any]) -> Tuple[Any, float, float]:
+    """Result, seconds, peak traced MB (timed and traced in separate runs; tracing slows Python down)."""
+    t0 = time.perf_counter()
+    result = fn()
+    secs = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, secs, peak / 1e6
+
+
+def compact_layout_ok(tmp: Path, meta: Dict[str, Any]) -> bool:
+    """A one-line {"meta", "devices"} document is the json layout: its devices are read and validated."""
+    path = tmp / "compact.json"
+    bad = dict(synthetic_devices(1, 1)[0], device_instance="not-a-number")
+    path.write_text(json.dumps({"meta": meta, "devices": [bad]}), encoding="utf-8")
+    _, count, errors = validate_devices_file(path, SCHEMA)
+    return not is_ndjson(path) and count == 1 and bool(errors) and sum(1 for _ in iter_devices(path)) == 1
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="devices.json vs devices.ndjson: write, validate, read back.")
+    ap.add_argument("--devices", type=int, default=20000)
+    ap.add_argument("--objects", type=int, default=100, help="object_list entries per device.")
+    args = ap.parse_args()
+
+    devices = synthetic_devices(args.devices, args.objects)
+    meta = {
+        "scan_run_id": "bench",
+        "timestamp": "2026-01-01T00:00:00+0000",
+        "status": "ok",
+        "segment_name": "bench",
+        "offline_mode": True,
+        "device_records": len(devices),
+    }
+    print(f"{'layout':<7} {'MB':>6} {'write s':>8} {'validate s':>11} {'peak MB':>8} {'read s':>7} {'peak MB':>8}")
+    ok = True
+    with tempfile.TemporaryDirectory(prefix="bench_devices_") as tmp:
+        for layout, ndjson in (("json", False), ("ndjson", True)):
+            path = Path(tmp) / f"devices.{layout}"
+            _, write_s, _ = measured(lambda: write_devices(path, meta, devices, ndjson))
+            (_, count, errors), val_s, val_mb = measured(lambda: validate_devices_file(path, SCHEMA))
+            n, read_s, read_mb = measured(lambda: sum(1 for _ in iter_devices(path)))
+            ok = ok and not errors and count == n == len(devices)
+            print(
+                f"{layout:<7} {path.stat().st_size / 1e6:>6.1f} {write_s:>8.2f} {val_s:>11.2f} {val_mb:>8.1f} "
+                f"{read_s:>7.2f} {read_mb:>8.1f}"
+            )
+        compact_ok = compact_layout_ok(Path(tmp), meta)
+    print("[OK] both layouts valid and complete" if ok else "[WARN] validation errors or missing devices")
+    print("[OK] compact one-line json read as json" if compact_ok else "[WARN] compact one-line json misdetected")
+    ok = ok and compact_ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
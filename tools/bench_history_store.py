@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.history_store import HistoryStore, query_history  # noqa: E402
+from tools.bench_live_stream import synthetic_registry  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Fill the local history store and time range queries.")
+    ap.add_argument("--points", type=int, default=4)
+    ap.add_argument("--days", type=float, default=31.0)
+    ap.add_argument("--interval", type=float, default=5.0, help="Seconds between samples (tier-1).")
+    ap.add_argument("--buckets", type=int, default=300)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--db", default="", help="Keep the database here instead of a temp dir.")
+    args = ap.parse_args()
+
+    tmp = None
+    if args.db:
+        db = Path(args.db)
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="bench_history_")
+        db = Path(tmp.name) / "history.sqlite"
+
+    registry = synthetic_registry(args.points, 1)
+    store = HistoryStore(db, registry, retention_days=args.days + 1, max_bytes=1 << 40, flush_seconds=0.2)
+
+    now = time.time()
+    start = now - args.days * 86400.0
+    samples = int(args.days * 86400.0 / args.interval)
+
+    # publish-path cost: append() only
+    append_ns: List[int] = []
+    t0 = time.perf_counter()
+    for i in range(samples):
+        ts = start + i * args.interval
+        for pid in range(args.points):
+            a = time.perf_counter_ns()
+            store.append(pid, 20.0 + 5.0 * math.sin(ts / 3600.0 + pid), ts)
+            append_ns.append(time.perf_counter_ns() - a)
+        if i % 10_000 == 0:
+            # pace like a real poller so the writer keeps up instead of dropping
+            while len(store._pending) > 100_000:
+                time.sleep(0.01)
+    store.close(timeout=600)
+    fill_secs = time.perf_counter() - t0
+    total = samples * args.points
+
+    append_ns.sort()
+    print(
+        f"[INFO] {total:,} samples ({args.points} points x {args.days:g} days @ {args.interval:g}s) "
+        f"in {fill_secs:.1f}s, written={store.written:,} dropped={store.dropped:,}, "
+        f"db={db.stat().st_size / 1e6:.1f} MB"
+    )
+    print(
+        f"append() ns: p50={append_ns[len(append_ns) // 2]} p99={append_ns[int(len(append_ns) * 0.99)]} "
+        f"max={append_ns[-1]}"
+    )
+
+    print(f"{'range':<8} {'source':<10} {'buckets':>8} {'best ms':>9}")
+    for label, span in (("1h", 3600.0), ("24h", 86400.0), ("7d", 7 * 86400.0), ("30d", 30 * 86400.0)):
+        best = float("inf")
+        res = {}
+        for _ in range(args.repeat):
+            q0 = time.perf_counter()
+            res = query_history(db, registry.asset_id[0], registry.point_id[0], now - span, now, args.buckets)
+            best = min(best, time.perf_counter() - q0)
+        print(f"{label:<8} {res['source']:<10} {len(res['points']):>8} {best * 1000:>9.1f}")
+
+    if tmp is not None:
+        tmp.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
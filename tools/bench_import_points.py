@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+HEADER = [
+    "asset_id",
+    "asset_name",
+    "point_id",
+    "point_name",
+    "data_type",
+    "tier",
+    "deadband",
+    "min_publish_seconds",
+    "source_ref",
+]
+
+DATA_TYPES = ["float", "int", "bool", "string", "enum"]
+
+
+def write_synthetic_csv(path: Path, rows: int, points_per_asset: int) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        for i in range(rows):
+            a = i // points_per_asset
+            dtype = DATA_TYPES[i % len(DATA_TYPES)]
+            analog = dtype in ("float", "int")
+            w.writerow(
+                [
+                    f"AHU_{a:05d}",
+                    f"Air Handler {a}",
+                    f"AHU_{a:05d}-PT{i:07d}",
+                    f"Point {i}",
+                    dtype,
+                    1 + (i % 3),
+                    "0.5" if analog else "",
+                    "10" if i % 4 == 0 else "",
+                    f"metasys02:SNE-{a % 64:02d}/IP.AHU{a:05d}.PT{i:07d}",
+                ]
+            )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Time src.import_points_csv on a synthetic points CSV.")
+    ap.add_argument("--root", default=".", help="Repo root (must contain src/, config/, schemas/).")
+    ap.add_argument("--rows", type=int, default=500_000, help="Number of CSV rows to generate.")
+    ap.add_argument("--points-per-asset", type=int, default=40)
+    ap.add_argument("--base", default="config/connector_pilot_central_plant.yml")
+    ap.add_argument("--jobs", type=int, default=1, help="Forwarded to the import (0 = one per CPU).")
+    ap.add_argument("--keep", action="store_true", help="Keep the generated CSV and YAML.")
+    args = ap.parse_args()
+
+    root = Path(args.root).resolve()
+    base = Path(args.base) if Path(args.base).is_absolute() else root / args.base
+    env = dict(os.environ, PYTHONPATH=str(root))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # the import only writes under <cwd>/config/generated, so run it from
+        # the temp dir; its output (and hash cache) never lands in the repo
+        work = Path(tmp)
+        gen_dir = work / "config" / "generated"
+        out_yaml = gen_dir / "bench_import.yml"
+        csv_path = work / "points_bench.csv"
+        write_synthetic_csv(csv_path, args.rows, max(1, args.points_per_asset))
+        print(f"[BENCH] rows={args.rows} csv_bytes={csv_path.stat().st_size}")
+
+        cmd = [
+            sys.executable,
+            "-m",
+            "src.import_points_csv",
+            "--base",
+            str(base),
+            "--csv",
+            str(csv_path),
+            "--out",
+            str(out_yaml),
+            "--schema",
+            str(root / "schemas" / "metasys_connector_config.schema.json"),
+            "--jobs",
+            str(args.jobs),
+            "--full",
+            "--stats",
+        ]
+        rc = subprocess.call(cmd, cwd=work, env=env)
+
+        if rc == 0:
+            print(f"[BENCH] yaml_bytes={out_yaml.stat().st_size}")
+        if args.keep:
+            kept = root / "config" / "generated" / "_bench"
+            shutil.copytree(gen_dir, kept, dirs_exist_ok=True)
+            shutil.copy2(csv_path, kept / csv_path.name)
+            print(f"[BENCH] kept CSV and YAML in: {kept}")
+
+    return rc
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
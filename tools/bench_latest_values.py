@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.latest_values import LatestValues, LatestValuesReader  # noqa: E402
+
+
+def writer(path: str, points: int, seconds: float, ready, counter) -> None:
+    table = LatestValues(Path(path), [(f"AHU_{i // 50:04d}", f"PT{i:06d}") for i in range(points)])
+    ready.set()
+    n = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for pid in range(points):
+            x = float(n)
+            # value == ts in every consistent record, so a torn read is detectable
+            table.update(pid, x, x, "good", x if n % 10 == 0 else None)
+            n += 1
+    counter.value = n
+    table.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Seqlock table: writer process vs reader process.")
+    ap.add_argument("--points", type=int, default=10_000)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_latest_") as tmp:
+        path = str(Path(tmp) / "latest_values.bin")
+        ready = mp.Event()
+        counter = mp.Value("q", 0)
+        proc = mp.Process(target=writer, args=(path, args.points, args.seconds, ready, counter))
+        proc.start()
+        ready.wait(30)
+
+        reader = LatestValuesReader(Path(path))
+        reads = torn = 0
+        best = float("inf")
+        worst = 0.0
+        deadline = time.monotonic() + args.seconds * 0.9
+        while time.monotonic() < deadline:
+            t0 = time.perf_counter()
+            snap = reader.read()
+            dt = time.perf_counter() - t0
+            if snap is None:
+                continue
+            best, worst = min(best, dt), max(worst, dt)
+            reads += 1
+            torn += sum(1 for v in snap["values"] if v["ts"] is not None and v["value"] != v["ts"])
+        one = reader.read(["AHU_0001"], [])
+        proc.join()
+
+    print(f"[INFO] writer: {counter.value:,} updates in {args.seconds:g}s ({counter.value / args.seconds:,.0f}/s)")
+    print(
+        f"[INFO] reader: {reads} full snapshots of {args.points:,} points, "
+        f"best {best * 1000:.1f} ms, worst {worst * 1000:.1f} ms, torn records: {torn}"
+    )
+    print(f"[INFO] filtered read (one asset): {one['count'] if one else 0} points")
+    return 0 if torn == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.live_stream import LiveStream, start_live_stream_server  # noqa: E402
+from src.planner import PlannedPoint  # noqa: E402
+from src.point_registry import PointRegistry  # noqa: E402
+
+
+def synthetic_registry(points: int, points_per_asset: int) -> PointRegistry:
+    plan = [
+        PlannedPoint(
+            asset_id=f"AHU_{i // points_per_asset:04d}",
+            asset_name="",
+            point_id=f"PT{i:06d}",
+            point_name="",
+            data_type="float",
+            tier=1,
+            poll_seconds=5,
+            min_publish_seconds=0,
+            deadband=0.0,
+            source_ref=f"ref{i}",
+        )
+        for i in range(points)
+    ]
+    return PointRegistry(plan)
+
+
+def slow_subscriber(port: int, path: str, stop: threading.Event) -> None:
+    # small receive buffer set before connect, then read ~128KB/s: slower than the stream
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", port))
+    sock.sendall(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    try:
+        while not stop.is_set() and sock.recv(65536):
+            time.sleep(0.5)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+def subscriber(port: int, path: str, stats: Dict[str, int], stop: threading.Event, slow: bool) -> None:
+    if slow:
+        slow_subscriber(port, path, stop)
+        return
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("GET", path)
+    resp = conn.getresponse()
+    try:
+        while not stop.is_set():
+            line = resp.fp.readline()
+            if not line:
+                break
+            if line.startswith(b"event: value"):
+                stats["events"] += 1
+            elif line.startswith(b"data: {\"missed\""):
+                stats["missed"] += int(line.split(b":")[-1].strip(b"}\n"))
+    except OSError:
+        pass
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Fan out published values to many SSE subscribers.")
+    ap.add_argument("--port", type=int, default=18083)
+    ap.add_argument("--points", type=int, default=5000)
+    ap.add_argument("--points-per-asset", type=int, default=50)
+    ap.add_argument("--subscribers", type=int, default=300)
+    ap.add_argument("--filtered", type=int, default=100, help="How many subscribers filter to one asset.")
+    ap.add_argument("--slow", type=int, default=5, help="Subscribers reading slower than the stream (should drop, not stall).")
+    ap.add_argument("--rate", type=int, default=1000, help="Published events per second (tier-1 deltas).")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--buffer", type=int, default=10_000)
+    args = ap.parse_args()
+
+    registry = synthetic_registry(args.points, args.points_per_asset)
+    hub = LiveStream(registry, capacity=args.buffer)
+    server = start_live_stream_server(args.port, hub)
+
+    stop = threading.Event()
+    clients: List[Dict[str, int]] = []
+    threads = []
+    for i in range(args.subscribers + args.slow):
+        slow = i >= args.subscribers
+        path = f"/live?asset_id=AHU_{i % 10:04d}" if i < args.filtered else "/live"
+        stats = {"events": 0, "missed": 0, "filtered": int(i < args.filtered), "slow": int(slow)}
+        clients.append(stats)
+        t = threading.Thread(target=subscriber, args=(args.port, path, stats, stop, slow), daemon=True)
+        t.start()
+        threads.append(t)
+
+    deadline = time.monotonic() + 10
+    while hub.subscribers < len(clients) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    print(f"[INFO] {hub.subscribers} subscribers connected ({args.filtered} filtered, {args.slow} slow)")
+
+    # Publisher: fixed rate, record how long each publish() call takes.
+    publish_us: List[float] = []
+    n = len(registry)
+    interval = 1.0 / args.rate
+    start = time.perf_counter()
+    sent = 0
+    while time.perf_counter() - start < args.seconds:
+        t0 = time.perf_counter()
+        hub.publish(sent % n, float(sent), time.time(), "good")
+        publish_us.append((time.perf_counter() - t0) * 1e6)
+        sent += 1
+        wait = start + sent * interval - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+    elapsed = time.perf_counter() - start
+
+    time.sleep(1.0)  # let subscribers drain the tail
+    stop.set()
+    server.shutdown()
+
+    publish_us.sort()
+    full = [c for c in clients if not c["filtered"] and not c["slow"]]
+    filt = [c for c in clients if c["filtered"]]
+    print(f"[INFO] published {sent} events in {elapsed:.1f}s ({sent / elapsed:,.0f}/s)")
+    print(
+        f"publish() us: p50={publish_us[len(publish_us) // 2]:.1f} "
+        f"p99={publish_us[int(len(publish_us) * 0.99)]:.1f} max={publish_us[-1]:.1f}"
+    )
+    if full:
+        got = sorted(c["events"] for c in full)
+        print(f"unfiltered subscribers: min={got[0]} median={got[len(got) // 2]} of {sent} events")
+    if filt:
+        got = sorted(c["events"] for c in filt)
+        print(f"filtered subscribers:   min={got[0]} median={got[len(got) // 2]} (one asset of {n // args.points_per_asset})")
+    st = hub.stats()
+    print(f"ring dropped_total={st['dropped_total']} backlogged={st['backlogged']} (slow clients skipping ahead)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import src.local_api.server as server  # noqa: E402
+
+
+def synthetic_config(assets: int, points_per_asset: int) -> Dict[str, Any]:
+    return {
+        "metasys": {
+            "assets": [
+                {
+                    "asset_id": f"AHU_{a:04d}",
+                    "name": f"Air Handler {a}",
+                    "points": [
+                        {
+                            "point_id": f"AHU_{a:04d}-PT{i:03d}",
+                            "name": f"Point {i}",
+                            "data_type": "float",
+                            "tier": 1 + (i % 3),
+                            "source_ref": f"metasys02:SNE-{a % 64:02d}/IP.AHU{a:04d}.PT{i:03d}",
+                            "deadband": 0.5,
+                        }
+                        for i in range(points_per_asset)
+                    ],
+                }
+                for a in range(assets)
+            ]
+        },
+        "polling": {"defaults": {"tier_1_seconds": 5, "tier_2_seconds": 30, "tier_3_seconds": 300}},
+    }
+
+
+def run(client: TestClient, ticks: int, save_every: int, conditional: bool, encoding: str) -> Dict[str, float]:
+    """
+    One simulated UI: each tick (one second of wall time in the real UI) polls the
+    project list, the open project's config and its YAML. Every `save_every` ticks
+    the user saves the config, so some polls see a change.
+    """
+    etags: Dict[str, Optional[str]] = {}
+    paths = [
+        "/api/v1/projects",
+        "/api/v1/projects/p000/connector/config",
+        "/api/v1/projects/p000/connector/yaml",
+    ]
+    cfg = client.get(paths[1]).json()["config_json"]
+
+    requests = not_modified = 0
+    body_bytes = 0
+    t0 = time.perf_counter()
+    for tick in range(ticks):
+        if save_every and tick and tick % save_every == 0:
+            client.put(paths[1], json={"config_json": cfg})
+        for path in paths:
+            headers = {"Accept-Encoding": encoding}
+            if conditional and etags.get(path):
+                headers["If-None-Match"] = etags[path]  # type: ignore[assignment]
+            r = client.get(path, headers=headers)
+            requests += 1
+            if r.status_code == 304:
+                not_modified += 1
+            else:
+                etags[path] = r.headers.get("etag")
+            # Content-Length is the on-the-wire size (compressed when gzip applied)
+            body_bytes += int(r.headers.get("content-length", len(r.content)))
+    secs = time.perf_counter() - t0
+
+    return {
+        "requests": requests,
+        "seconds": secs,
+        "rps": requests / secs if secs else 0.0,
+        "not_modified": not_modified,
+        "bytes": body_bytes,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark a UI polling the local API every second.")
+    ap.add_argument("--projects", type=int, default=100)
+    ap.add_argument("--assets", type=int, default=100)
+    ap.add_argument("--points-per-asset", type=int, default=40)
+    ap.add_argument("--ticks", type=int, default=60, help="Simulated seconds of polling.")
+    ap.add_argument("--save-every", type=int, default=20, help="Save the config every N ticks (0 = never).")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_local_api_") as tmp:
+        data_dir = Path(tmp)
+        cfg = synthetic_config(args.assets, args.points_per_asset)
+        for i in range(args.projects):
+            proj = data_dir / f"p{i:03d}"
+            proj.mkdir()
+            (proj / "meta.json").write_text(json.dumps({"project_id": proj.name, "name": proj.name}))
+            (proj / "config.json").write_text(json.dumps(dict(cfg, _version=1), indent=2, sort_keys=True))
+
+        server.DATA_DIR = data_dir
+        server._PROJECTS = server.ProjectIndex(data_dir)
+        server._RENDERED_YAML.clear()
+        client = TestClient(server.app)
+
+        print(f"[INFO] {args.projects} projects, config.json ~{(data_dir / 'p000' / 'config.json').stat().st_size:,} bytes")
+        print(f"{'mode':<22} {'requests':>8} {'304s':>6} {'req/s':>9} {'bytes':>14} {'bytes/tick':>12}")
+        for name, conditional, encoding in (
+            ("plain", False, "identity"),
+            ("etag", True, "identity"),
+            ("gzip", False, "gzip"),
+            ("etag+gzip", True, "gzip"),
+        ):
+            res = run(client, args.ticks, args.save_every, conditional, encoding)
+            print(
+                f"{name:<22} {res['requests']:>8} {res['not_modified']:>6} {res['rps']:>9.1f} "
+                f"{res['bytes']:>14,} {res['bytes'] / args.ticks:>12,.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
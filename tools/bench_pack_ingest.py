@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.bacnet_scanner.devices_io import write_devices  # noqa: E402
+from src.utils.artifact_io import copy_files  # noqa: E402
+from tools.bench_devices_output import synthetic_devices  # noqa: E402
+
+SCHEMA = ROOT / "schemas" / "bacnet_devices_output.schema.json"
+
+
+def make_inputs(bacnet_dir: Path, devices: int, objects_mb: int, csv_mb: int) -> Path:
+    meta = {
+        "scan_run_id": "bench",
+        "timestamp": "2026-01-01T00:00:00+0000",
+        "status": "ok",
+        "segment_name": "bench",
+        "offline_mode": True,
+        "device_records": devices,
+    }
+    devices_path = bacnet_dir / "devices.ndjson"
+    write_devices(devices_path, meta, synthetic_devices(devices, 20), True)
+    line = json.dumps({"instance": 1, "objects": [f"analog-input,{i}" for i in range(200)]}) + "\n"
+    with (bacnet_dir / "objects.ndjson").open("w", encoding="utf-8") as f:
+        f.write(json.dumps({"meta": {}}) + "\n")
+        f.write(line * (objects_mb * 1024 * 1024 // len(line)))
+    row = "BACNET_1,SIM-1,BACNET_1-AI1,SIM-1.Supply-Temp-1,float,1,,,bacnet:1/analog-input:1\n"
+    with (bacnet_dir / "points_from_bacnet.csv").open("w", encoding="utf-8") as f:
+        f.write(row * (csv_mb * 1024 * 1024 // len(row)))
+    # settle mtimes so the hash cache will keep these entries
+    old = time.time() - 60
+    for p in bacnet_dir.iterdir():
+        os.utime(p, (old, old))
+    return devices_path
+
+
+def sources(bacnet_dir: Path) -> List[Path]:
+    names = ("devices.ndjson", "objects.ndjson", "points_from_bacnet.csv")
+    return [bacnet_dir / n for n in names] + [SCHEMA]
+
+
+def previous_approach(bacnet_dir: Path, out_dir: Path) -> Dict[str, str]:
+    """What pack_ingest did before: copy2 each file, then read the copy back to hash it."""
+    out: Dict[str, str] = {}
+    for src in sources(bacnet_dir):
+        dst = out_dir / "bacnet" / src.name
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dst)
+        h = hashlib.sha256()
+        with dst.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        out[src.name] = h.hexdigest()
+    return out
+
+
+def pack(devices_path: Path, out_dir: Path, cache: Path) -> float:
+    env = dict(os.environ, ARTIFACT_HASH_CACHE=str(cache))
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "src.pack_ingest", "--out-dir", str(out_dir), "--bacnet-json", str(devices_path)],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - t0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="pack_ingest copy+hash: before vs single pass vs warm hash cache.")
+    ap.add_argument("--devices", type=int, default=2000)
+    ap.add_argument("--objects-mb", type=int, default=400)
+    ap.add_argument("--csv-mb", type=int, default=200)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_pack_") as tmp:
+        tmp_path = Path(tmp)
+        bacnet_dir = tmp_path / "bacnet"
+        bacnet_dir.mkdir()
+        devices_path = make_inputs(bacnet_dir, args.devices, args.objects_mb, args.csv_mb)
+        cache = tmp_path / "sha256.json"
+
+        t0 = time.perf_counter()
+        before = previous_approach(bacnet_dir, tmp_path / "before")
+        before_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        copy_files([(src, tmp_path / "single" / src.name) for src in sources(bacnet_dir)])
+        single_s = time.perf_counter() - t0
+
+        cold = pack(devices_path, tmp_path / "ingest", cache)
+        warm = pack(devices_path, tmp_path / "ingest", cache)
+
+        manifest = json.loads((tmp_path / "ingest" / "manifest.json").read_text(encoding="utf-8"))
+        after = {Path(e["path"]).name: e["sha256"] for e in manifest["files"].values()}
+
+    print(f"[INFO] copy2 + re-read copy (artifacts only): {before_s:.2f}s")
+    print(f"[INFO] single-pass copy+hash, thread pool:     {single_s:.2f}s")
+    print(f"[INFO] pack_ingest, cold hash cache:          {cold:.2f}s (includes validation + interpreter start)")
+    print(f"[INFO] pack_ingest, warm hash cache:          {warm:.2f}s")
+    ok = before == after
+    print("[OK] manifest hashes match the two-pass hashes" if ok else "[WARN] hash mismatch")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
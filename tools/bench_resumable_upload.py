@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+import requests  # noqa: E402
+
+from src.upload_ingest import _save_session, bundle_fingerprint, stream_zip, upload_resumable  # noqa: E402
+from tools.bench_pack_ingest import make_inputs, pack  # noqa: E402
+from tools.ingest_standin_server import serve_in_thread  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def make_bundle(tmp: Path, random_mb: int) -> Path:
+    """A packed bundle plus a poorly compressible artifact, so the archive has some size."""
+    bacnet_dir = tmp / "bacnet"
+    bacnet_dir.mkdir()
+    devices_path = make_inputs(bacnet_dir, 2000, 20, 10)
+    bundle_dir = tmp / "ingest"
+    pack(devices_path, bundle_dir, tmp / "sha256.json")
+    with (bundle_dir / "bacnet" / "history.bin").open("wb") as f:
+        for _ in range(random_mb):
+            f.write(os.urandom(MB))
+    return bundle_dir
+
+
+def matches_bundle(archive: Path, bundle_dir: Path) -> bool:
+    with zipfile.ZipFile(archive) as z:
+        names = sorted(z.namelist())
+        expected = sorted(p.relative_to(bundle_dir).as_posix() for p in bundle_dir.rglob("*") if p.is_file())
+        if names != expected:
+            return False
+        return all(
+            hashlib.sha256(z.read(n)).digest() == hashlib.sha256((bundle_dir / n).read_bytes()).digest() for n in names
+        )
+
+
+def in_process(url: str, bundle_dir: Path, chunk_mb: int) -> Tuple[Dict[str, Any], float, float]:
+    """upload_resumable with retries (no backoff); (stats, seconds, peak traced MB)."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    with requests.Session() as session, contextlib.redirect_stdout(io.StringIO()):  # mute the retry warnings
+        stats = upload_resumable(
+            session, url, {}, bundle_dir, chunk_size=chunk_mb * MB, retries=3, backoff=0.0, session_path=None
+        )
+    secs = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return stats, secs, peak / 1e6
+
+
+def rerun_until_done(url: str, bundle_dir: Path, chunk_mb: int, session_file: Path, limit: int = 50) -> int:
+    """The CLI with --retries 0: every drop kills the run, and the next run resumes it. Returns runs needed."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    cmd = [sys.executable, "-m", "src.upload_ingest", "--enable", "--mode", "resumable", "--endpoint", url,
+           "--bundle-dir", str(bundle_dir), "--chunk-mb", str(chunk_mb), "--retries", "0",
+           "--session-file", str(session_file)]
+    for run in range(1, limit + 1):
+        proc = subprocess.run(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if proc.returncode == 0:
+            return run
+    return -1
+
+
+def final_ack_lost(url: str, bundle_dir: Path, chunk_mb: int, session_file: Path) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Every chunk committed but the run died before its last (short) chunk's ack
+    arrived: the next run must resume at the end of the archive and only complete it.
+    """
+    chunk_size = chunk_mb * MB
+    sid = requests.post(f"{url}/uploads", json={"chunk_size": chunk_size}).json()["session_id"]
+    _save_session(session_file, {"endpoint": url, "fingerprint": bundle_fingerprint(bundle_dir, chunk_size), "session_id": sid})
+    pos = 0
+    for chunk in stream_zip(bundle_dir, chunk_size):
+        requests.put(f"{url}/uploads/{sid}?offset={pos}", data=chunk).raise_for_status()
+        pos += len(chunk)
+    with requests.Session() as session, contextlib.redirect_stdout(io.StringIO()):
+        stats = upload_resumable(
+            session, url, {}, bundle_dir, chunk_size=chunk_size, retries=0, backoff=0.0, session_path=session_file
+        )
+    ok = stats["session_id"] == sid and stats["resumed_at"] == pos and stats["chunks_sent"] == 0
+    return ok, stats
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Streamed, resumable bundle upload against a stand-in that drops connections.")
+    ap.add_argument("--random-mb", type=int, default=32, help="Incompressible MB added to the bundle (run at 1x and 4x).")
+    ap.add_argument("--chunk-mb", type=int, default=2)
+    ap.add_argument("--drop-every", type=int, default=3, help="Stand-in drops every Nth chunk request.")
+    args = ap.parse_args()
+
+    ok = True
+    print(f"{'bundle MB':>9} {'archive MB':>10} {'chunks':>7} {'drops':>6} {'re-sent MB':>10} {'s':>6} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory(prefix="bench_resumable_") as tmp:
+        tmp_path = Path(tmp)
+        for scale in (1, 4):
+            case = tmp_path / f"x{scale}"
+            case.mkdir()
+            bundle_dir = make_bundle(case, args.random_mb * scale)
+            bundle_mb = sum(p.stat().st_size for p in bundle_dir.rglob("*") if p.is_file()) / 1e6
+            server, url = serve_in_thread(case / "server", drop_every=args.drop_every)
+            try:
+                stats, secs, peak = in_process(url, bundle_dir, args.chunk_mb)
+                server_stats = httpx.get(f"{url}/stats").json()
+            finally:
+                server.shutdown()
+            archive = case / "server" / "uploads" / f"{stats['session_id']}.zip"
+            resent = server_stats["bytes_received"] - stats["bytes"]
+            ok = ok and archive.exists() and matches_bundle(archive, bundle_dir)
+            print(
+                f"{bundle_mb:>9.1f} {stats['bytes'] / 1e6:>10.1f} {stats['chunks_sent']:>7} {server_stats['drops']:>6} "
+                f"{resent / 1e6:>10.1f} {secs:>6.2f} {peak:>8.1f}"
+            )
+
+        # process-level resume: each drop ends the run; the session file carries it to the next one
+        server, url = serve_in_thread(tmp_path / "x1" / "server_rerun", drop_every=args.drop_every)
+        try:
+            runs = rerun_until_done(url, tmp_path / "x1" / "ingest", args.chunk_mb, tmp_path / "session.json")
+            drops = httpx.get(f"{url}/stats").json()["drops"]
+        finally:
+            server.shutdown()
+        ok = ok and runs == drops + 1
+        print(f"[INFO] --retries 0: finished after {runs} runs ({drops} dropped connections), each resuming the last")
+
+        server, url = serve_in_thread(tmp_path / "x1" / "server_last_ack")
+        try:
+            resumed, stats = final_ack_lost(url, tmp_path / "x1" / "ingest", args.chunk_mb, tmp_path / "last_ack.json")
+            archive = tmp_path / "x1" / "server_last_ack" / "uploads" / f"{stats['session_id']}.zip"
+            resumed = resumed and archive.exists() and matches_bundle(archive, tmp_path / "x1" / "ingest")
+        finally:
+            server.shutdown()
+        ok = ok and resumed
+        print(f"[INFO] last chunk's ack lost: {'resumed at the end and completed' if resumed else 'NOT resumed'}")
+
+    print("[OK] archives complete and identical to the bundle" if ok else "[WARN] upload incomplete or mismatched")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_MISSING = re.compile(r"^ModuleNotFoundError: No module named '([\w.]+)'")
+
+# Entry module -> (import-time budget in ms, modules that must not load at import).
+# Budgets are ~2x what a cold import costs on a typical workstation; the
+# forbidden lists catch the regressions that matter regardless of machine speed.
+BUDGETS: Dict[str, Tuple[float, List[str]]] = {
+    "src.main": (90.0, ["jsonschema", "requests", "http.server", "src.poller"]),
+    "src.pipeline": (25.0, ["yaml", "jsonschema", "requests"]),
+    "src.run_all": (25.0, ["yaml", "jsonschema", "requests"]),
+    "src.preflight_points_csv": (25.0, ["yaml", "jsonschema", "concurrent.futures.process"]),
+    "src.import_points_csv": (80.0, ["jsonschema", "requests", "concurrent.futures.process"]),
+    "src.export_config_to_csv": (50.0, ["jsonschema", "requests"]),
+    "src.poller": (60.0, ["requests", "jsonschema", "http.server"]),
+    "src.upload_ingest": (40.0, ["requests"]),
+}
+
+
+def measure(module: str) -> Tuple[Optional[float], Set[str], str]:
+    """
+    One cold `python -X importtime -c "import <module>"`.
+    Returns (cumulative ms for the module or None on failure, modules imported, stderr tail).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    cumulative_us: Optional[int] = None
+    imported: Set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        imported.add(name)
+        if name == module:
+            try:
+                cumulative_us = int(parts[1].strip())
+            except ValueError:
+                pass
+
+    if proc.returncode != 0:
+        return None, imported, proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else ""
+    return (cumulative_us / 1000.0 if cumulative_us is not None else None), imported, ""
+
+
+def missing_dependency(error: str) -> Optional[str]:
+    """The third-party package behind a ModuleNotFoundError, or None for any other failure."""
+    m = _MISSING.match(error)
+    if m is None:
+        return None
+    top = m.group(1).split(".")[0]
+    return None if top in ("src", "tools") else top
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Check cold import time of entry points against a budget.")
+    ap.add_argument("--runs", type=int, default=5, help="Cold runs per module; the fastest is kept.")
+    ap.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow CI machines).")
+    ap.add_argument("modules", nargs="*", help="Subset of entry modules to check (default: all).")
+    args = ap.parse_args()
+
+    modules = args.modules or list(BUDGETS)
+    failed = False
+
+    print(f"{'module':<28} {'best ms':>9} {'budget':>9}  result")
+    for module in modules:
+        budget_ms, forbidden = BUDGETS.get(module, (float("inf"), []))
+        budget_ms *= args.scale
+
+        best: Optional[float] = None
+        imported: Set[str] = set()
+        error = ""
+        for _ in range(max(1, args.runs)):
+            ms, seen, error = measure(module)
+            if ms is None:
+                break
+            imported |= seen
+            best = ms if best is None else min(best, ms)
+
+        if best is None:
+            # a third-party package missing on this machine is not a startup
+            # regression; anything else (SyntaxError, NameError, ...) is
+            if missing_dependency(error):
+                print(f"{module:<28} {'-':>9} {budget_ms:>9.1f}  SKIP ({error})")
+            else:
+                failed = True
+                print(f"{module:<28} {'-':>9} {budget_ms:>9.1f}  FAIL: import error ({error})")
+            continue
+
+        problems = []
+        if best > budget_ms:
+            problems.append("over budget")
+        leaked = sorted(m for m in forbidden if m in imported)
+        if leaked:
+            problems.append("imports " + ", ".join(leaked))
+
+        status = "OK" if not problems else "FAIL: " + "; ".join(problems)
+        failed = failed or bool(problems)
+        print(f"{module:<28} {best:>9.1f} {budget_ms:>9.1f}  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+from src.bacnet_scanner.devices_io import write_devices  # noqa: E402
+from tools.bench_devices_output import synthetic_devices  # noqa: E402
+from tools.bench_pack_ingest import make_inputs, pack  # noqa: E402
+from tools.ingest_standin_server import serve_in_thread  # noqa: E402
+
+
+def upload(mode: str, url: str, bundle_dir: Path, workdir: Path, cache: Path) -> Tuple[int, float]:
+    """Run src.upload_ingest against the stand-in; (bytes the server received, seconds)."""
+    before = httpx.get(f"{url}/stats").json()["bytes_received"]
+    env = dict(os.environ, PYTHONPATH=str(ROOT), ARTIFACT_HASH_CACHE=str(cache))
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "src.upload_ingest", "--enable", "--endpoint", url,
+         "--bundle-dir", str(bundle_dir), "--mode", mode],
+        cwd=workdir,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    secs = time.perf_counter() - t0
+    return httpx.get(f"{url}/stats").json()["bytes_received"] - before, secs
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Daily ingest upload: whole zip vs content-addressed (cas) delta.")
+    ap.add_argument("--devices", type=int, default=2000)
+    ap.add_argument("--objects-mb", type=int, default=40)
+    ap.add_argument("--csv-mb", type=int, default=20)
+    args = ap.parse_args()
+
+    rows: Dict[str, Dict[str, Tuple[int, float]]] = {}
+    with tempfile.TemporaryDirectory(prefix="bench_upload_") as tmp:
+        tmp_path = Path(tmp)
+        bacnet_dir = tmp_path / "bacnet"
+        bacnet_dir.mkdir()
+        devices_path = make_inputs(bacnet_dir, args.devices, args.objects_mb, args.csv_mb)
+        cache = tmp_path / "sha256.json"
+        bundle_dir = tmp_path / "ingest"
+        server, url = serve_in_thread(tmp_path / "server")
+        try:
+            for day in ("day 1", "day 2"):
+                if day == "day 2":
+                    # the nightly rescan rewrites devices; objects, points and schema are unchanged
+                    meta = {"scan_run_id": "bench-2", "timestamp": "2026-01-02T00:00:00+0000", "status": "ok",
+                            "segment_name": "bench", "offline_mode": True, "device_records": args.devices}
+                    write_devices(devices_path, meta, synthetic_devices(args.devices, 20), True)
+                    old = time.time() - 60
+                    os.utime(devices_path, (old, old))
+                pack(devices_path, bundle_dir, cache)
+                rows[day] = {mode: upload(mode, url, bundle_dir, tmp_path, cache) for mode in ("zip", "cas")}
+            stats = httpx.get(f"{url}/stats").json()
+        finally:
+            server.shutdown()
+        manifest = json.loads((bundle_dir / "manifest.json").read_text(encoding="utf-8"))
+        bundle_bytes = sum(e["bytes"] for e in manifest["files"].values())
+
+    print(f"[INFO] bundle: {bundle_bytes / 1e6:.1f} MB in {len(manifest['files'])} artifacts")
+    print(f"{'':<6} {'zip MB':>8} {'zip s':>7} {'cas MB':>8} {'cas s':>7}")
+    for day, r in rows.items():
+        print(f"{day:<6} {r['zip'][0] / 1e6:>8.2f} {r['zip'][1]:>7.2f} {r['cas'][0] / 1e6:>8.2f} {r['cas'][1]:>7.2f}")
+    ok = stats["bundles"] == 2 and rows["day 2"]["cas"][0] < rows["day 2"]["zip"][0]
+    print(f"[INFO] stand-in stored {stats['blobs_stored']} blobs over 2 days")
+    print("[OK] day-2 cas upload sent only the changed artifact" if ok else "[WARN] cas upload did not shrink")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+import src.local_api.server as server  # noqa: E402
+from src.local_api.alerts import AlertDispatcher  # noqa: E402
+
+WEBHOOK_SECRET = "bench-secret"
+
+
+class FakeSender:
+    """
+    Stand-in for the e-mail provider: blocks for `latency` seconds per call and
+    fails the first `failures` calls.
+    """
+
+    def __init__(self, latency: float, failures: int) -> None:
+        self.latency = latency
+        self.failures = failures
+        self.calls = 0
+        self.sent: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, subject: str, html: str) -> None:
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise RuntimeError("simulated provider error")
+            self.sent.append((subject, html))
+
+
+def push_body(repo: str, n: int) -> bytes:
+    return json.dumps(
+        {
+            "repository": {"full_name": repo},
+            "ref": "refs/heads/main",
+            "pusher": {"name": "bench"},
+            "commits": [{"message": f"commit {n} <b>", "url": f"https://example.invalid/{repo}/{n}"}],
+        }
+    ).encode()
+
+
+async def burst(repos: int, pushes: int) -> List[float]:
+    transport = httpx.ASGITransport(app=server.app)
+    latencies: List[float] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://local") as client:
+
+        async def one(n: int) -> None:
+            body = push_body(f"org/repo{n % repos}", n)
+            sig = "sha256=" + hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+            headers = {"X-GitHub-Event": "push", "X-Hub-Signature-256": sig, "Content-Type": "application/json"}
+            t0 = time.perf_counter()
+            r = await client.post("/api/v1/webhooks/github", content=body, headers=headers)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            if r.status_code != 200 or not r.json().get("queued"):
+                raise SystemExit(f"[ERROR] webhook -> HTTP {r.status_code}: {r.text[:200]}")
+
+        await asyncio.gather(*(one(n) for n in range(pushes)))
+    return sorted(latencies)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Burst of signed push webhooks against a fake e-mail sender.")
+    ap.add_argument("--repos", type=int, default=3)
+    ap.add_argument("--pushes", type=int, default=200)
+    ap.add_argument("--window", type=float, default=1.0, help="Digest window in seconds.")
+    ap.add_argument("--email-ms", type=float, default=300.0, help="Simulated latency of the e-mail provider call.")
+    ap.add_argument("--failures", type=int, default=2, help="Fail this many sends first (exercises retry).")
+    args = ap.parse_args()
+
+    os.environ["GITHUB_WEBHOOK_SECRET"] = WEBHOOK_SECRET
+    sender = FakeSender(args.email_ms / 1000.0, args.failures)
+    server._ALERTS = AlertDispatcher(sender, window_seconds=args.window, backoff_seconds=0.2)
+
+    ms = asyncio.run(burst(args.repos, args.pushes))
+    print(
+        f"[INFO] {args.pushes} pushes over {args.repos} repos acknowledged: "
+        f"p50 {ms[len(ms) // 2]:.1f} ms, max {ms[-1]:.1f} ms"
+    )
+
+    # wait past the window plus retries, then flush anything left
+    deadline = time.monotonic() + args.window + 10.0
+    while server._ALERTS.pending() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    server._ALERTS.stop()
+
+    alerts = server._ALERTS
+    print(
+        f"[INFO] e-mails sent={alerts.sent} (provider calls={sender.calls}) "
+        f"retries={alerts.retries} dropped={alerts.failed}"
+    )
+    for subject, _ in sender.sent:
+        print(f"  {subject}")
+    ok = alerts.sent == args.repos and alerts.failed == 0
+    print("[OK] one digest per repo" if ok else "[WARN] expected one digest per repo")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
 from docx import Document
 from docx.shared import Pt
@@ -17,9 +22,13 @@ MD_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
 MD_UL = re.compile(r"^\s*[-*]\s+(.*)$")
 MD_OL = re.compile(r"^\s*(\d+)\.\s+(.*)$")
 
+# Bump when the rendering changes in a way the exported files should pick up
+# (edits to this script invalidate the stored hashes as well).
+EXPORTER_VERSION = "2"
+STATE_FILE = ".export_state.json"
+COMBINED_NAME = "CSUDH_Connector_SOPs"
 
-def read_text(p: Path) -> str:
-    return p.read_text(encoding="utf-8", errors="replace")
+Blocks = List[Tuple[str, str]]
 
 
 def md_to_blocks(md: str) -> List[Tuple[str, str]]:
@@ -80,16 +89,11 @@ def md_to_blocks(md: str) -> List[Tuple[str, str]]:
     return blocks
 
 
-def write_docx(md_path: Path, out_docx: Path) -> None:
-    doc = Document()
-    style = doc.styles["Normal"]
-    style.font.name = "Calibri"
-    style.font.size = Pt(11)
-
-    for kind, text in md_to_blocks(read_text(md_path)):
+def add_docx_blocks(doc: Any, blocks: Blocks, heading_shift: int = 0, min_heading: int = 1) -> None:
+    for kind, text in blocks:
         if kind.startswith("h"):
             lvl = int(kind[1:])
-            doc.add_heading(text, level=min(max(lvl, 1), 6))
+            doc.add_heading(text, level=min(max(lvl + heading_shift, min_heading), 6))
         elif kind == "p":
             doc.add_paragraph(text)
         elif kind == "ul":
@@ -104,31 +108,32 @@ def write_docx(md_path: Path, out_docx: Path) -> None:
         else:
             doc.add_paragraph(text)
 
-    out_docx.parent.mkdir(parents=True, exist_ok=True)
-    doc.save(out_docx)
 
-
-def write_pdf(md_path: Path, out_pdf: Path) -> None:
-    styles = getSampleStyleSheet()
-    story = []
-
-    for kind, text in md_to_blocks(read_text(md_path)):
+def pdf_story(
+    blocks: Blocks, styles: Any, heading_styles: Dict[int, str], gaps: Tuple[float, float, float]
+) -> List[Any]:
+    """Flowables for blocks; gaps are the spacer heights (inches) after headings, paragraphs and code."""
+    heading_gap, para_gap, code_gap = gaps
+    story: List[Any] = []
+    for kind, text in blocks:
         if kind.startswith("h"):
             lvl = int(kind[1:])
-            style_name = {1: "Title", 2: "Heading1", 3: "Heading2", 4: "Heading3"}.get(lvl, "Heading3")
-            story.append(Paragraph(text, styles[style_name]))
-            story.append(Spacer(1, 0.12 * inch))
+            story.append(Paragraph(text, styles[heading_styles.get(lvl, "Heading3")]))
+            story.append(Spacer(1, heading_gap * inch))
         elif kind == "p":
             story.append(Paragraph(text.replace("\n", "<br/>"), styles["BodyText"]))
-            story.append(Spacer(1, 0.10 * inch))
+            story.append(Spacer(1, para_gap * inch))
         elif kind == "ul":
             story.append(Paragraph(f"• {text}", styles["BodyText"]))
         elif kind == "ol":
             story.append(Paragraph(text, styles["BodyText"]))
         elif kind == "code":
             story.append(Preformatted(text, styles["Code"]))
-            story.append(Spacer(1, 0.12 * inch))
+            story.append(Spacer(1, code_gap * inch))
+    return story
 
+
+def build_pdf(story: List[Any], out_pdf: Path) -> None:
     out_pdf.parent.mkdir(parents=True, exist_ok=True)
     doc = SimpleDocTemplate(
         str(out_pdf),
@@ -141,72 +146,90 @@ def write_pdf(md_path: Path, out_pdf: Path) -> None:
     doc.build(story)
 
 
-def write_combined_docx(md_files: List[Path], out_docx: Path) -> None:
+def new_docx() -> Any:
+    doc = Document()
+    style = doc.styles["Normal"]
+    style.font.name = "Calibri"
+    style.font.size = Pt(11)
+    return doc
+
+
+def write_docx(blocks: Blocks, out_docx: Path) -> None:
+    doc = new_docx()
+    add_docx_blocks(doc, blocks)
+    out_docx.parent.mkdir(parents=True, exist_ok=True)
+    doc.save(out_docx)
+
+
+def write_pdf(blocks: Blocks, out_pdf: Path) -> None:
+    headings = {1: "Title", 2: "Heading1", 3: "Heading2", 4: "Heading3"}
+    build_pdf(pdf_story(blocks, getSampleStyleSheet(), headings, (0.12, 0.10, 0.12)), out_pdf)
+
+
+def write_combined_docx(docs: List[Tuple[str, Blocks]], out_docx: Path) -> None:
     doc = Document()
     doc.add_heading("CSUDH Pilot — Connector SOPs", level=1)
 
-    for i, p in enumerate(md_files):
-        doc.add_heading(p.name, level=2)
-        for kind, text in md_to_blocks(read_text(p)):
-            if kind.startswith("h"):
-                lvl = int(kind[1:])
-                doc.add_heading(text, level=min(max(lvl + 1, 2), 6))
-            elif kind == "p":
-                doc.add_paragraph(text)
-            elif kind == "ul":
-                doc.add_paragraph(text, style="List Bullet")
-            elif kind == "ol":
-                doc.add_paragraph(text, style="List Number")
-            elif kind == "code":
-                para = doc.add_paragraph()
-                run = para.add_run(text)
-                run.font.name = "Consolas"
-                run.font.size = Pt(10)
-        if i != len(md_files) - 1:
+    for i, (name, blocks) in enumerate(docs):
+        doc.add_heading(name, level=2)
+        add_docx_blocks(doc, blocks, heading_shift=1, min_heading=2)
+        if i != len(docs) - 1:
             doc.add_page_break()
 
     out_docx.parent.mkdir(parents=True, exist_ok=True)
     doc.save(out_docx)
 
 
-def write_combined_pdf(md_files: List[Path], out_pdf: Path) -> None:
+def write_combined_pdf(docs: List[Tuple[str, Blocks]], out_pdf: Path) -> None:
     styles = getSampleStyleSheet()
     story = [Paragraph("CSUDH Pilot — Connector SOPs", styles["Title"]), Spacer(1, 0.2 * inch)]
 
-    for i, p in enumerate(md_files):
-        story.append(Paragraph(p.name, styles["Heading1"]))
+    for i, (name, blocks) in enumerate(docs):
+        story.append(Paragraph(name, styles["Heading1"]))
         story.append(Spacer(1, 0.12 * inch))
-
-        for kind, text in md_to_blocks(read_text(p)):
-            if kind.startswith("h"):
-                lvl = int(kind[1:])
-                style_name = {1: "Heading1", 2: "Heading2", 3: "Heading3"}.get(lvl, "Heading3")
-                story.append(Paragraph(text, styles[style_name]))
-                story.append(Spacer(1, 0.10 * inch))
-            elif kind == "p":
-                story.append(Paragraph(text.replace("\n", "<br/>"), styles["BodyText"]))
-                story.append(Spacer(1, 0.08 * inch))
-            elif kind == "ul":
-                story.append(Paragraph(f"• {text}", styles["BodyText"]))
-            elif kind == "ol":
-                story.append(Paragraph(text, styles["BodyText"]))
-            elif kind == "code":
-                story.append(Preformatted(text, styles["Code"]))
-                story.append(Spacer(1, 0.10 * inch))
-
-        if i != len(md_files) - 1:
+        story.extend(pdf_story(blocks, styles, {1: "Heading1", 2: "Heading2", 3: "Heading3"}, (0.10, 0.08, 0.10)))
+        if i != len(docs) - 1:
             story.append(PageBreak())
 
-    out_pdf.parent.mkdir(parents=True, exist_ok=True)
-    doc = SimpleDocTemplate(
-        str(out_pdf),
-        pagesize=letter,
-        leftMargin=0.75 * inch,
-        rightMargin=0.75 * inch,
-        topMargin=0.75 * inch,
-        bottomMargin=0.75 * inch,
-    )
-    doc.build(story)
+    build_pdf(story, out_pdf)
+
+
+def render_sop(blocks: Blocks, out_docx: Path, out_pdf: Path) -> None:
+    """Both formats from one parse (runs in a worker process)."""
+    write_docx(blocks, out_docx)
+    write_pdf(blocks, out_pdf)
+
+
+def exporter_fingerprint() -> str:
+    h = hashlib.sha256(EXPORTER_VERSION.encode("utf-8"))
+    h.update(Path(__file__).read_bytes())
+    return h.hexdigest()
+
+
+def load_state(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_state(path: Path, state: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def run_tasks(tasks: List[Tuple[Callable[..., None], tuple]], jobs: int) -> None:
+    """Render tasks in a process pool; inline when there is only one (or jobs is 1), which skips the pool start-up."""
+    if jobs == 1 or len(tasks) <= 1:
+        for fn, fn_args in tasks:
+            fn(*fn_args)
+        return
+    with ProcessPoolExecutor(max_workers=min(len(tasks), jobs or os.cpu_count() or 1)) as pool:
+        for fut in [pool.submit(fn, *fn_args) for fn, fn_args in tasks]:
+            fut.result()
 
 
 def main() -> int:
@@ -214,8 +237,11 @@ def main() -> int:
     ap.add_argument("--root", default=".", help="Repo root containing docs/SOPs")
     ap.add_argument("--out", default="exports", help="Output folder")
     ap.add_argument("--combine", action="store_true", help="Also produce combined files")
+    ap.add_argument("--jobs", type=int, default=0, help="Render processes (0 = one per CPU)")
+    ap.add_argument("--force", action="store_true", help="Render everything, even unchanged files")
     args = ap.parse_args()
 
+    t0 = time.perf_counter()
     root = Path(args.root).resolve()
     sop_root = root / "docs" / "SOPs"
 
@@ -224,17 +250,61 @@ def main() -> int:
         raise SystemExit(f"No .md files found under: {sop_root}")
 
     out = Path(args.out).resolve()
-
+    state_path = out / STATE_FILE
+    fingerprint = exporter_fingerprint()
+    old = load_state(state_path)
+    # SOPs exported last time, kept even when the hashes below are discarded so
+    # the exports of deleted SOPs are still cleaned up
+    exported = set(old.get("docs") or {})
+    if args.force or old.get("exporter") != fingerprint:
+        old = {}
+    old_docs: Dict[str, str] = old.get("docs") or {}
+
+    # each file is read and parsed once; the same blocks feed both renderers and the combined export
+    parsed: List[Tuple[Path, Path, str, Blocks]] = []
     for md in md_files:
-        rel = md.relative_to(sop_root)
-        write_docx(md, out / "docx" / rel.with_suffix(".docx"))
-        write_pdf(md, out / "pdf" / rel.with_suffix(".pdf"))
+        raw = md.read_bytes()
+        blocks = md_to_blocks(raw.decode("utf-8", errors="replace"))
+        parsed.append((md, md.relative_to(sop_root), hashlib.sha256(raw).hexdigest(), blocks))
+
+    tasks: List[Tuple[Callable[..., None], tuple]] = []
+    docs: Dict[str, str] = {}
+    for md, rel, sha, blocks in parsed:
+        key = rel.as_posix()
+        docs[key] = sha
+        out_docx = out / "docx" / rel.with_suffix(".docx")
+        out_pdf = out / "pdf" / rel.with_suffix(".pdf")
+        if old_docs.get(key) == sha and out_docx.exists() and out_pdf.exists():
+            continue
+        tasks.append((render_sop, (blocks, out_docx, out_pdf)))
+    rendered = len(tasks)
 
+    # exports of SOPs that no longer exist
+    for key in exported - set(docs):
+        for sub, suffix in (("docx", ".docx"), ("pdf", ".pdf")):
+            (out / sub / Path(key).with_suffix(suffix)).unlink(missing_ok=True)
+
+    combined_key = ""
     if args.combine:
-        write_combined_docx(md_files, out / "combined" / "CSUDH_Connector_SOPs.docx")
-        write_combined_pdf(md_files, out / "combined" / "CSUDH_Connector_SOPs.pdf")
+        combined_key = hashlib.sha256(json.dumps(sorted(docs.items())).encode("utf-8")).hexdigest()
+        combined = [(md.name, blocks) for md, _, _, blocks in parsed]
+        out_docx = out / "combined" / f"{COMBINED_NAME}.docx"
+        out_pdf = out / "combined" / f"{COMBINED_NAME}.pdf"
+        if old.get("combined") != combined_key or not (out_docx.exists() and out_pdf.exists()):
+            tasks.append((write_combined_docx, (combined, out_docx)))
+            tasks.append((write_combined_pdf, (combined, out_pdf)))
+
+    run_tasks(tasks, args.jobs)
+    save_state(
+        state_path,
+        {"exporter": fingerprint, "docs": docs, "combined": combined_key or old.get("combined", "")},
+    )
 
     print(f"Exported {len(md_files)} SOP markdown files into: {out}")
+    print(
+        f"[INFO] {rendered} rendered, {len(md_files) - rendered} unchanged"
+        f"{', combined rebuilt' if args.combine and len(tasks) > rendered else ''} ({time.perf_counter() - t0:.2f}s)"
+    )
     return 0
 
 
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+import zipfile
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Stand-in for the app's ingest endpoint, for exercising src.upload_ingest
+# without the real service. Stdlib only. Speaks all three upload modes:
+#   POST /                 multipart zip bundle (--mode zip); stored under uploads/
+#   POST /uploads          start a resumable session (--mode resumable) -> {"session_id", "offset"}
+#   GET  /uploads/<id>     {"offset"}: bytes committed so far
+#   PUT  /uploads/<id>?offset=N   one chunk, committed only once fully received
+#   POST /uploads/<id>/complete   {"sha256", "bytes"}; the archive is checked and kept as uploads/<id>.zip
+#   POST /blobs/missing    {"sha256": [...]} -> {"missing": [...]}
+#   PUT  /blobs/<sha256>   blob body, optionally gzip; rejected unless it hashes to <sha256>
+#   POST /bundles          bundle manifest; rejected while any referenced blob is missing
+#   GET  /stats            request and byte counters
+# With drop_every=N every Nth chunk PUT loses its connection, alternately
+# halfway through the body (nothing committed) and after committing (ack lost).
+
+_SHA = re.compile(r"^[0-9a-f]{64}$")
+_CHUNK = 1024 * 1024
+
+
+class StandinState:
+    def __init__(self, root: Path, api_key: str = "", drop_every: int = 0) -> None:
+        self.root = root
+        self.api_key = api_key
+        self.drop_every = drop_every
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "bytes_received": 0,
+            "blobs_stored": 0,
+            "bundles": 0,
+            "chunks": 0,
+            "chunks_committed": 0,
+            "drops": 0,
+        }
+        for sub in ("blobs", "bundles", "uploads", "sessions"):
+            (root / sub).mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / "blobs" / sha256[:2] / sha256
+
+    def has_blob(self, sha256: str) -> bool:
+        return self.blob_path(sha256).exists()
+
+    def count(self, **deltas: int) -> None:
+        with self.lock:
+            for k, v in deltas.items():
+                self.stats[k] = self.stats.get(k, 0) + v
+
+    def session_part(self, sid: str) -> Path:
+        return self.root / "sessions" / f"{sid}.part"
+
+    def next_drop(self) -> Optional[str]:
+        """None, or how the current chunk PUT should fail ("mid-body" or "lost-ack")."""
+        with self.lock:
+            self.stats["chunks"] += 1
+            if not self.drop_every or self.stats["chunks"] % self.drop_every:
+                return None
+            self.stats["drops"] += 1
+            return "mid-body" if self.stats["drops"] % 2 else "lost-ack"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "IngestStandin/0.1"
+    protocol_version = "HTTP/1.1"
+    state: StandinState
+
+    def log_message(self, format: str, *args: Any) -> None:  # quiet by default
+        pass
+
+    # --- plumbing ---
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        if not self.state.api_key:
+            return True
+        if self.headers.get("Authorization", "") == f"Bearer {self.state.api_key}":
+            return True
+        self._drain()
+        self._reply(401, {"error": "unauthorized"})
+        return False
+
+    def _body(self) -> Iterator[bytes]:
+        """Request body as it arrives (Content-Length or chunked), counted in the stats."""
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass  # trailers
+                    return
+                data = self.rfile.read(size)
+                self.rfile.readline()
+                self.state.count(bytes_received=len(data))
+                yield data
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining > 0:
+            data = self.rfile.read(min(_CHUNK, remaining))
+            if not data:
+                return
+            remaining -= len(data)
+            self.state.count(bytes_received=len(data))
+            yield data
+
+    def _drain(self) -> None:
+        for _ in self._body():
+            pass
+
+    def _json_body(self) -> Optional[Any]:
+        try:
+            return json.loads(b"".join(self._body()) or b"null")
+        except ValueError:
+            return None
+
+    # --- routes ---
+
+    def do_GET(self) -> None:
+        self.state.count(requests=1)
+        if self.path.rstrip("/") == "/stats":
+            with self.state.lock:
+                self._reply(200, dict(self.state.stats))
+            return
+        if not self._authorized():
+            return
+        m = re.match(r"^/uploads/([0-9a-f]{32})$", self.path)
+        if m and self.state.session_part(m.group(1)).exists():
+            self._reply(200, {"offset": self.state.session_part(m.group(1)).stat().st_size})
+            return
+        self._reply(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        self.state.count(requests=1)
+        if not self._authorized():
+            return
+        path = self.path.rstrip("/")
+        if path == "/blobs/missing":
+            body = self._json_body()
+            wanted = body.get("sha256") if isinstance(body, dict) else None
+            if not isinstance(wanted, list) or not all(isinstance(s, str) and _SHA.match(s) for s in wanted):
+                self._reply(400, {"error": "expected {\"sha256\": [hex digests]}"})
+                return
+            self._reply(200, {"missing": [s for s in wanted if not self.state.has_blob(s)]})
+        elif path == "/bundles":
+            self._post_bundle()
+        elif path == "/uploads":
+            self._drain()
+            sid = uuid.uuid4().hex
+            self.state.session_part(sid).touch()
+            self._reply(201, {"session_id": sid, "offset": 0})
+        elif re.match(r"^/uploads/[0-9a-f]{32}/complete$", path):
+            self._complete_upload(path.split("/")[2])
+        elif path == "":
+            self._post_zip()
+        else:
+            self._drain()
+            self._reply(404, {"error": "not found"})
+
+    def do_PUT(self) -> None:
+        self.state.count(requests=1)
+        if not self._authorized():
+            return
+        url = urlsplit(self.path)
+        m = re.match(r"^/uploads/([0-9a-f]{32})$", url.path)
+        if m:
+            self._put_chunk(m.group(1), parse_qs(url.query).get("offset", [""])[0])
+            return
+        m = re.match(r"^/blobs/([0-9a-f]{64})$", self.path)
+        if not m:
+            self._drain()
+            self._reply(404, {"error": "not found"})
+            return
+        status, body = self._store_blob(m.group(1))
+        self._reply(status, body)
+
+    def _put_chunk(self, sid: str, offset: str) -> None:
+        part = self.state.session_part(sid)
+        if not part.exists():
+            self._drain()
+            self._reply(404, {"error": "unknown upload session"})
+            return
+        current = part.stat().st_size
+        if not offset.isdigit() or int(offset) != current:
+            self._drain()
+            self._reply(409, {"error": "offset mismatch", "offset": current})
+            return
+        drop = self.state.next_drop()
+        expected = int(self.headers.get("Content-Length") or 0)
+        data = bytearray()
+        for piece in self._body():
+            data += piece
+            if drop == "mid-body" and len(data) >= expected // 2:
+                break
+        if drop == "mid-body" or len(data) != expected:
+            self.close_connection = True  # hang up without a reply; nothing is committed
+            return
+        with part.open("ab") as f:
+            f.write(data)
+        self.state.count(chunks_committed=1)
+        if drop == "lost-ack":
+            self.close_connection = True
+            return
+        self._reply(200, {"offset": current + len(data)})
+
+    def _complete_upload(self, sid: str) -> None:
+        body = self._json_body()
+        part = self.state.session_part(sid)
+        if not part.exists() or not isinstance(body, dict):
+            self._reply(404 if not part.exists() else 400, {"error": "unknown session or bad body"})
+            return
+        h = hashlib.sha256()
+        with part.open("rb") as f:
+            for data in iter(lambda: f.read(_CHUNK), b""):
+                h.update(data)
+        size = part.stat().st_size
+        if h.hexdigest() != body.get("sha256") or size != body.get("bytes"):
+            self._reply(422, {"error": "archive mismatch", "sha256": h.hexdigest(), "bytes": size})
+            return
+        try:
+            with zipfile.ZipFile(part) as z:
+                bad = z.testzip()
+                files = len(z.infolist())
+        except zipfile.BadZipFile as e:
+            bad, files = str(e), 0
+        if bad is not None:
+            self._reply(422, {"error": f"corrupt archive: {bad}"})
+            return
+        os.replace(part, self.state.root / "uploads" / f"{sid}.zip")
+        self._reply(201, {"upload": f"{sid}.zip", "bytes": size, "files": files})
+
+    def _store_blob(self, sha256: str) -> Tuple[int, Dict[str, Any]]:
+        encoding = self.headers.get("Content-Encoding", "").lower()
+        if encoding not in ("", "identity", "gzip"):
+            self._drain()
+            return 415, {"error": f"unsupported Content-Encoding {encoding}"}
+        inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding == "gzip" else None
+        dst = self.state.blob_path(sha256)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f"{dst.name}.{threading.get_ident()}.tmp")
+        h = hashlib.sha256()
+        size = 0
+        try:
+            with tmp.open("wb") as f:
+                for data in self._body():
+                    if inflate is not None:
+                        data = inflate.decompress(data)
+                    h.update(data)
+                    f.write(data)
+                    size += len(data)
+                if inflate is not None:
+                    tail = inflate.flush()
+                    h.update(tail)
+                    f.write(tail)
+                    size += len(tail)
+        except zlib.error as e:
+            tmp.unlink(missing_ok=True)
+            return 400, {"error": f"bad gzip body: {e}"}
+        if h.hexdigest() != sha256:
+            tmp.unlink(missing_ok=True)
+            return 422, {"error": "sha256 mismatch", "got": h.hexdigest()}
+        os.replace(tmp, dst)
+        self.state.count(blobs_stored=1)
+        return 201, {"sha256": sha256, "bytes": size}
+
+    def _post_bundle(self) -> None:
+        doc = self._json_body()
+        blobs = doc.get("blobs") if isinstance(doc, dict) else None
+        if not isinstance(blobs, list):
+            self._reply(400, {"error": "expected a manifest with a blobs list"})
+            return
+        missing = [b.get("sha256") for b in blobs if not self.state.has_blob(str(b.get("sha256", "")))]
+        if missing:
+            self._reply(409, {"error": "blobs missing", "missing": missing})
+            return
+        bundle_id = str((doc.get("bundle") or {}).get("bundle_id") or f"bundle-{self.state.stats['bundles'] + 1}")
+        bundle_id = re.sub(r"[^A-Za-z0-9_.-]", "_", bundle_id)
+        (self.state.root / "bundles" / f"{bundle_id}.json").write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        self.state.count(bundles=1)
+        self._reply(201, {"bundle_id": bundle_id, "files": len(blobs)})
+
+    def _post_zip(self) -> None:
+        with self.state.lock:
+            n = self.state.stats.get("zip_uploads", 0) + 1
+            self.state.stats["zip_uploads"] = n
+        dst = self.state.root / "uploads" / f"upload-{n}.multipart"
+        size = 0
+        with dst.open("wb") as f:
+            for data in self._body():
+                f.write(data)
+                size += len(data)
+        self._reply(201, {"upload": dst.name, "bytes": size})
+
+
+def make_server(
+    root: Path, host: str = "127.0.0.1", port: int = 0, api_key: str = "", drop_every: int = 0
+) -> ThreadingHTTPServer:
+    """A stand-in server storing under root; port 0 picks a free port (see server.server_address)."""
+    handler = type("Handler", (_Handler,), {"state": StandinState(root, api_key, drop_every)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_in_thread(root: Path, api_key: str = "", drop_every: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start a stand-in on a free local port; returns (server, base URL). Call server.shutdown() when done."""
+    server = make_server(root, api_key=api_key, drop_every=drop_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Local stand-in for the app ingest endpoint (zip and cas uploads).")
+    ap.add_argument("--root", default="out/ingest_standin", help="Where blobs, bundles and zip uploads are stored.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--api-key", default=os.environ.get("INGEST_API_KEY", ""))
+    ap.add_argument("--drop-every", type=int, default=0, help="Drop the connection on every Nth chunk PUT.")
+    args = ap.parse_args()
+
+    server = make_server(Path(args.root), args.host, args.port, args.api_key, args.drop_every)
+    print(f"[OK] Ingest stand-in on http://{args.host}:{server.server_address[1]} (storing under {args.root})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
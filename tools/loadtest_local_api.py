@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+import src.local_api.server as server  # noqa: E402
+from tools.bench_local_api import synthetic_config  # noqa: E402
+
+WEBHOOK_SECRET = "loadtest-secret"
+
+
+def percentile(sorted_ms: List[float], q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = min(len(sorted_ms) - 1, max(0, round(q * (len(sorted_ms) - 1))))
+    return sorted_ms[k]
+
+
+async def timed(latencies: Dict[str, List[float]], op: str, coro) -> None:
+    t0 = time.perf_counter()
+    r = await coro
+    latencies.setdefault(op, []).append((time.perf_counter() - t0) * 1000.0)
+    if r.status_code >= 400:
+        raise SystemExit(f"[ERROR] {op} -> HTTP {r.status_code}: {r.text[:200]}")
+
+
+async def reader(client: httpx.AsyncClient, latencies, project: str, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        await timed(latencies, "GET projects", client.get("/api/v1/projects"))
+        await timed(latencies, "GET config", client.get(f"/api/v1/projects/{project}/connector/config"))
+        await timed(latencies, "GET yaml", client.get(f"/api/v1/projects/{project}/connector/yaml"))
+
+
+async def writer(client: httpx.AsyncClient, latencies, project: str, cfg, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        await timed(
+            latencies,
+            "PUT config",
+            client.put(f"/api/v1/projects/{project}/connector/config", json={"config_json": cfg}),
+        )
+
+
+async def webhook(client: httpx.AsyncClient, latencies, deadline: float) -> None:
+    body = json.dumps({"repository": {"full_name": "org/repo"}, "ref": "refs/heads/main", "commits": []}).encode()
+    sig = "sha256=" + hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    headers = {"X-GitHub-Event": "push", "X-Hub-Signature-256": sig, "Content-Type": "application/json"}
+    while time.perf_counter() < deadline:
+        await timed(latencies, "POST webhook", client.post("/api/v1/webhooks/github", content=body, headers=headers))
+
+
+async def run(args: argparse.Namespace) -> Dict[str, List[float]]:
+    transport = httpx.ASGITransport(app=server.app)
+    latencies: Dict[str, List[float]] = {}
+    cfg = synthetic_config(args.assets, args.points_per_asset)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://local") as client:
+        for i in range(args.projects):
+            await client.post("/api/v1/projects", json={"project_id": f"p{i:03d}", "name": f"p{i:03d}"})
+            await client.put(f"/api/v1/projects/p{i:03d}/connector/config", json={"config_json": cfg})
+
+        deadline = time.perf_counter() + args.seconds
+        tasks = [reader(client, latencies, f"p{i % args.projects:03d}", deadline) for i in range(args.readers)]
+        tasks += [writer(client, latencies, f"p{i % args.projects:03d}", cfg, deadline) for i in range(args.writers)]
+        tasks += [webhook(client, latencies, deadline) for _ in range(args.webhooks)]
+        await asyncio.gather(*tasks)
+    return latencies
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Concurrent readers/writers/webhooks against the local API (in-process).")
+    ap.add_argument("--projects", type=int, default=4)
+    ap.add_argument("--assets", type=int, default=50)
+    ap.add_argument("--points-per-asset", type=int, default=40)
+    ap.add_argument("--readers", type=int, default=16)
+    ap.add_argument("--writers", type=int, default=4)
+    ap.add_argument("--webhooks", type=int, default=2)
+    ap.add_argument("--email-ms", type=float, default=300.0, help="Simulated latency of the e-mail provider call.")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    args = ap.parse_args()
+
+    # Fake e-mail sender: a blocking call of realistic duration, no network.
+    os.environ["GITHUB_WEBHOOK_SECRET"] = WEBHOOK_SECRET
+    server._send_resend_email = lambda subject, html: time.sleep(args.email_ms / 1000.0)
+
+    with tempfile.TemporaryDirectory(prefix="loadtest_local_api_") as tmp:
+        server.DATA_DIR = Path(tmp)
+        server._PROJECTS = server.ProjectIndex(server.DATA_DIR)
+        server._RENDERED_YAML.clear()
+        latencies = asyncio.run(run(args))
+
+    print(
+        f"[INFO] readers={args.readers} writers={args.writers} webhooks={args.webhooks} "
+        f"email={args.email_ms:.0f}ms duration={args.seconds:.0f}s"
+    )
+    print(f"{'operation':<14} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for op in sorted(latencies):
+        ms = sorted(latencies[op])
+        print(
+            f"{op:<14} {len(ms):>7} {percentile(ms, 0.50):>9.1f} {percentile(ms, 0.95):>9.1f} "
+            f"{percentile(ms, 0.99):>9.1f} {ms[-1]:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())